@@ -22,7 +22,7 @@ if torch.cuda.is_available():
         + '-gencode arch=compute_52,code=sm_52 '
         + '-gencode arch=compute_50,code=sm_50 '
         + '-gencode arch=compute_30,code=sm_30 '
-        + '-DNVCC '
+        + '-DNVCC -DENABLE_OPENMP '
         + '-I/usr/local/cuda/include '
         + '-I' + torch_dir + '/lib/include '
         + '-I' + torch_dir + '/lib/include/TH '
@@ -43,7 +43,8 @@ if torch.cuda.is_available():
         with_cuda=True)
 else:
     r = os.system(
-        'cd sparseconvnet/SCN; g++ -std=c++11 -fPIC -c init.cpp -o init.cpp.o -I' +
+        'cd sparseconvnet/SCN; g++ -std=c++11 -fPIC -fopenmp -DENABLE_OPENMP -O3'
+        + ' -c init.cpp -o init.cpp.o -I' +
         torch_dir +
         '/lib/include -I' +
         torch_dir +
@@ -56,6 +57,7 @@ else:
         extra_objects=[
             this_dir +
             '/sparseconvnet/SCN/init.cpp.o'],
+        extra_link_args=['-fopenmp'],
         relative_to=__file__,
         with_cuda=False)
 
@@ -0,0 +1,141 @@
+// Copyright 2016-present, Facebook, Inc.
+// All rights reserved.
+//
+// This source code is licensed under the license found in the
+// LICENSE file in the root directory of this source tree.
+
+// Micro-benchmark of the CPU submanifold convolution passes: the reference
+// Convolution_{Forward,Backward}Pass against the OpenMP versions, for
+// the 3x3x3 layer widths used by ssc/*/sscnet.py, on a synthetic scene of
+// walls, floor and boxes in a 256^3 volume (similar in sparsity to SUNCG).
+//
+// Build from PyTorch/sparseconvnet/SCN, with TORCH=<python -c "import torch,
+// os; print(os.path.dirname(torch.__file__))">:
+//   g++ -std=c++11 -O3 -fopenmp -DENABLE_OPENMP -I. -I$TORCH/lib/include \
+//     -I$TORCH/lib/include/TH benchmark/convolution.cpp -o conv_benchmark \
+//     -L$TORCH/lib -l:libTH.so.1 -Wl,-rpath,$TORCH/lib
+//   OMP_NUM_THREADS=8 ./conv_benchmark
+
+#include <TH/TH.h>
+#include "generic/SparseConvNet.h"
+#include "generic/Geometry/Metadata.h"
+#include "generic/CPU/Convolution.h"
+#include <chrono>
+#include <cmath>
+#include <cstdio>
+#include <random>
+
+void addSite(SparseGrid<3> &grid, Int x, Int y, Int z) {
+  Point<3> p{x, y, z};
+  if (grid.mp.find(p) == grid.mp.end()) {
+    uInt n = grid.mp.size();
+    grid.mp[p] = n;
+  }
+}
+
+// A room: floor, four walls and some boxes, two voxels thick
+void makeScene(SparseGrid<3> &grid, std::mt19937 &rng) {
+  Int x0 = 8, x1 = 248, y0 = 56, y1 = 200, z0 = 8, z1 = 248;
+  for (Int a = x0; a < x1; a++)
+    for (Int b = z0; b < z1; b++)
+      for (Int t = 0; t < 2; t++)
+        addSite(grid, a, y0 + t, b);
+  for (Int a = x0; a < x1; a++)
+    for (Int b = y0; b < y1; b++)
+      for (Int t = 0; t < 2; t++) {
+        addSite(grid, a, b, z0 + t);
+        addSite(grid, a, b, z1 - 1 - t);
+      }
+  for (Int a = z0; a < z1; a++)
+    for (Int b = y0; b < y1; b++)
+      for (Int t = 0; t < 2; t++) {
+        addSite(grid, x0 + t, b, a);
+        addSite(grid, x1 - 1 - t, b, a);
+      }
+  for (int box = 0; box < 12; box++) {
+    Int bx = x0 + 10 + rng() % 180, bz = z0 + 10 + rng() % 180;
+    Int s = 10 + rng() % 40, h = 10 + rng() % 60;
+    for (Int a = bx; a < bx + s; a++)
+      for (Int b = bz; b < bz + s; b++)
+        for (Int c = y0; c < y0 + h; c++)
+          if (a == bx or a == bx + s - 1 or b == bz or b == bz + s - 1 or
+              c == y0 + h - 1)
+            addSite(grid, a, c, b);
+  }
+}
+
+template <typename F> double timeIt(F f, int repeat) {
+  f(); // warm up
+  auto start = std::chrono::steady_clock::now();
+  for (int i = 0; i < repeat; i++)
+    f();
+  return std::chrono::duration<double>(std::chrono::steady_clock::now() -
+                                       start)
+             .count() /
+         repeat * 1000;
+}
+
+int main(int argc, char **argv) {
+  int repeat = argc > 1 ? atoi(argv[1]) : 5;
+  std::mt19937 rng(0);
+  SparseGrids<3> SGs(1);
+  makeScene(SGs[0], rng);
+  uInt nActive = SGs[0].mp.size();
+  long size[3] = {3, 3, 3};
+  RuleBook rules;
+  ValidConvolution_SgsToRules_OMP(SGs, rules, size);
+  printf("%u active sites, %u rules\n", nActive, ruleBookTotalSize(rules) / 2);
+
+  uInt planes[][2] = {{16, 16}, {32, 32}, {64, 64}};
+  for (auto &pl : planes) {
+    uInt ip = pl[0], op = pl[1];
+    std::uniform_real_distribution<float> u(-1, 1);
+    std::vector<float> input(nActive * ip), output(nActive * op),
+        output2(nActive * op), d_output(nActive * op), d_input(nActive * ip),
+        weight(27 * ip * op), d_weight(27 * ip * op), bias(op), d_bias(op);
+    for (auto &x : input)
+      x = u(rng);
+    for (auto &x : d_output)
+      x = u(rng);
+    for (auto &x : weight)
+      x = u(rng);
+
+    double fwd = timeIt(
+        [&]() {
+          Convolution_ForwardPass<float>(&input[0], ip, ip, &output[0], op,
+                                         op, &weight[0], &bias[0], rules,
+                                         nActive, THFloatBlas_gemm);
+        },
+        repeat);
+    double fwdOMP = timeIt(
+        [&]() {
+          Convolution_ForwardPass_OMP<float>(&input[0], ip, ip, &output2[0],
+                                             op, op, &weight[0], &bias[0],
+                                             rules, nActive, THFloatBlas_gemm);
+        },
+        repeat);
+    double err = 0;
+    for (uInt i = 0; i < output.size(); i++)
+      err = std::max(err, (double)std::fabs(output[i] - output2[i]));
+
+    double bwd = timeIt(
+        [&]() {
+          std::fill(d_input.begin(), d_input.end(), 0);
+          Convolution_BackwardPass<float>(
+              &input[0], &d_input[0], ip, ip, &d_output[0], op, op, &weight[0],
+              &d_weight[0], &d_bias[0], rules, nActive, THFloatBlas_gemm);
+        },
+        repeat);
+    double bwdOMP = timeIt(
+        [&]() {
+          std::fill(d_input.begin(), d_input.end(), 0);
+          Convolution_BackwardPass_OMP<float>(
+              &input[0], &d_input[0], ip, ip, &d_output[0], op, op, &weight[0],
+              &d_weight[0], &d_bias[0], rules, nActive, THFloatBlas_gemm);
+        },
+        repeat);
+    printf("%2u->%2u planes  forward %8.2fms -> %8.2fms   backward %8.2fms -> "
+           "%8.2fms   max|diff| %g\n",
+           ip, op, fwd, fwdOMP, bwd, bwdOMP, err);
+  }
+}
@@ -15,7 +15,7 @@ extern "C" void scn_DR_(ActivePooling_updateOutput)(
 
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
   uInt nPlanes = input_features->size[1];
-  auto _rules = _m.getActivePoolingRuleBook(inputSize);
+  auto &_rules = _m.getActivePoolingRuleBook(inputSize);
   uInt batchSize = _rules[1][0];
   uInt maxActive = _rules[1][1];
   THTensor_(resize2d)(output_features, batchSize, nPlanes);
@@ -32,7 +32,7 @@ extern "C" void scn_DR_(ActivePooling_updateGradInput)(
 
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
   uInt nPlanes = input_features->size[1];
-  auto _rules = _m.getActivePoolingRuleBook(inputSize);
+  auto &_rules = _m.getActivePoolingRuleBook(inputSize);
   uInt batchSize = _rules[1][0];
   uInt maxActive = _rules[1][1];
   THTensor_(resizeAs)(d_input_features, input_features);
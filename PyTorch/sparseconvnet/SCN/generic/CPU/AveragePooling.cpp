@@ -16,7 +16,7 @@ extern "C" void scn_DR_(AveragePooling_updateOutput)(
 
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
   uInt nPlanes = input_features->size[1] - nFeaturesToDrop;
-  auto _rules =
+  auto &_rules =
       _m.getRuleBook(inputSize, outputSize, poolSize, poolStride, true);
   uInt nActive = _m.getNActive(outputSize);
   THTensor_(resize2d)(output_features, nActive,
@@ -26,7 +26,7 @@ extern "C" void scn_DR_(AveragePooling_updateOutput)(
   auto iF = THTensor_(data)(input_features) + nFeaturesToDrop;
   auto oF = THTensor_(data)(output_features);
 
-  for (auto &r : _rules) {
+  for (auto r : _rules) {
     uInt nHot = r.size() / 2;
     AveragePooling_ForwardPass<real>(iF, oF, nPlanes, input_features->stride[0],
                                      output_features->stride[0], &r[0], nHot,
@@ -41,7 +41,7 @@ extern "C" void scn_DR_(AveragePooling_updateGradInput)(
 
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
   uInt nPlanes = input_features->size[1] - nFeaturesToDrop;
-  auto _rules =
+  auto &_rules =
       _m.getRuleBook(inputSize, outputSize, poolSize, poolStride, true);
   uInt nActive = _m.getNActive(outputSize);
   THTensor_(resizeAs)(d_input_features, input_features);
@@ -50,7 +50,7 @@ extern "C" void scn_DR_(AveragePooling_updateGradInput)(
   auto diF = THTensor_(data)(d_input_features) + nFeaturesToDrop;
   auto doF = THTensor_(data)(d_output_features);
 
-  for (auto &r : _rules) {
+  for (auto r : _rules) {
     uInt nHot = r.size() / 2;
     AveragePooling_BackwardPass<real>(
         diF, doF, nPlanes, input_features->stride[0],
@@ -16,7 +16,7 @@ extern "C" double scn_DR_(Convolution_updateOutput)(
     long filterVolume, void *rulesBuffer) {
 
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
-  auto _rules =
+  auto &_rules =
       _m.getRuleBook(inputSize, outputSize, filterSize, filterStride, true);
   uInt nActive = _m.getNActive(outputSize);
   THTensor_(resize2d)(output_features, nActive, weight->size[1]);
@@ -31,9 +31,9 @@ extern "C" double scn_DR_(Convolution_updateOutput)(
     auto op = output_features->size[1];
     auto w = THTensor_(data)(weight);
     auto b = THOptionalTensorData(bias);
-    Convolution_ForwardPass(iF, ip, ip, oF, op, op, w, b, _rules, nActive,
-                            THBlas_(gemm));
-    for (auto &r : _rules)
+    Convolution_ForwardPass_OMP(iF, ip, ip, oF, op, op, w, b, _rules,
+                                nActive, THBlas_(gemm));
+    for (auto r : _rules)
       flops += r.size() / 2 * ip * op;
   }
   return flops;
@@ -47,7 +47,7 @@ extern "C" void scn_DR_(Convolution_backward)(
     void *rulesBuffer) {
 
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
-  auto _rules =
+  auto &_rules =
       _m.getRuleBook(inputSize, outputSize, filterSize, filterStride, true);
   uInt nActive = _m.getNActive(outputSize);
   THTensor_(resizeAs)(d_input_features, input_features);
@@ -63,8 +63,8 @@ extern "C" void scn_DR_(Convolution_backward)(
     auto dw = THTensor_(data)(d_weight);
     auto db = THOptionalTensorData(d_bias);
 
-    Convolution_BackwardPass(iF, diF, ip, ip, doF, op, op, w, dw, db, _rules,
-                             nActive, THBlas_(gemm));
+    Convolution_BackwardPass_OMP(iF, diF, ip, ip, doF, op, op, w, dw, db,
+                                 _rules, nActive, THBlas_(gemm));
   }
 }
 
@@ -74,7 +74,7 @@ extern "C" double scn_DR_(ValidConvolution_updateOutput)(
     THTensor *bias, long filterVolume, void *rulesBuffer) {
 
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
-  auto _rules = _m.getValidRuleBook(inputSize, filterSize, true);
+  auto &_rules = _m.getValidRuleBook(inputSize, filterSize, true);
   uInt nActive = _m.getNActive(inputSize);
   THTensor_(resize2d)(output_features, nActive, weight->size[1]);
   if (not bias)
@@ -89,9 +89,9 @@ extern "C" double scn_DR_(ValidConvolution_updateOutput)(
     auto w = THTensor_(data)(weight);
     auto b = THOptionalTensorData(bias);
 
-    Convolution_ForwardPass(iF, ip, ip, oF, op, op, w, b, _rules, nActive,
-                            THBlas_(gemm));
-    for (auto &r : _rules)
+    Convolution_ForwardPass_OMP(iF, ip, ip, oF, op, op, w, b, _rules,
+                                nActive, THBlas_(gemm));
+    for (auto r : _rules)
       flops += r.size() / 2 * ip * op;
   }
   return flops;
@@ -104,7 +104,7 @@ extern "C" void scn_DR_(ValidConvolution_backward)(
     THTensor *d_bias, long filterVolume, void *rulesBuffer) {
 
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
-  auto _rules = _m.getValidRuleBook(inputSize, filterSize, true);
+  auto &_rules = _m.getValidRuleBook(inputSize, filterSize, true);
   uInt nActive = _m.getNActive(inputSize);
   THTensor_(resizeAs)(d_input_features, input_features);
   THTensor_(zero)(d_input_features);
@@ -119,8 +119,8 @@ extern "C" void scn_DR_(ValidConvolution_backward)(
     auto dw = THTensor_(data)(d_weight);
     auto db = THOptionalTensorData(d_bias);
 
-    Convolution_BackwardPass(iF, diF, ip, ip, doF, op, op, w, dw, db, _rules,
-                             nActive, THBlas_(gemm));
+    Convolution_BackwardPass_OMP(iF, diF, ip, ip, doF, op, op, w, dw, db,
+                                 _rules, nActive, THBlas_(gemm));
   }
 }
 #endif
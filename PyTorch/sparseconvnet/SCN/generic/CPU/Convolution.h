@@ -7,6 +7,7 @@
 #ifndef CPU_CONVOLUTION_H
 #define CPU_CONVOLUTION_H
 #include "../SparseConvNet.h"
+#include <algorithm>
 #include <cstring>
 // buffer must have size >= nHot * (nIn+nOut)
 
@@ -24,7 +25,7 @@ void Convolution_ForwardPass(
         output_features[row * output_nPLANES + column] = bias[column];
 
   std::vector<T> input_buffer, output_buffer;
-  for (auto &r : rules) {
+  for (auto r : rules) {
     uInt nHot = r.size() / 2;
     input_buffer.resize(nHot * input_nPlanes);
     output_buffer.resize(nHot * output_nPlanes);
@@ -71,7 +72,7 @@ void Convolution_BackwardPass(
         d_bias[i] += d_output_features[row * output_nPLANES + i];
 
   std::vector<T> input_buffer, output_buffer;
-  for (auto &r : rules) {
+  for (auto r : rules) {
     uInt nHot = r.size() / 2;
     input_buffer.resize(nHot * input_nPlanes);
     output_buffer.resize(nHot * output_nPlanes);
@@ -124,4 +125,139 @@ void Convolution_BackwardPass(
     d_weight += input_nPlanes * output_nPlanes;
   }
 }
+// OpenMP versions of the passes above. OpenMP only parallelizes the gathers
+// and scatter-adds; gemm is called outside the parallel regions, once per
+// filter offset as in the serial passes, so a multithreaded BLAS is never
+// entered from several threads at once (pthread OpenBLAS is not thread-safe)
+// and does not compete with the OpenMP threads for cores. For a fixed filter
+// offset every output (and every input) site occurs in at most one rule, so
+// the scatter-adds never write to the same row.
+//
+// Determinism: the output, d_input and d_weight are summed in the same order
+// as in the serial passes, so they match them exactly. d_bias is summed over
+// fixed blocks of Convolution_TileSize rows, which are then added up in block
+// order: the result does not depend on the number of threads or on
+// scheduling, but may differ from the serial pass in the last bits.
+const uInt Convolution_TileSize = 256;
+
+template <typename T>
+inline void Convolution_AddRow(T *__restrict__ dst, const T *__restrict__ src,
+                               uInt n) {
+#pragma omp simd
+  for (uInt k = 0; k < n; k++)
+    dst[k] += src[k];
+}
+
+// rows[i] = features[r[2 * i + side] * nPLANES], for i < nHot
+template <typename T>
+void Convolution_Gather(T *rows, T *features, uInt nPlanes, uInt nPLANES,
+                        RuleBookRow &r, uInt side, uInt nHot) {
+  uInt row;
+#pragma omp parallel for private(row)
+  for (row = 0; row < nHot; row++)
+    std::memcpy(&rows[row * nPlanes], features + r[2 * row + side] * nPLANES,
+                sizeof(T) * nPlanes);
+}
+
+// features[r[2 * i + side] * nPLANES] += rows[i], for i < nHot
+template <typename T>
+void Convolution_ScatterAdd(T *features, T *rows, uInt nPlanes, uInt nPLANES,
+                            RuleBookRow &r, uInt side, uInt nHot) {
+  uInt row;
+#pragma omp parallel for private(row)
+  for (row = 0; row < nHot; row++)
+    Convolution_AddRow(&features[r[2 * row + side] * nPLANES],
+                       &rows[row * nPlanes], nPlanes);
+}
+
+template <typename T>
+void Convolution_ForwardPass_OMP(
+    T *input_features, uInt input_nPlanes, uInt input_nPLANES,
+    T *output_features, uInt output_nPlanes, uInt output_nPLANES, T *weight,
+    T *bias, RuleBook &rules, uInt output_nActive,
+    void (*gemm)(char transa, char transb, long m, long n, long k, T alpha,
+                 T *a, long lda, T *b, long ldb, T beta, T *c, long ldc)) {
+
+  if (bias != nullptr) { // Set bias
+    uInt row;
+#pragma omp parallel for private(row)
+    for (row = 0; row < output_nActive; row++)
+      std::memcpy(&output_features[row * output_nPLANES], bias,
+                  sizeof(T) * output_nPlanes);
+  }
+
+  std::vector<T> input_buffer, output_buffer;
+  for (auto r : rules) {
+    uInt nHot = r.size() / 2;
+    if (nHot == 0) {
+      weight += input_nPlanes * output_nPlanes;
+      continue;
+    }
+    input_buffer.resize(nHot * input_nPlanes);
+    output_buffer.resize(nHot * output_nPlanes);
+    Convolution_Gather(&input_buffer[0], input_features, input_nPlanes,
+                       input_nPLANES, r, 0, nHot);
+    (*gemm)('n', 'n', output_nPlanes, nHot, input_nPlanes, 1, weight,
+            output_nPlanes, &input_buffer[0], input_nPlanes, 0,
+            &output_buffer[0], output_nPlanes);
+    weight += input_nPlanes * output_nPlanes;
+    Convolution_ScatterAdd(output_features, &output_buffer[0], output_nPlanes,
+                           output_nPLANES, r, 1, nHot);
+  }
+}
+
+template <typename T>
+void Convolution_BackwardPass_OMP(
+    T *input_features, T *d_input_features, uInt input_nPlanes,
+    uInt input_nPLANES, T *d_output_features, uInt output_nPlanes,
+    uInt output_nPLANES, T *weight, T *d_weight, T *d_bias, RuleBook &rules,
+    uInt output_nActive,
+    void (*gemm)(char transa, char transb, long m, long n, long k, T alpha,
+                 T *a, long lda, T *b, long ldb, T beta, T *c, long ldc)) {
+
+  if (d_bias) {
+    // one partial sum per block of rows, added up in block order
+    uInt nBlocks = (output_nActive + Convolution_TileSize - 1) /
+                   Convolution_TileSize;
+    std::vector<T> db(nBlocks * output_nPlanes, 0);
+    uInt block;
+#pragma omp parallel for private(block) schedule(static)
+    for (block = 0; block < nBlocks; block++) {
+      uInt end = std::min((block + 1) * Convolution_TileSize, output_nActive);
+      for (uInt row = block * Convolution_TileSize; row < end; row++)
+        Convolution_AddRow(&db[block * output_nPlanes],
+                           &d_output_features[row * output_nPLANES],
+                           output_nPlanes);
+    }
+    for (block = 0; block < nBlocks; block++)
+      Convolution_AddRow(d_bias, &db[block * output_nPlanes], output_nPlanes);
+  }
+
+  std::vector<T> input_buffer, output_buffer;
+  for (auto r : rules) {
+    uInt nHot = r.size() / 2;
+    if (nHot == 0) {
+      weight += input_nPlanes * output_nPlanes;
+      d_weight += input_nPlanes * output_nPlanes;
+      continue;
+    }
+    input_buffer.resize(nHot * input_nPlanes);
+    output_buffer.resize(nHot * output_nPlanes);
+    Convolution_Gather(&output_buffer[0], d_output_features, output_nPlanes,
+                       output_nPLANES, r, 1, nHot);
+    (*gemm)('t', 'n', input_nPlanes, nHot, output_nPlanes, 1, weight,
+            output_nPlanes, &output_buffer[0], output_nPlanes, 0,
+            &input_buffer[0], input_nPlanes);
+    weight += input_nPlanes * output_nPlanes;
+    Convolution_ScatterAdd(d_input_features, &input_buffer[0], input_nPlanes,
+                           input_nPLANES, r, 0, nHot);
+
+    Convolution_Gather(&input_buffer[0], input_features, input_nPlanes,
+                       input_nPLANES, r, 0, nHot);
+    (*gemm)('n', 't', output_nPlanes, input_nPlanes, nHot, 1,
+            &output_buffer[0], output_nPlanes, &input_buffer[0],
+            input_nPlanes, 1, d_weight, output_nPlanes);
+    d_weight += input_nPlanes * output_nPlanes;
+  }
+}
 #endif /* CPU_CONVOLUTION_H */
@@ -16,7 +16,7 @@ extern "C" double scn_DR_(Deconvolution_updateOutput)(
     long filterVolume, void *rulesBuffer) {
 
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
-  auto _rules =
+  auto &_rules =
       _m.getRuleBook(outputSize, inputSize, filterSize, filterStride, true);
   uInt nActive = _m.getNActive(outputSize);
   THTensor_(resize2d)(output_features, nActive, weight->size[1]);
@@ -33,7 +33,7 @@ extern "C" double scn_DR_(Deconvolution_updateOutput)(
   Deconvolution_ForwardPass(iF, ip, ip, oF, op, op, w, b, _rules, nActive,
                             THBlas_(gemm));
   double flops = 0;
-  for (auto &r : _rules)
+  for (auto r : _rules)
     flops += r.size() / 2 * ip * op;
   return flops;
 }
@@ -46,7 +46,7 @@ extern "C" void scn_DR_(Deconvolution_backward)(
     void *rulesBuffer) {
 
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
-  auto _rules =
+  auto &_rules =
       _m.getRuleBook(outputSize, inputSize, filterSize, filterStride, true);
   uInt nActive = _m.getNActive(outputSize);
   THTensor_(resizeAs)(d_input_features, input_features);
@@ -9,6 +9,10 @@
 #include "../SparseConvNet.h"
 #include <cstring>
 // buffer must have size >= nHot * (nIn+nOut)
+//
+// For a fixed filter offset each input and each output site occurs in at most
+// one rule, so the per-offset gather and scatter loops are free of write
+// conflicts and can be split across OpenMP threads.
 
 template <typename T>
 void Deconvolution_ForwardPass(
@@ -18,17 +22,22 @@ void Deconvolution_ForwardPass(
     void (*gemm)(char transa, char transb, long m, long n, long k, T alpha,
                  T *a, long lda, T *b, long ldb, T beta, T *c, long ldc)) {
 
-  if (bias != nullptr) // Set bias
-    for (uInt row = 0; row < output_nActive; row++)
+  if (bias != nullptr) { // Set bias
+    uInt row;
+#pragma omp parallel for private(row)
+    for (row = 0; row < output_nActive; row++)
       for (uInt column = 0; column < output_nPlanes; column++)
         output_features[row * output_nPLANES + column] = bias[column];
+  }
 
   std::vector<T> input_buffer, output_buffer;
-  for (auto &r : rules) {
+  for (auto r : rules) {
     uInt nHot = r.size() / 2;
     input_buffer.resize(nHot * input_nPlanes);
     output_buffer.resize(nHot * output_nPlanes);
-    for (uInt row = 0; row < nHot; row++)
+    uInt row;
+#pragma omp parallel for private(row)
+    for (row = 0; row < nHot; row++)
       std::memcpy(&input_buffer[row * input_nPlanes],
                   input_features + r[2 * row + 1] * input_nPLANES,
                   sizeof(T) * input_nPlanes);
@@ -48,7 +57,8 @@ void Deconvolution_ForwardPass(
             &output_buffer[0], output_nPlanes // r
             );
     weight += input_nPlanes * output_nPlanes;
-    for (uInt row = 0; row < nHot; row++) {
+#pragma omp parallel for private(row)
+    for (row = 0; row < nHot; row++) {
       T *b = &output_buffer[row * output_nPlanes];
       T *o = &output_features[r[2 * row] * output_nPLANES];
       for (uInt k = 0; k < output_nPlanes; k++)
@@ -72,11 +82,13 @@ void Deconvolution_BackwardPass(
         d_bias[i] += d_output_features[row * output_nPLANES + i];
 
   std::vector<T> input_buffer, output_buffer;
-  for (auto &r : rules) {
+  for (auto r : rules) {
     uInt nHot = r.size() / 2;
     input_buffer.resize(nHot * input_nPlanes);
     output_buffer.resize(nHot * output_nPlanes);
-    for (uInt row = 0; row < nHot; row++)
+    uInt row;
+#pragma omp parallel for private(row)
+    for (row = 0; row < nHot; row++)
       std::memcpy(&output_buffer[row * output_nPlanes],
                   &d_output_features[r[2 * row] * output_nPLANES],
                   sizeof(T) * output_nPlanes);
@@ -96,14 +108,16 @@ void Deconvolution_BackwardPass(
             &input_buffer[0], input_nPlanes    // r
             );
     weight += input_nPlanes * output_nPlanes;
-    for (uInt row = 0; row < nHot; row++) {
+#pragma omp parallel for private(row)
+    for (row = 0; row < nHot; row++) {
       T *b = &input_buffer[row * input_nPlanes];
       T *i = &d_input_features[r[2 * row + 1] * input_nPLANES];
       for (uInt k = 0; k < input_nPlanes; k++)
         i[k] += b[k];
     }
 
-    for (uInt row = 0; row < nHot; row++)
+#pragma omp parallel for private(row)
+    for (row = 0; row < nHot; row++)
       std::memcpy(&input_buffer[row * input_nPlanes],
                   input_features + r[2 * row + 1] * input_nPLANES,
                   sizeof(T) * input_nPlanes);
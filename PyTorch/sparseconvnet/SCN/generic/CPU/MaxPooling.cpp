@@ -16,7 +16,7 @@ extern "C" void scn_DR_(MaxPooling_updateOutput)(
 
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
   uInt nPlanes = input_features->size[1] - nFeaturesToDrop;
-  auto _rules =
+  auto &_rules =
       _m.getRuleBook(inputSize, outputSize, poolSize, poolStride, true);
   uInt nActive = _m.getNActive(outputSize);
   THTensor_(resize2d)(output_features, nActive,
@@ -26,7 +26,7 @@ extern "C" void scn_DR_(MaxPooling_updateOutput)(
   auto iF = THTensor_(data)(input_features) + nFeaturesToDrop;
   auto oF = THTensor_(data)(output_features);
 
-  for (auto &r : _rules) {
+  for (auto r : _rules) {
     uInt nHot = r.size() / 2;
     MaxPooling_ForwardPass<real>(iF, oF, nPlanes, input_features->stride[0],
                                  output_features->stride[0], &r[0], nHot);
@@ -40,7 +40,7 @@ extern "C" void scn_DR_(MaxPooling_updateGradInput)(
 
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
   uInt nPlanes = input_features->size[1] - nFeaturesToDrop;
-  auto _rules =
+  auto &_rules =
       _m.getRuleBook(inputSize, outputSize, poolSize, poolStride, true);
   uInt nActive = _m.getNActive(outputSize);
   THTensor_(resizeAs)(d_input_features, input_features);
@@ -51,7 +51,7 @@ extern "C" void scn_DR_(MaxPooling_updateGradInput)(
   auto diF = THTensor_(data)(d_input_features);
   auto doF = THTensor_(data)(d_output_features);
 
-  for (auto &r : _rules) {
+  for (auto r : _rules) {
     uInt nHot = r.size() / 2;
     MaxPooling_BackwardPass<real>(iF, diF, oF, doF, nPlanes,
                                   input_features->stride[0],
@@ -24,12 +24,12 @@ extern "C" void scn_DR_(SparseToDense_updateOutput)(
     THTensor_(zero)(output_features);
   }
   if (input_features->nDimension == 2) {
-    auto _rules = _m.getSparseToDenseRuleBook(inputSize, true);
+    auto &_rules = _m.getSparseToDenseRuleBook(inputSize, true);
     uInt nPlanes = input_features->size[1];
     auto iF = THTensor_(data)(input_features);
     auto oF = THTensor_(data)(output_features);
     long spatialVolume = THLongTensor_prodall(inputSize);
-    for (auto &r : _rules) {
+    for (auto r : _rules) {
       uInt nHot = r.size() / 2;
       SparseToDense_ForwardPass<real>(iF, oF, nPlanes, spatialVolume, &r[0],
                                       nHot);
@@ -45,14 +45,14 @@ extern "C" void scn_DR_(SparseToDense_updateGradInput)(
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
   THTensor_(resizeAs)(d_input_features, input_features);
   THTensor_(zero)(d_input_features);
-  auto _rules = _m.getSparseToDenseRuleBook(inputSize, true);
+  auto &_rules = _m.getSparseToDenseRuleBook(inputSize, true);
   if (input_features->nDimension == 2) {
     long spatialVolume = THLongTensor_prodall(inputSize);
     uInt nPlanes = d_input_features->size[1];
     auto diF = THTensor_(data)(d_input_features);
     auto doF = THTensor_(data)(d_output_features);
 
-    for (auto &r : _rules) {
+    for (auto r : _rules) {
       uInt nHot = r.size() / 2;
       SparseToDense_BackwardPass<real>(diF, doF, nPlanes, spatialVolume, &r[0],
                                        nHot);
@@ -0,0 +1,73 @@
+// Copyright 2016-present, Facebook, Inc.
+// All rights reserved.
+//
+// This source code is licensed under the license found in the
+// LICENSE file in the root directory of this source tree.
+
+#ifndef TH_GENERIC_FILE_
+#define TH_GENERIC_FILE_ "generic/CPU/SubmanifoldConvolution.cpp"
+#else
+#include "SubmanifoldConvolution.h"
+
+// ValidConvolution computed from the neighbour table rather than the rulebook.
+// The filter size must be odd in every dimension.
+
+extern "C" double scn_DR_(SubmanifoldConvolution_updateOutput)(
+    THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+    THTensor *input_features, THTensor *output_features, THTensor *weight,
+    THTensor *bias, long filterVolume, void *rulesBuffer) {
+
+  SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
+  for (uInt i = 0; i < Dimension; i++)
+    assert(THLongTensor_data(filterSize)[i] % 2 == 1 &&
+           "SubmanifoldConvolution needs an odd filter size");
+  auto &table = _m.getNeighbourTable(inputSize, filterSize, true);
+  uInt nActive = _m.getNActive(inputSize);
+  THTensor_(resize2d)(output_features, nActive, weight->size[1]);
+
+  double flops = 0;
+  if (nActive) {
+    auto iF = THTensor_(data)(input_features);
+    auto oF = THTensor_(data)(output_features);
+    auto ip = input_features->size[1];
+    auto op = output_features->size[1];
+    auto w = THTensor_(data)(weight);
+    auto b = THOptionalTensorData(bias);
+    uInt sd = table.size() / nActive;
+
+    SubmanifoldConvolution_ForwardPass(iF, ip, oF, op, w, b, &table[0], sd,
+                                       nActive);
+    auto &_rules = _m.getValidRuleBook(inputSize, filterSize, true);
+    flops = (double)ruleBookTotalSize(_rules) / 2 * ip * op;
+  }
+  return flops;
+}
+
+extern "C" void scn_DR_(SubmanifoldConvolution_backward)(
+    THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+    THTensor *input_features, THTensor *d_input_features,
+    THTensor *d_output_features, THTensor *weight, THTensor *d_weight,
+    THTensor *d_bias, long filterVolume, void *rulesBuffer) {
+
+  SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
+  auto &table = _m.getNeighbourTable(inputSize, filterSize, true);
+  uInt nActive = _m.getNActive(inputSize);
+  THTensor_(resizeAs)(d_input_features, input_features);
+  THTensor_(zero)(d_input_features);
+
+  if (nActive) {
+    auto iF = THTensor_(data)(input_features);
+    auto diF = THTensor_(data)(d_input_features);
+    auto doF = THTensor_(data)(d_output_features);
+    auto ip = input_features->size[1];
+    auto op = d_output_features->size[1];
+    auto w = THTensor_(data)(weight);
+    auto dw = THTensor_(data)(d_weight);
+    auto db = THOptionalTensorData(d_bias);
+    uInt sd = table.size() / nActive;
+
+    SubmanifoldConvolution_BackwardPass(iF, diF, ip, doF, op, w, dw, db,
+                                        &table[0], sd, nActive);
+  }
+}
+#endif
@@ -0,0 +1,170 @@
+// Copyright 2016-present, Facebook, Inc.
+// All rights reserved.
+//
+// This source code is licensed under the license found in the
+// LICENSE file in the root directory of this source tree.
+
+#ifndef CPU_SUBMANIFOLDCONVOLUTION_H
+#define CPU_SUBMANIFOLDCONVOLUTION_H
+#include "../SparseConvNet.h"
+#include "Convolution.h"
+#include <algorithm>
+#include <cstring>
+
+// Output-stationary submanifold convolution. Instead of gathering the rules
+// for each filter offset into buffers and calling gemm, each output row is
+// accumulated directly from its (up to filterVolume) active neighbours, read
+// from an nActive x filterVolume neighbour table (uInt_MAX = no neighbour).
+// Output rows are processed in blocks of SubmanifoldConvolution_BlockSize;
+// within a block the filter offsets are the outer loop, so each weight
+// matrix is read from cache once per block. Every row is written by exactly
+// one thread.
+const uInt SubmanifoldConvolution_BlockSize = 64;
+
+// o += i * w, with i a row of nIn features and w an nIn x nOut matrix
+template <typename T>
+inline void SubmanifoldConvolution_MulAdd(T *__restrict__ o,
+                                          const T *__restrict__ i,
+                                          const T *__restrict__ w, uInt nIn,
+                                          uInt nOut) {
+  for (uInt c = 0; c < nIn; c++) {
+    T x = i[c];
+    const T *wc = w + c * nOut;
+#pragma omp simd
+    for (uInt k = 0; k < nOut; k++)
+      o[k] += x * wc[k];
+  }
+}
+
+// i += o * T(w), with o a row of nOut features and w an nIn x nOut matrix
+template <typename T>
+inline void SubmanifoldConvolution_MulAddT(T *__restrict__ i,
+                                           const T *__restrict__ o,
+                                           const T *__restrict__ w, uInt nIn,
+                                           uInt nOut) {
+  for (uInt c = 0; c < nIn; c++) {
+    const T *wc = w + c * nOut;
+    T s = 0;
+#pragma omp simd reduction(+ : s)
+    for (uInt k = 0; k < nOut; k++)
+      s += o[k] * wc[k];
+    i[c] += s;
+  }
+}
+
+// w += T(i) * o, the outer product of rows of nIn and nOut features
+template <typename T>
+inline void SubmanifoldConvolution_OuterAdd(T *__restrict__ w,
+                                            const T *__restrict__ i,
+                                            const T *__restrict__ o, uInt nIn,
+                                            uInt nOut) {
+  for (uInt c = 0; c < nIn; c++) {
+    T x = i[c];
+    T *wc = w + c * nOut;
+#pragma omp simd
+    for (uInt k = 0; k < nOut; k++)
+      wc[k] += x * o[k];
+  }
+}
+
+template <typename T>
+void SubmanifoldConvolution_ForwardPass(T *input_features, uInt input_nPlanes,
+                                        T *output_features,
+                                        uInt output_nPlanes, T *weight,
+                                        T *bias, uInt *neighbours,
+                                        uInt filterVolume, uInt nActive) {
+  uInt nWeights = input_nPlanes * output_nPlanes;
+  uInt nBlocks = (nActive + SubmanifoldConvolution_BlockSize - 1) /
+                 SubmanifoldConvolution_BlockSize;
+  uInt block;
+#pragma omp parallel for private(block) schedule(static)
+  for (block = 0; block < nBlocks; block++) {
+    uInt start = block * SubmanifoldConvolution_BlockSize;
+    uInt end = std::min(start + SubmanifoldConvolution_BlockSize, nActive);
+    for (uInt row = start; row < end; row++)
+      if (bias)
+        std::memcpy(&output_features[row * output_nPlanes], bias,
+                    sizeof(T) * output_nPlanes);
+      else
+        std::fill(&output_features[row * output_nPlanes],
+                  &output_features[(row + 1) * output_nPlanes], 0);
+    for (uInt k = 0; k < filterVolume; k++)
+      for (uInt row = start; row < end; row++) {
+        uInt j = neighbours[row * filterVolume + k];
+        if (j != uInt_MAX)
+          SubmanifoldConvolution_MulAdd(
+              &output_features[row * output_nPlanes],
+              &input_features[j * input_nPlanes], weight + k * nWeights,
+              input_nPlanes, output_nPlanes);
+      }
+  }
+}
+
+// For an odd filter size, input j feeds output i through offset k exactly
+// when input i feeds output j through the mirrored offset filterVolume-1-k,
+// so d_input can also be computed row by row from the neighbour table.
+template <typename T>
+void SubmanifoldConvolution_BackwardPass(
+    T *input_features, T *d_input_features, uInt input_nPlanes,
+    T *d_output_features, uInt output_nPlanes, T *weight, T *d_weight,
+    T *d_bias, uInt *neighbours, uInt filterVolume, uInt nActive) {
+  uInt nWeights = input_nPlanes * output_nPlanes;
+  uInt nBlocks = (nActive + SubmanifoldConvolution_BlockSize - 1) /
+                 SubmanifoldConvolution_BlockSize;
+#if defined(ENABLE_OPENMP)
+  uInt nThreads = omp_get_max_threads();
+#else
+  uInt nThreads = 1;
+#endif
+  // per-thread partial sums of d_weight and d_bias, added up in thread order
+  // afterwards (rather than as each thread finishes), so that the gradients
+  // are reproducible for a given number of threads
+  std::vector<std::vector<T>> dws(nThreads), dbs(nThreads);
+#pragma omp parallel num_threads(nThreads)
+  {
+#if defined(ENABLE_OPENMP)
+    uInt t = omp_get_thread_num();
+#else
+    uInt t = 0;
+#endif
+    std::vector<T> &dw = dws[t], &db = dbs[t];
+    dw.assign(filterVolume * nWeights, 0);
+    db.assign(output_nPlanes, 0);
+    uInt block;
+#pragma omp for private(block) schedule(static)
+    for (block = 0; block < nBlocks; block++) {
+      uInt start = block * SubmanifoldConvolution_BlockSize;
+      uInt end = std::min(start + SubmanifoldConvolution_BlockSize, nActive);
+      if (d_bias)
+        for (uInt row = start; row < end; row++)
+          Convolution_AddRow(&db[0], &d_output_features[row * output_nPlanes],
+                             output_nPlanes);
+      for (uInt k = 0; k < filterVolume; k++) {
+        T *w = weight + (filterVolume - 1 - k) * nWeights;
+        for (uInt row = start; row < end; row++) {
+          uInt j = neighbours[row * filterVolume + k];
+          if (j == uInt_MAX)
+            continue;
+          // output j receives input row through the mirrored offset
+          SubmanifoldConvolution_MulAddT(
+              &d_input_features[row * input_nPlanes],
+              &d_output_features[j * output_nPlanes], w, input_nPlanes,
+              output_nPlanes);
+          // input j contributed to output row through offset k
+          SubmanifoldConvolution_OuterAdd(
+              &dw[k * nWeights], &input_features[j * input_nPlanes],
+              &d_output_features[row * output_nPlanes], input_nPlanes,
+              output_nPlanes);
+        }
+      }
+    }
+  }
+  for (uInt t = 0; t < nThreads; t++) {
+    if (dws[t].empty()) // the team had fewer threads
+      continue;
+    Convolution_AddRow(d_weight, &dws[t][0], filterVolume * nWeights);
+    if (d_bias)
+      Convolution_AddRow(d_bias, &dbs[t][0], output_nPlanes);
+  }
+}
+#endif /* CPU_SUBMANIFOLDCONVOLUTION_H */
@@ -14,7 +14,7 @@ extern "C" void scn_DR_(ActivePooling_updateOutput)(
     THCTensor *output_features, THCITensor *rulesBuffer, bool average) {
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
   uInt nPlanes = input_features->size[1];
-  auto _rules = _m.getActivePoolingRuleBook(inputSize);
+  auto &_rules = _m.getActivePoolingRuleBook(inputSize);
   uInt batchSize = _rules[1][0];
   uInt maxActive = _rules[1][1];
   THCTensor_(resize2d)(state, output_features, batchSize, nPlanes);
@@ -43,7 +43,7 @@ extern "C" void scn_DR_(ActivePooling_updateGradInput)(
     THCITensor *rulesBuffer, bool average) {
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
   uInt nPlanes = input_features->size[1];
-  auto _rules = _m.getActivePoolingRuleBook(inputSize);
+  auto &_rules = _m.getActivePoolingRuleBook(inputSize);
   uInt batchSize = _rules[1][0];
   uInt maxActive = _rules[1][1];
   THCTensor_(resizeAs)(state, d_input_features, input_features);
@@ -17,7 +17,7 @@ extern "C" void scn_DR_(AveragePooling_updateOutput)(
 
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
   uInt nPlanes = input_features->size[1] - nFeaturesToDrop;
-  auto _rules =
+  auto &_rules =
       _m.getRuleBook(inputSize, outputSize, poolSize, poolStride, true);
   uInt nActive = _m.getNActive(outputSize);
   THCTensor_(resize2d)(state, output_features, nActive,
@@ -41,7 +41,7 @@ extern "C" void scn_DR_(AveragePooling_updateGradInput)(
 
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
   uInt nPlanes = input_features->size[1] - nFeaturesToDrop;
-  auto _rules =
+  auto &_rules =
       _m.getRuleBook(inputSize, outputSize, poolSize, poolStride, true);
   uInt nActive = _m.getNActive(outputSize);
   THCTensor_(resizeAs)(state, d_input_features, input_features);
@@ -18,7 +18,7 @@ extern "C" double scn_DR_(Convolution_updateOutput)(
     THCTensor *output_features, THCTensor *weight, THCTensor *bias,
     long filterVolume, THCITensor *rulesBuffer) {
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
-  auto _rules =
+  auto &_rules =
       _m.getRuleBook(inputSize, outputSize, filterSize, filterStride, true);
   uInt nActive = _m.getNActive(outputSize);
   THCTensor_(resize2d)(state, output_features, nActive, weight->size[1]);
@@ -59,7 +59,7 @@ extern "C" void scn_DR_(Convolution_backward)(
     THCTensor *weight, THCTensor *d_weight, THCTensor *d_bias,
     long filterVolume, THCITensor *rulesBuffer) {
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
-  auto _rules =
+  auto &_rules =
       _m.getRuleBook(inputSize, outputSize, filterSize, filterStride, true);
   uInt nActive = _m.getNActive(outputSize);
   THCTensor_(resizeAs)(state, d_input_features, input_features);
@@ -92,7 +92,7 @@ extern "C" double scn_DR_(ValidConvolution_updateOutput)(
     THCTensor *input_features, THCTensor *output_features, THCTensor *weight,
     THCTensor *bias, long filterVolume, THCITensor *rulesBuffer) {
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
-  auto _rules = _m.getValidRuleBook(inputSize, filterSize, true);
+  auto &_rules = _m.getValidRuleBook(inputSize, filterSize, true);
   uInt nActive = _m.getNActive(inputSize);
   THCTensor_(resize2d)(state, output_features, nActive, weight->size[1]);
   if (not bias)
@@ -131,7 +131,7 @@ extern "C" void scn_DR_(ValidConvolution_backward)(
     THCTensor *d_output_features, THCTensor *weight, THCTensor *d_weight,
     THCTensor *d_bias, long filterVolume, THCITensor *rulesBuffer) {
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
-  auto _rules = _m.getValidRuleBook(inputSize, filterSize, true);
+  auto &_rules = _m.getValidRuleBook(inputSize, filterSize, true);
   uInt nActive = _m.getNActive(inputSize);
   THCTensor_(resizeAs)(state, d_input_features, input_features);
   THCTensor_(zero)(state, d_input_features);
@@ -18,7 +18,7 @@ extern "C" double scn_DR_(Deconvolution_updateOutput)(
     THCTensor *output_features, THCTensor *weight, THCTensor *bias,
     long filterVolume, THCITensor *rulesBuffer) {
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
-  auto _rules =
+  auto &_rules =
       _m.getRuleBook(outputSize, inputSize, filterSize, filterStride, true);
   uInt nActive = _m.getNActive(outputSize);
   THCTensor_(resize2d)(state, output_features, nActive, weight->size[1]);
@@ -57,7 +57,7 @@ extern "C" void scn_DR_(Deconvolution_backward)(
     THCTensor *weight, THCTensor *d_weight, THCTensor *d_bias,
     long filterVolume, THCITensor *rulesBuffer) {
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
-  auto _rules =
+  auto &_rules =
       _m.getRuleBook(outputSize, inputSize, filterSize, filterStride, true);
   uInt nActive = _m.getNActive(outputSize);
   THCTensor_(resizeAs)(state, d_input_features, input_features);
@@ -15,7 +15,7 @@ extern "C" double scn_DR_(DenseDeconvolution_updateOutput)(
     THCTensor *output_features, THCTensor *weight, THCTensor *bias,
     long filterVolume, THCITensor *rulesBuffer) {
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
-  auto _rules =
+  auto &_rules =
       _m.getRuleBook2(outputSize, inputSize, filterSize, filterStride, true);
   uInt nActive = _m.getNActive(outputSize);
   THCTensor_(resize2d)(state, output_features, nActive, weight->size[1]);
@@ -53,7 +53,7 @@ extern "C" void scn_DR_(DenseDeconvolution_backward)(
     THCTensor *weight, THCTensor *d_weight, THCTensor *d_bias,
     long filterVolume, THCITensor *rulesBuffer) {
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
-  auto _rules =
+  auto &_rules =
       _m.getRuleBook2(outputSize, inputSize, filterSize, filterStride, true);
   // potential bug: deconv2: input -> output, has the same rule with conv: output -> input
   uInt nActive = _m.getNActive(outputSize);
@@ -7,23 +7,23 @@
 #ifndef GPU_RULEBOOKITERATOR_H
 #define GPU_RULEBOOKITERATOR_H
 
-// Macro to parallelize loading rulebook elements to GPU memory and operating
-// on the elements of the rulebook.
+// Macro to load the whole (flat) rulebook into GPU memory with a single copy
+// and then operate on the rows of the rulebook.
 // X is the function to apply.
 // Y is a command to run
 
 #define RULEBOOKITERATOR(X, Y)                                                 \
-  uInt ms = ruleBookMaxSize(_rules);                                           \
-  if (THCITensor_nElement(state, rulesBuffer) < ms)                            \
-    THCITensor_resize1d(state, rulesBuffer, ms);                               \
-  uInt *rbB = (uInt *)THCITensor_data(state, rulesBuffer);                     \
+  uInt ts = ruleBookTotalSize(_rules);                                         \
+  if (THCITensor_nElement(state, rulesBuffer) < ts)                            \
+    THCITensor_resize1d(state, rulesBuffer, ts);                               \
+  uInt *rbB0 = (uInt *)THCITensor_data(state, rulesBuffer);                    \
+  if (ts) {                                                                    \
+    cudaMemcpy(rbB0, &_rules.rules[0], sizeof(uInt) * ts,                      \
+               cudaMemcpyHostToDevice);                                        \
+  }                                                                            \
   for (int k = 0; k < _rules.size(); ++k) {                                    \
-    auto &r = _rules[k];                                                       \
-    uInt nHotB = r.size() / 2;                                                 \
-    if (nHotB) {                                                               \
-      cudaMemcpy(rbB, &r[0], sizeof(uInt) * 2 * nHotB,                         \
-                 cudaMemcpyHostToDevice);                                      \
-    }                                                                          \
+    uInt *rbB = rbB0 + _rules.offsets[k];                                      \
+    uInt nHotB = (_rules.offsets[k + 1] - _rules.offsets[k]) / 2;              \
     if (nHotB) {                                                               \
       X                                                                        \
     }                                                                          \
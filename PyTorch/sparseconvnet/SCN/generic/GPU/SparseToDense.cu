@@ -28,7 +28,7 @@ extern "C" void scn_DR_(SparseToDense_updateOutput)(
     THCTensor_(zero)(state, output_features);
   }
   if (input_features->nDimension == 2) {
-    auto _rules = _m.getSparseToDenseRuleBook(inputSize, true);
+    auto &_rules = _m.getSparseToDenseRuleBook(inputSize, true);
     uInt nPlanes = input_features->size[1];
     auto iF = THCTensor_(data)(state, input_features);
     auto oF = THCTensor_(data)(state, output_features);
@@ -48,7 +48,7 @@ extern "C" void scn_DR_(SparseToDense_updateGradInput)(
   THCTensor_(zero)(state, d_input_features);
 
   if (input_features->nDimension == 2) {
-    auto _rules = _m.getSparseToDenseRuleBook(inputSize, true);
+    auto &_rules = _m.getSparseToDenseRuleBook(inputSize, true);
     long spatialVolume = THLongTensor_prodall(inputSize);
     uInt nPlanes = d_input_features->size[1];
     auto diF = THCTensor_(data)(state, d_input_features);
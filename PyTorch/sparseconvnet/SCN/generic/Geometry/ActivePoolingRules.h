@@ -16,20 +16,23 @@
 
 template <uInt dimension>
 void activePoolingRules(SparseGrids<dimension> &SGs, RuleBook &rules) {
-  rules.clear();
-  rules.resize(2);
-  auto &r = rules[0];
+  uInt batchSize = SGs.size();
   uInt maxActive = 0;
   for (auto &sg : SGs)
     maxActive = std::max(maxActive, (uInt)sg.mp.size());
-  for (auto &sg : SGs) {
-    r.push_back(sg.mp.size());
+  rules.clear();
+  rules.offsets = {0, batchSize * (maxActive + 1),
+                   batchSize * (maxActive + 1) + 2};
+  rules.rules.assign(rules.offsets[2], 0); // zero padded
+  auto r = rules[0];
+  for (uInt b = 0; b < batchSize; b++) {
+    auto &sg = SGs[b];
+    uInt j = b * (maxActive + 1);
+    r[j++] = sg.mp.size();
     for (auto &iter : sg.mp)
-      r.push_back(sg.ctr + iter.second);
-    while (rules.size() % (maxActive + 1) != 0)
-      r.push_back(0); // padding
+      r[j++] = sg.ctr + iter.second;
   }
-  rules[1].push_back(SGs.size());
-  rules[1].push_back(maxActive);
+  rules[1][0] = batchSize;
+  rules[1][1] = maxActive;
 }
 #endif /* ACTIVEPOOLING_H */
@@ -8,26 +8,59 @@
 #define CONVOLUTIONRULES_H
 #include "RectangularRegions.h"
 
+// Rulebooks are built in two passes (see ValidConvolutionRules.h). The first
+// pass also adds the new sites to the output grid, the second pass writes the
+// rules once the batch offsets (SparseGrid::ctr) of the new grid are known.
+
+template <uInt dimension>
+void Convolution_InputSgToRuleCountsAndOutputSg(
+    SparseGrid<dimension> &inputGrid, SparseGrid<dimension> &outputGrid,
+    uInt *counts, long *size, long *stride, long *inputSpatialSize,
+    long *outputSpatialSize) {
+  for (auto const &inIter : inputGrid.mp) {
+    for (auto j : OutputRegionCalculator<dimension>(inIter.first, size, stride,
+                                                    outputSpatialSize)) {
+      auto inRegion = InputRegionCalculator<dimension>(j, size, stride);
+      counts[inRegion.offset(inIter.first)]++;
+      if (outputGrid.mp.find(j) == outputGrid.mp.end())
+        outputGrid.mp.insert(std::make_pair(j, outputGrid.ctr++));
+    }
+  }
+}
+
 template <uInt dimension>
 void Convolution_InputSgToRulesAndOutputSg(SparseGrid<dimension> &inputGrid,
                                            SparseGrid<dimension> &outputGrid,
-                                           RuleBook &rules, long *size,
-                                           long *stride, long *inputSpatialSize,
+                                           RuleBook &rules, uInt *cursors,
+                                           long *size, long *stride,
+                                           long *inputSpatialSize,
                                            long *outputSpatialSize) {
-  rules.resize(volume<dimension>(size));
-
+  auto r = &rules.rules[0];
   for (auto const &inIter : inputGrid.mp) {
     for (auto j : OutputRegionCalculator<dimension>(inIter.first, size, stride,
                                                     outputSpatialSize)) {
       auto inRegion = InputRegionCalculator<dimension>(j, size, stride);
       uInt rulesOffset = inRegion.offset(inIter.first);
       auto outIter = outputGrid.mp.find(j);
-      if (outIter == outputGrid.mp.end()) {
-        outIter =
-            outputGrid.mp.insert(std::make_pair(j, outputGrid.ctr++)).first;
-      }
-      rules[rulesOffset].push_back(inIter.second + inputGrid.ctr);
-      rules[rulesOffset].push_back(outIter->second);
+      r[cursors[rulesOffset]++] = inIter.second + inputGrid.ctr;
+      r[cursors[rulesOffset]++] = outIter->second + outputGrid.ctr;
+    }
+  }
+}
+
+template <uInt dimension>
+void Convolution_OutputSgToRuleCountsAndInputSg(
+    SparseGrid<dimension> &inputGrid, SparseGrid<dimension> &outputGrid,
+    uInt *counts, long *size, long *stride, long *inputSpatialSize,
+    long *outputSpatialSize) {
+  // output -> inputRegion -> for offset in inputRegion:
+  for (auto const &outIter : outputGrid.mp) {
+    uInt rulesOffset = 0;
+    for (auto i :
+         InputRegionCalculator<dimension>(outIter.first, size, stride)) {
+      if (inputGrid.mp.find(i) == inputGrid.mp.end())
+        inputGrid.mp.insert(std::make_pair(i, inputGrid.ctr++));
+      counts[rulesOffset++]++;
     }
   }
 }
@@ -35,20 +68,18 @@ void Convolution_InputSgToRulesAndOutputSg(SparseGrid<dimension> &inputGrid,
 template <uInt dimension>
 void Convolution_OutputSgToRulesAndInputSg(SparseGrid<dimension> &inputGrid,
                                            SparseGrid<dimension> &outputGrid,
-                                           RuleBook &rules, long *size,
-                                           long *stride, long *inputSpatialSize,
+                                           RuleBook &rules, uInt *cursors,
+                                           long *size, long *stride,
+                                           long *inputSpatialSize,
                                            long *outputSpatialSize) {
-  rules.resize(volume<dimension>(size));
-  // output -> inputRegion -> for offset in inputRegion:
-  for (auto const &outIter : outputGrid.mp){
+  auto r = &rules.rules[0];
+  for (auto const &outIter : outputGrid.mp) {
     uInt rulesOffset = 0;
-    for (auto i : InputRegionCalculator<dimension> (outIter.first, size, stride)){
+    for (auto i :
+         InputRegionCalculator<dimension>(outIter.first, size, stride)) {
       auto inIter = inputGrid.mp.find(i);
-      if (inIter == inputGrid.mp.end()){
-        inIter = inputGrid.mp.insert(std::make_pair(i, inputGrid.ctr++)).first;
-      }
-      rules[rulesOffset].push_back(inIter->second);
-      rules[rulesOffset].push_back(outIter.second + outputGrid.ctr);
+      r[cursors[rulesOffset]++] = inIter->second + inputGrid.ctr;
+      r[cursors[rulesOffset]++] = outIter.second + outputGrid.ctr;
       rulesOffset++;
     }
   }
@@ -65,17 +96,26 @@ uInt Convolution_InputSgsToRulesAndOutputSgs(SparseGrids<dimension> &input_SGs,
   output_SGs.clear();
   uInt batchSize = input_SGs.size();
   output_SGs.resize(batchSize);
+  uInt sd = volume<dimension>(filterSize);
+  std::vector<uInt> cursors(batchSize * sd, 0);
+  for (uInt i = 0; i < batchSize; i++)
+    Convolution_InputSgToRuleCountsAndOutputSg<dimension>(
+        input_SGs[i], output_SGs[i], &cursors[i * sd], filterSize,
+        filterStride, input_spatialSize, output_spatialSize);
   uInt output_nActive = 0;
   for (uInt i = 0; i < batchSize; i++) {
-    auto &iSG = input_SGs[i];
-    auto &oSG = output_SGs[i];
-    oSG.ctr = output_nActive;
-    Convolution_InputSgToRulesAndOutputSg<dimension>(
-        iSG, oSG, rules, filterSize, filterStride, input_spatialSize,
-        output_spatialSize);
-    output_nActive = oSG.ctr;
-    oSG.ctr = 0;
+    // Parallel assignment:
+    // output_nActive     <-  output_nActive+output_SGs[i].ctr
+    // output_SGs[i].ctr  <-  output_nActive
+    uInt tmp = output_nActive;
+    output_nActive += output_SGs[i].ctr;
+    output_SGs[i].ctr = tmp;
   }
+  if (rules.allocate(cursors, batchSize, sd))
+    for (uInt i = 0; i < batchSize; i++)
+      Convolution_InputSgToRulesAndOutputSg<dimension>(
+          input_SGs[i], output_SGs[i], rules, &cursors[i * sd], filterSize,
+          filterStride, input_spatialSize, output_spatialSize);
   return output_nActive;
 }
 
@@ -85,42 +125,32 @@ uInt Convolution_InputSgsToRulesAndOutputSgs_OMP(
     RuleBook &rules, long *filterSize, long *filterStride,
     long *input_spatialSize, long *output_spatialSize) {
   rules.clear();
-  rules.resize(volume<dimension>(filterSize));
   output_SGs.clear();
   uInt batchSize = input_SGs.size();
   output_SGs.resize(batchSize);
-  std::vector<RuleBook> rbs(batchSize);
+  uInt sd = volume<dimension>(filterSize);
+  std::vector<uInt> cursors(batchSize * sd, 0);
   {
     uInt i;
 #pragma omp parallel for private(i)
     for (i = 0; i < batchSize; i++)
-      Convolution_InputSgToRulesAndOutputSg<dimension>(
-          input_SGs[i], output_SGs[i], rbs[i], filterSize, filterStride,
-          input_spatialSize, output_spatialSize);
+      Convolution_InputSgToRuleCountsAndOutputSg<dimension>(
+          input_SGs[i], output_SGs[i], &cursors[i * sd], filterSize,
+          filterStride, input_spatialSize, output_spatialSize);
   }
   uInt output_nActive = 0;
   for (uInt i = 0; i < batchSize; i++) {
-    // Parallel assignment:
-    // output_nActive     <-  output_nActive+output_SGs[i].ctr
-    // output_SGs[i].ctr  <-  output_nActive
     uInt tmp = output_nActive;
     output_nActive += output_SGs[i].ctr;
     output_SGs[i].ctr = tmp;
   }
-  {
+  if (rules.allocate(cursors, batchSize, sd)) {
     uInt i;
 #pragma omp parallel for private(i)
-    for (i = 0; i < rules.size(); i++) {
-      auto &R = rules[i];
-      for (uInt j = 0; j < batchSize; j++) {
-        auto &r = rbs[j][i];
-        auto offset = output_SGs[j].ctr;
-        for (uInt k = 0; k < r.size();) {
-          R.push_back(r[k++]);
-          R.push_back(r[k++] + offset);
-        }
-      }
-    }
+    for (i = 0; i < batchSize; i++)
+      Convolution_InputSgToRulesAndOutputSg<dimension>(
+          input_SGs[i], output_SGs[i], rules, &cursors[i * sd], filterSize,
+          filterStride, input_spatialSize, output_spatialSize);
   }
   return output_nActive;
 }
@@ -131,18 +161,18 @@ uInt Convolution_OutputSgsToRulesAndInputSgs_OMP(
     RuleBook &rules, long *filterSize, long *filterStride,
     long *input_spatialSize, long *output_spatialSize) {
   rules.clear();
-  rules.resize(volume<dimension>(filterSize));
   input_SGs.clear();
   uInt batchSize = output_SGs.size();
   input_SGs.resize(batchSize);
-  std::vector<RuleBook> rbs(batchSize);
+  uInt sd = volume<dimension>(filterSize);
+  std::vector<uInt> cursors(batchSize * sd, 0);
   {
     uInt i;
 #pragma omp parallel for private(i)
     for (i = 0; i < batchSize; i++)
-      Convolution_OutputSgToRulesAndInputSg<dimension>(
-          input_SGs[i], output_SGs[i], rbs[i], filterSize, filterStride,
-          input_spatialSize, output_spatialSize);
+      Convolution_OutputSgToRuleCountsAndInputSg<dimension>(
+          input_SGs[i], output_SGs[i], &cursors[i * sd], filterSize,
+          filterStride, input_spatialSize, output_spatialSize);
   }
   uInt input_nActive = 0;
   for (uInt i = 0; i < batchSize; i++) {
@@ -150,20 +180,13 @@ uInt Convolution_OutputSgsToRulesAndInputSgs_OMP(
     input_nActive += input_SGs[i].ctr;
     input_SGs[i].ctr = tmp;
   }
-  {
+  if (rules.allocate(cursors, batchSize, sd)) {
     uInt i;
 #pragma omp parallel for private(i)
-    for (i = 0; i < rules.size(); i++) {
-      auto &R = rules[i];
-      for (uInt j = 0; j < batchSize; j++) {
-        auto &r = rbs[j][i];
-        auto offset = input_SGs[j].ctr;
-        for (uInt k = 0; k < r.size();) {
-          R.push_back(r[k++] + offset);
-          R.push_back(r[k++]);
-        }
-      }
-    }
+    for (i = 0; i < batchSize; i++)
+      Convolution_OutputSgToRulesAndInputSg<dimension>(
+          input_SGs[i], output_SGs[i], rules, &cursors[i * sd], filterSize,
+          filterStride, input_spatialSize, output_spatialSize);
   }
   return input_nActive;
 }
@@ -175,7 +198,10 @@ void SparseToDense_InputSgsToRulesAndOutputSgs(
     SparseGrids<dimension> &input_SGs, RuleBook &rules, long *spatialSize) {
   uInt batchSize = input_SGs.size();
   rules.clear();
-  rules.resize(batchSize);
+  std::vector<uInt> cursors(batchSize);
+  for (uInt batchIdx = 0; batchIdx < batchSize; batchIdx++)
+    cursors[batchIdx] = input_SGs[batchIdx].mp.size();
+  rules.allocate(cursors, 1, batchSize);
   Point<dimension> lb, ub;
   for (int i = 0; i < dimension; ++i) {
     lb[i] = 0;
@@ -184,9 +210,11 @@ void SparseToDense_InputSgsToRulesAndOutputSgs(
   auto region = RectangularRegion<dimension>(lb, ub);
   for (uInt batchIdx = 0; batchIdx < batchSize; batchIdx++) {
     auto &iSG = input_SGs[batchIdx];
+    auto r = rules[batchIdx];
+    uInt j = 0;
     for (auto const &inIter : iSG.mp) {
-      rules[batchIdx].push_back(inIter.second + iSG.ctr);
-      rules[batchIdx].push_back(region.offset(inIter.first));
+      r[j++] = inIter.second + iSG.ctr;
+      r[j++] = region.offset(inIter.first);
     }
   }
 }
@@ -196,7 +224,10 @@ void SparseToDense_InputSgsToRulesAndOutputSgs_OMP(
     SparseGrids<dimension> &input_SGs, RuleBook &rules, long *spatialSize) {
   uInt batchSize = input_SGs.size();
   rules.clear();
-  rules.resize(batchSize);
+  std::vector<uInt> cursors(batchSize);
+  for (uInt batchIdx = 0; batchIdx < batchSize; batchIdx++)
+    cursors[batchIdx] = input_SGs[batchIdx].mp.size();
+  rules.allocate(cursors, 1, batchSize);
   Point<dimension> lb, ub;
   for (int i = 0; i < dimension; ++i) {
     lb[i] = 0;
@@ -207,9 +238,11 @@ void SparseToDense_InputSgsToRulesAndOutputSgs_OMP(
 #pragma omp parallel for private(batchIdx)
   for (batchIdx = 0; batchIdx < batchSize; batchIdx++) {
     auto &iSG = input_SGs[batchIdx];
+    auto r = rules[batchIdx];
+    uInt j = 0;
     for (auto const &inIter : iSG.mp) {
-      rules[batchIdx].push_back(inIter.second + iSG.ctr);
-      rules[batchIdx].push_back(region.offset(inIter.first));
+      r[j++] = inIter.second + iSG.ctr;
+      r[j++] = region.offset(inIter.first);
     }
   }
 }
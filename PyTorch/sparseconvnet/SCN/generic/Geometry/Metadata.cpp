@@ -9,6 +9,7 @@
 #else
 
 #include "Metadata.h"
+#include "MetadataIO.h"
 #include <cstring>
 #include <iostream>
 //#include "omp.h"
@@ -22,6 +23,16 @@ extern "C" void scn_D_(setInputSpatialSize)(void **m,
   _m.setInputSpatialSize(spatialSize);
 }
 
+extern "C" void scn_D_(setGridBackend)(void **m, bool sorted) {
+  SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
+  _m.useSortedGrids = sorted;
+}
+
+extern "C" double scn_D_(gridBytes)(void **m, bool sorted) {
+  SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
+  return _m.gridBytes(sorted);
+}
+
 extern "C" void scn_D_(batchAddSample)(void **m) {
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
   assert(_m.inputSGs && "Call setInputSpatialSize first, please!");
@@ -554,7 +565,7 @@ extern "C" void scn_D_(generateRuleBooks3s2)(void **m) {
     auto &SGs = _m.grids[p1];
     auto &rb = _m.validRuleBooks[p2];
     if (rb.empty())
-      ValidConvolution_SgsToRules(SGs, rb, sz);
+      _m.validRules(p1, rb, sz, false);
     for (int i = 0; i < Dimension; ++i)
       if (p1[i] < 3 or p1[i] % 2 != 1)
         return;
@@ -588,7 +599,8 @@ extern "C" void scn_D_(generateRuleBooks2s2)(void **m) {
     auto &rb = _m.validRuleBooks[p2];
     // struct timeval valid_start, valid_end;
     // gettimeofday(&valid_start, NULL);
-    ValidConvolution_SgsToRules_OMP(SGs, rb, s3);
+    if (rb.empty())
+      _m.validRules(p1, rb, s3, true);
     // gettimeofday(&valid_end, NULL);
     // double vaild_run_time = ((valid_end.tv_sec  - valid_start.tv_sec) * 1000000u + valid_end.tv_usec - valid_start.tv_usec) / 1.e6;
     // std::cout << "valid convolution spend time:" << vaild_run_time << std::endl;
@@ -613,7 +625,7 @@ extern "C" void scn_D_(generateRuleBooks2s2)(void **m) {
 extern "C" void scn_D_(getConvMask)(void **m, THLongTensor *inputSize, THLongTensor *filterSize, THFloatTensor *mask_){
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
 
-  RuleBook rb = _m.getValidRuleBook(inputSize, filterSize, true);
+  auto &rb = _m.getValidRuleBook(inputSize, filterSize, true);
   auto mask = THFloatTensor_data(mask_);
   for (auto rbIdx = 0; rbIdx != rb.size(); ++rbIdx){
     auto rbIt = rb[rbIdx];
@@ -635,6 +647,17 @@ extern "C" void scn_D_(getValidRules)(void **m, THLongTensor *inputSize, THLongT
   // }
 }
 
+extern "C" void scn_D_(getGroupValidRules)(void **m, void **group_m,
+                                           THLongTensor *inputSize,
+                                           THLongTensor *filterSize,
+                                           THLongTensor *abc, long groupNum) {
+  SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
+  SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, group_m)
+  assert(THLongTensor_nElement(abc) == Dimension and groupNum > 0 and
+         "abc needs one weight per dimension and groupNum > 0");
+  _m.groupView(_group_m, inputSize, filterSize, abc, groupNum);
+}
+
 extern "C" void scn_D_(getConvRulesAndOutput)(void **m, THLongTensor *inputSize, THLongTensor *outputSize, THLongTensor *filterSize, THLongTensor *stride){
   SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
   // try{
@@ -653,6 +676,35 @@ extern "C" void scn_D_(getConvRules2AndOutput)(void **m, THLongTensor *inputSize
   _m.getRuleBook2(outputSize, inputSize, filterSize, stride, true);
 }
 
+extern "C" bool scn_D_(saveMetadata)(void **m, const char *filename) {
+  SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
+  return Metadata_Save(_m, filename);
+}
+
+// Replace the contents of m with a file written by saveMetadata.
+// Returns false, leaving m as it was, if the file is missing, unreadable or
+// fails the checks of Metadata_Deserialize.
+extern "C" bool scn_D_(loadMetadata)(void **m, const char *filename) {
+  SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
+  return Metadata_Load(_m, filename);
+}
+
+// Pickling support: the same format as saveMetadata, in a ByteTensor
+extern "C" void scn_D_(serializeMetadata)(void **m, THByteTensor *buffer) {
+  SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
+  MetadataWriter w;
+  Metadata_Serialize(_m, w);
+  THByteTensor_resize1d(buffer, w.buffer.size());
+  std::memcpy(THByteTensor_data(buffer), w.buffer.data(), w.buffer.size());
+}
+
+extern "C" bool scn_D_(deserializeMetadata)(void **m, THByteTensor *buffer) {
+  SCN_INITIALIZE_AND_REFERENCE(Metadata<Dimension>, m)
+  MetadataReader r((const char *)THByteTensor_data(buffer),
+                   THByteTensor_nElement(buffer));
+  return Metadata_Deserialize(_m, r);
+}
+
 extern "C" void scn_D_(freeMetadata)(void **m) {
   SCN_DELETE(Metadata<Dimension>, m)
 }
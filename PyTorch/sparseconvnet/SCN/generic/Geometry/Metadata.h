@@ -10,6 +10,7 @@
 #include "../SparseConvNet.h"
 #include "ActivePoolingRules.h"
 #include "ConvolutionRules.h"
+#include "SortedGridRules.h"
 #include "ValidConvolutionRules.h"
 #include <tuple>
 #include <unordered_map>
@@ -21,6 +22,10 @@ public:
   std::unordered_map<Point<dimension>, SparseGrids<dimension>,
                      IntArrayHash<dimension>> grids;
 
+  // Build valid rulebooks from sorted-key copies of 'grids' (made for each
+  // rulebook and freed once it is built) instead of the hash tables
+  bool useSortedGrids;
+
   std::unordered_map<Point<dimension>, RuleBook, IntArrayHash<dimension>>
       activePoolingRuleBooks;
 
@@ -30,6 +35,10 @@ public:
   std::unordered_map<Point<3 * dimension>, RuleBook,
                      IntArrayHash<3 * dimension>> ruleBooks;
 
+  // nActive x filterVolume neighbour tables derived from validRuleBooks
+  std::unordered_map<Point<2 * dimension>, std::vector<uInt>,
+                     IntArrayHash<2 * dimension>> neighbourTables;
+
   std::unordered_map<Point<dimension>, RuleBook, IntArrayHash<dimension>>
       sparseToDenseRuleBooks;
 
@@ -38,13 +47,20 @@ public:
   SparseGrid<dimension> *inputSG;
   uInt *inputNActive;
 
-  Metadata() {}
+  // Metadata that never gets an input (e.g. a groupView) is serialized with
+  // inputSpatialSize all zeros
+  Metadata()
+      : useSortedGrids(false), inputSGs(nullptr), inputSG(nullptr),
+        inputNActive(nullptr) {
+    inputSpatialSize.fill(0);
+  }
   void clear() {
     nActive.clear();
     grids.clear();
     activePoolingRuleBooks.clear();
     validRuleBooks.clear();
     ruleBooks.clear();
+    neighbourTables.clear();
     sparseToDenseRuleBooks.clear();
     inputSGs = nullptr;
     inputSG = nullptr;
@@ -62,20 +78,87 @@ public:
   uInt getNActive(THLongTensor *spatialSize) {
     return nActive[LongTensorToPoint<dimension>(spatialSize)];
   };
+  // Valid convolution rules for the sites at spatialSize, using either the
+  // hash tables or a temporary sorted-key copy of them
+  uInt validRules(Point<dimension> &spatialSize, RuleBook &rb, long *size,
+                  bool openMP) {
+    auto &SGs = grids[spatialSize];
+    if (useSortedGrids) {
+      long sz[dimension];
+      for (uInt i = 0; i < dimension; i++)
+        sz[i] = spatialSize[i];
+      SortedGrids<dimension> sortedSGs;
+      SparseGridsToSortedGrids(SGs, sortedSGs, sz);
+      return ValidConvolution_SortedGridsToRules(sortedSGs, rb, size, sz);
+    }
+#if defined(ENABLE_OPENMP)
+    if (openMP)
+      return ValidConvolution_SgsToRules_OMP(SGs, rb, size);
+#endif
+    return ValidConvolution_SgsToRules(SGs, rb, size);
+  }
+  // Bytes held by the hash tables of the sites at every spatial size or, with
+  // sorted, the bytes their sorted-key copies hold while rulebooks are built
+  double gridBytes(bool sorted) {
+    double bytes = 0;
+    for (auto &iter : grids)
+      for (auto &grid : iter.second)
+        bytes += sorted ? sizeof(SortedGrid<dimension>) +
+                              grid.mp.size() * (sizeof(uint64_t) + sizeof(uInt))
+                        : sizeof(SparseGrid<dimension>) +
+                              grid.mp.bucket_count() *
+                                  sizeof(typename SparseGridMap<
+                                         dimension>::value_type);
+    return bytes;
+  }
   RuleBook &getValidRuleBook(THLongTensor *spatialSize, THLongTensor *size,
                              bool openMP) {
     auto p = TwoLongTensorsToPoint<dimension>(spatialSize, size);
     auto &rb = validRuleBooks[p];
     if (rb.empty()) {
-      auto &SGs = grids[LongTensorToPoint<dimension>(spatialSize)];
-#if defined(ENABLE_OPENMP)
-      openMP ? ValidConvolution_SgsToRules_OMP(SGs, rb, THLongTensor_data(size))
-             :
-#endif
-             ValidConvolution_SgsToRules(SGs, rb, THLongTensor_data(size));
+      auto ss = LongTensorToPoint<dimension>(spatialSize);
+      validRules(ss, rb, THLongTensor_data(size), openMP);
     }
     return rb;
   }
+  // Spatial group convolution: make 'group' a view of this Metadata at
+  // spatialSize in which site p belongs to group (sum_i abc[i] * p[i]) mod
+  // groupNum, and the valid rules only join sites of the same group. The
+  // rulebook is filtered from this one, so feature rows keep their order.
+  void groupView(Metadata<dimension> &group, THLongTensor *spatialSize,
+                 THLongTensor *size, THLongTensor *abc, long groupNum) {
+    auto ss = LongTensorToPoint<dimension>(spatialSize);
+    auto &rules = getValidRuleBook(spatialSize, size, true);
+    uInt n = getNActive(spatialSize);
+    auto &SGs = grids[ss];
+    auto a = THLongTensor_data(abc);
+    std::vector<uInt> labels(n);
+    for (auto &grid : SGs)
+      for (auto const &iter : grid.mp)
+        labels[iter.second + grid.ctr] = spatialGroup(iter.first, a, groupNum);
+    group.nActive[ss] = n;
+    ValidConvolution_FilterRules(
+        rules, group.validRuleBooks[TwoLongTensorsToPoint<dimension>(
+                   spatialSize, size)],
+        labels);
+  }
+  // Group of site p, in [0, groupNum) even for negative weights
+  uInt spatialGroup(const Point<dimension> &p, long *abc, long groupNum) {
+    long g = 0;
+    for (uInt i = 0; i < dimension; i++)
+      g += abc[i] * p[i];
+    return ((g % groupNum) + groupNum) % groupNum;
+  }
+  std::vector<uInt> &getNeighbourTable(THLongTensor *spatialSize,
+                                       THLongTensor *size, bool openMP) {
+    auto p = TwoLongTensorsToPoint<dimension>(spatialSize, size);
+    auto &table = neighbourTables[p];
+    if (table.empty())
+      ValidConvolution_RulesToNeighbourTable(
+          getValidRuleBook(spatialSize, size, openMP), table,
+          getNActive(spatialSize));
+    return table;
+  }
   RuleBook &getActivePoolingRuleBook(THLongTensor *spatialSize) {
     auto spatialSz = LongTensorToPoint<dimension>(spatialSize);
     auto &SGs = grids[spatialSz];
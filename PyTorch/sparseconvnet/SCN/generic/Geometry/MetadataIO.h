@@ -0,0 +1,349 @@
+// Copyright 2016-present, Facebook, Inc.
+// All rights reserved.
+//
+// This source code is licensed under the license found in the
+// LICENSE file in the root directory of this source tree.
+
+#ifndef METADATAIO_H
+#define METADATAIO_H
+
+#include "Metadata.h"
+#include <cstdio>
+#include <algorithm>
+#include <cstring>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+// Binary (de)serialization of the geometry held by a Metadata object: the
+// input spatial size, nActive, the sparse grids and all cached rulebooks.
+// Everything is written as flat arrays of fixed width integers so a file can
+// be mapped into memory and read back without any parsing beyond walking the
+// section headers:
+//
+//   header:  magic "SCNM", version, dimension, sizeof(Int), sizeof(uInt)
+//   inputSpatialSize, useSortedGrids
+//   nActive:        count, then count x (Point<d>, uInt)
+//   grids:          count, then per entry: Point<d>, #samples, then per
+//                   sample: ctr, #sites, #sites x (Point<d>, uInt)
+//   validRuleBooks: count, then per entry: Point<2d>, #offsets, offsets,
+//                   #rules, rules
+//   ruleBooks:      as validRuleBooks with Point<3d> keys
+//   activePoolingRuleBooks, sparseToDenseRuleBooks: with Point<d> keys
+
+const uInt MetadataIO_Version = 2;
+
+class MetadataWriter {
+public:
+  std::vector<char> buffer;
+  template <typename T> void put(const T *x, std::size_t n) {
+    auto p = reinterpret_cast<const char *>(x);
+    buffer.insert(buffer.end(), p, p + n * sizeof(T));
+  }
+  template <typename T> void put(const T &x) { put(&x, 1); }
+};
+
+class MetadataReader {
+public:
+  const char *p, *end;
+  MetadataReader(const char *p, std::size_t n) : p(p), end(p + n) {}
+  template <typename T> bool get(T *x, std::size_t n) {
+    if ((std::size_t)(end - p) < n * sizeof(T))
+      return false;
+    std::memcpy(x, p, n * sizeof(T));
+    p += n * sizeof(T);
+    return true;
+  }
+  template <typename T> bool get(T &x) { return get(&x, 1); }
+};
+
+template <typename T> void MetadataIO_PutRuleBooks(MetadataWriter &w, T &rbs) {
+  w.put((uint64_t)rbs.size());
+  for (auto &it : rbs) {
+    w.put(it.first);
+    w.put((uint64_t)it.second.offsets.size());
+    w.put(it.second.offsets.data(), it.second.offsets.size());
+    w.put((uint64_t)it.second.rules.size());
+    w.put(it.second.rules.data(), it.second.rules.size());
+  }
+}
+
+template <typename K, typename T>
+bool MetadataIO_GetRuleBooks(MetadataReader &r, T &rbs) {
+  uint64_t count, n;
+  if (not r.get(count))
+    return false;
+  for (uint64_t i = 0; i < count; i++) {
+    K key;
+    if (not r.get(key))
+      return false;
+    auto &rb = rbs[key];
+    if (not(r.get(n) and n <= (uint64_t)(r.end - r.p) / sizeof(uInt)))
+      return false;
+    rb.offsets.resize(n);
+    if (not(r.get(rb.offsets.data(), n) and r.get(n) and
+            n <= (uint64_t)(r.end - r.p) / sizeof(uInt)))
+      return false;
+    rb.rules.resize(n);
+    if (not r.get(rb.rules.data(), n))
+      return false;
+  }
+  return true;
+}
+
+// Structural checks on what was read, so that a corrupt file is rejected
+// rather than handing out-of-range rows to the kernels. A rulebook's offsets
+// start at 0, never decrease and end at rules.size().
+inline bool MetadataIO_ValidOffsets(RuleBook &rb) {
+  if (rb.offsets.empty())
+    return rb.rules.empty();
+  if (rb.offsets[0] != 0 or rb.offsets.back() != rb.rules.size())
+    return false;
+  for (std::size_t k = 1; k < rb.offsets.size(); k++)
+    if (rb.offsets[k] < rb.offsets[k - 1])
+      return false;
+  return true;
+}
+
+// Rows made of (a, b) pairs with every a < na and b < nb.
+inline bool MetadataIO_ValidPairs(RuleBook &rb, uint64_t na, uint64_t nb) {
+  if (not MetadataIO_ValidOffsets(rb))
+    return false;
+  for (std::size_t k = 1; k < rb.offsets.size(); k++)
+    if ((rb.offsets[k] - rb.offsets[k - 1]) % 2)
+      return false;
+  for (std::size_t i = 0; i + 1 < rb.rules.size(); i += 2)
+    if (rb.rules[i] >= na or rb.rules[i + 1] >= nb)
+      return false;
+  return true;
+}
+
+template <uInt dimension>
+uint64_t MetadataIO_NActive(Metadata<dimension> &m,
+                            const Point<dimension> &p) {
+  auto it = m.nActive.find(p);
+  return it == m.nActive.end() ? 0 : it->second;
+}
+
+template <uInt dimension, uInt n>
+Point<dimension> MetadataIO_SubPoint(const Point<n> &key, uInt part) {
+  Point<dimension> p;
+  for (uInt i = 0; i < dimension; i++)
+    p[i] = key[part * dimension + i];
+  return p;
+}
+
+template <uInt dimension> bool MetadataIO_Valid(Metadata<dimension> &m) {
+  // sites: row ctr + idx of their sample
+  for (auto &it : m.grids) {
+    uint64_t n = MetadataIO_NActive<dimension>(m, it.first);
+    for (auto &grid : it.second)
+      for (auto &site : grid.mp)
+        if ((uint64_t)grid.ctr + site.second >= n)
+          return false;
+  }
+  // valid convolutions: (input, output) rows at the same spatial size
+  for (auto &it : m.validRuleBooks) {
+    uint64_t n = MetadataIO_NActive<dimension>(
+        m, MetadataIO_SubPoint<dimension, 2 * dimension>(it.first, 0));
+    if (not MetadataIO_ValidPairs(it.second, n, n))
+      return false;
+  }
+  // strided convolutions, keyed by (input size, filter size, stride): input
+  // rows at the input size, output rows at the output size when that is
+  // known, else at the largest one
+  uint64_t maxActive = 0;
+  for (auto &it : m.nActive)
+    maxActive = std::max(maxActive, (uint64_t)it.second);
+  for (auto &it : m.ruleBooks) {
+    auto iS = MetadataIO_SubPoint<dimension, 3 * dimension>(it.first, 0);
+    auto size = MetadataIO_SubPoint<dimension, 3 * dimension>(it.first, 1);
+    auto stride = MetadataIO_SubPoint<dimension, 3 * dimension>(it.first, 2);
+    Point<dimension> oS;
+    bool known = true;
+    for (uInt i = 0; i < dimension; i++) {
+      known = known and stride[i] > 0;
+      oS[i] = known ? (iS[i] - size[i]) / stride[i] + 1 : 0;
+    }
+    uint64_t ni = MetadataIO_NActive<dimension>(m, iS);
+    uint64_t no = known and m.nActive.count(oS)
+                      ? MetadataIO_NActive<dimension>(m, oS)
+                      : maxActive;
+    if (not MetadataIO_ValidPairs(it.second, ni, no))
+      return false;
+  }
+  // sparse to dense: (input row, offset into the dense volume)
+  for (auto &it : m.sparseToDenseRuleBooks) {
+    uint64_t volume = 1;
+    for (uInt i = 0; i < dimension; i++)
+      volume *= it.first[i] > 0 ? (uint64_t)it.first[i] : 0;
+    uint64_t n = MetadataIO_NActive<dimension>(m, it.first);
+    if (not MetadataIO_ValidPairs(it.second, n, volume))
+      return false;
+  }
+  // active pooling: a batchSize x (maxActive + 1) table of counts and rows,
+  // then (batchSize, maxActive)
+  for (auto &it : m.activePoolingRuleBooks) {
+    auto &rb = it.second;
+    if (rb.empty())
+      continue;
+    if (not(MetadataIO_ValidOffsets(rb) and rb.offsets.size() == 3 and
+            rb.offsets[2] - rb.offsets[1] == 2))
+      return false;
+    uint64_t batchSize = rb.rules[rb.offsets[1]];
+    uint64_t width = (uint64_t)rb.rules[rb.offsets[1] + 1] + 1;
+    if (batchSize * width != rb.offsets[1])
+      return false;
+    uint64_t n = MetadataIO_NActive<dimension>(m, it.first);
+    for (uint64_t b = 0; b < batchSize; b++) {
+      uInt *row = rb.rules.data() + b * width;
+      if (row[0] >= width)
+        return false;
+      for (uint64_t j = 1; j <= row[0]; j++)
+        if (row[j] >= n)
+          return false;
+    }
+  }
+  return true;
+}
+
+template <uInt dimension>
+void Metadata_Serialize(Metadata<dimension> &m, MetadataWriter &w) {
+  w.put("SCNM", 4);
+  w.put(MetadataIO_Version);
+  w.put(dimension);
+  w.put((uInt)sizeof(Int));
+  w.put((uInt)sizeof(uInt));
+  w.put(m.inputSpatialSize);
+  w.put((char)m.useSortedGrids);
+  w.put((uint64_t)m.nActive.size());
+  for (auto &it : m.nActive) {
+    w.put(it.first);
+    w.put(it.second);
+  }
+  w.put((uint64_t)m.grids.size());
+  for (auto &it : m.grids) {
+    w.put(it.first);
+    w.put((uint64_t)it.second.size());
+    for (auto &grid : it.second) {
+      w.put(grid.ctr);
+      w.put((uint64_t)grid.mp.size());
+      for (auto &site : grid.mp) {
+        w.put(site.first);
+        w.put(site.second);
+      }
+    }
+  }
+  MetadataIO_PutRuleBooks(w, m.validRuleBooks);
+  MetadataIO_PutRuleBooks(w, m.ruleBooks);
+  MetadataIO_PutRuleBooks(w, m.activePoolingRuleBooks);
+  MetadataIO_PutRuleBooks(w, m.sparseToDenseRuleBooks);
+}
+
+// Reads into a new Metadata, and only replaces the contents of m once the
+// whole file has been read and checked. Returns false, leaving m untouched,
+// if the data is truncated, inconsistent or was written by another version
+// or for a different dimension or integer width.
+template <uInt dimension>
+bool Metadata_Deserialize(Metadata<dimension> &m, MetadataReader &r) {
+  Metadata<dimension> t;
+  char magic[4];
+  uInt version, dim, intSize, uIntSize;
+  if (not(r.get(magic, 4) and std::memcmp(magic, "SCNM", 4) == 0 and
+          r.get(version) and version == MetadataIO_Version and r.get(dim) and
+          dim == dimension and r.get(intSize) and intSize == sizeof(Int) and
+          r.get(uIntSize) and uIntSize == sizeof(uInt)))
+    return false;
+  Point<dimension> inputSpatialSize;
+  char useSortedGrids;
+  uint64_t count, nSamples, nSites;
+  bool ok =
+      r.get(inputSpatialSize) and r.get(useSortedGrids) and r.get(count);
+  for (uint64_t i = 0; ok and i < count; i++) {
+    Point<dimension> key;
+    uInt n;
+    ok = r.get(key) and r.get(n);
+    if (ok)
+      t.nActive[key] = n;
+  }
+  ok = ok and r.get(count);
+  for (uint64_t i = 0; ok and i < count; i++) {
+    Point<dimension> key;
+    ok = r.get(key) and r.get(nSamples) and
+         nSamples <= (uint64_t)(r.end - r.p) / sizeof(uInt);
+    if (not ok)
+      break;
+    auto &SGs = t.grids[key];
+    SGs.resize(nSamples);
+    for (auto &grid : SGs) {
+      ok = r.get(grid.ctr) and r.get(nSites);
+      for (uint64_t j = 0; ok and j < nSites; j++) {
+        Point<dimension> p;
+        uInt idx;
+        ok = r.get(p) and r.get(idx);
+        if (ok)
+          grid.mp[p] = idx;
+      }
+      if (not ok)
+        break;
+    }
+  }
+  ok = ok and
+       MetadataIO_GetRuleBooks<Point<2 * dimension>>(r, t.validRuleBooks) and
+       MetadataIO_GetRuleBooks<Point<3 * dimension>>(r, t.ruleBooks) and
+       MetadataIO_GetRuleBooks<Point<dimension>>(r,
+                                                 t.activePoolingRuleBooks) and
+       MetadataIO_GetRuleBooks<Point<dimension>>(r, t.sparseToDenseRuleBooks);
+  if (not(ok and MetadataIO_Valid(t)))
+    return false;
+  m.clear();
+  std::swap(m.nActive, t.nActive);
+  std::swap(m.grids, t.grids);
+  std::swap(m.activePoolingRuleBooks, t.activePoolingRuleBooks);
+  std::swap(m.validRuleBooks, t.validRuleBooks);
+  std::swap(m.ruleBooks, t.ruleBooks);
+  std::swap(m.sparseToDenseRuleBooks, t.sparseToDenseRuleBooks);
+  m.useSortedGrids = useSortedGrids;
+  m.inputSpatialSize = inputSpatialSize;
+  if (m.grids.count(inputSpatialSize)) { // not for metadata without input
+    m.inputSGs = &m.grids[inputSpatialSize];
+    m.inputNActive = &m.nActive[inputSpatialSize];
+    m.inputSG = m.inputSGs->empty() ? nullptr : &m.inputSGs->back();
+  }
+  return true;
+}
+
+
+template <uInt dimension>
+bool Metadata_Save(Metadata<dimension> &m, const char *filename) {
+  MetadataWriter w;
+  Metadata_Serialize(m, w);
+  FILE *f = fopen(filename, "wb");
+  if (not f)
+    return false;
+  bool ok = fwrite(w.buffer.data(), 1, w.buffer.size(), f) == w.buffer.size();
+  return fclose(f) == 0 and ok;
+}
+
+template <uInt dimension>
+bool Metadata_Load(Metadata<dimension> &m, const char *filename) {
+  int fd = open(filename, O_RDONLY);
+  if (fd < 0)
+    return false;
+  struct stat st;
+  bool ok = fstat(fd, &st) == 0 and st.st_size > 0;
+  if (ok) {
+    void *data = mmap(nullptr, st.st_size, PROT_READ, MAP_PRIVATE, fd, 0);
+    ok = data != MAP_FAILED;
+    if (ok) {
+      MetadataReader r((const char *)data, st.st_size);
+      ok = Metadata_Deserialize(m, r);
+      munmap(data, st.st_size);
+    }
+  }
+  close(fd);
+  return ok;
+}
+
+#endif /* METADATAIO_H */
@@ -0,0 +1,170 @@
+// Copyright 2016-present, Facebook, Inc.
+// All rights reserved.
+//
+// This source code is licensed under the license found in the
+// LICENSE file in the root directory of this source tree.
+
+#ifndef SORTEDGRIDRULES_H
+#define SORTEDGRIDRULES_H
+#include "RectangularRegions.h"
+#include <algorithm>
+
+// SortedGrid<dimension> - an alternative site index to the SparseGridMap hash
+// table. The active sites of one sample are stored as an ascending array of
+// linear keys
+//   key(p) = (..((p[0] * S[1] + p[1]) * S[2] + p[2]) ..)
+// with S the spatial size. Shifting every site by the same filter offset adds
+// the same constant to every key, so the shifted key array stays sorted and
+// all neighbours for one filter offset are found with a single merge-join
+// against the unshifted array, with no hashing.
+//
+// (A Morton/Z-order key would give better spatial locality but is not
+// preserved by translation, so every shifted array would need re-sorting.)
+
+template <uInt dimension> class SortedGrid {
+public:
+  std::vector<uint64_t> keys; // ascending
+  std::vector<uInt> idx;      // idx[j] is the row of keys[j] within the sample
+  uInt ctr;                   // offset of the sample within the batch
+  SortedGrid() : ctr(0) {}
+};
+
+template <uInt dimension>
+using SortedGrids = std::vector<SortedGrid<dimension>>;
+
+template <uInt dimension>
+uint64_t SortedGrid_Key(const Point<dimension> &p, long *spatialSize) {
+  uint64_t key = 0;
+  for (uInt i = 0; i < dimension; i++)
+    key = key * spatialSize[i] + p[i];
+  return key;
+}
+
+template <uInt dimension>
+void SortedGrid_Point(uint64_t key, long *spatialSize, Int *p) {
+  for (Int i = dimension - 1; i >= 0; i--) {
+    p[i] = key % spatialSize[i];
+    key /= spatialSize[i];
+  }
+}
+
+template <uInt dimension>
+void SparseGridToSortedGrid(SparseGrid<dimension> &grid,
+                            SortedGrid<dimension> &sg, long *spatialSize) {
+  std::vector<std::pair<uint64_t, uInt>> entries;
+  entries.reserve(grid.mp.size());
+  for (auto const &iter : grid.mp)
+    entries.push_back(
+        std::make_pair(SortedGrid_Key<dimension>(iter.first, spatialSize),
+                       iter.second));
+  std::sort(entries.begin(), entries.end());
+  sg.keys.resize(entries.size());
+  sg.idx.resize(entries.size());
+  for (uInt j = 0; j < entries.size(); j++) {
+    sg.keys[j] = entries[j].first;
+    sg.idx[j] = entries[j].second;
+  }
+  sg.ctr = grid.ctr;
+}
+
+template <uInt dimension>
+void SparseGridsToSortedGrids(SparseGrids<dimension> &SGs,
+                              SortedGrids<dimension> &sortedGrids,
+                              long *spatialSize) {
+  uInt batchSize = SGs.size();
+  sortedGrids.resize(batchSize);
+  uInt i;
+#pragma omp parallel for private(i)
+  for (i = 0; i < batchSize; i++)
+    SparseGridToSortedGrid<dimension>(SGs[i], sortedGrids[i], spatialSize);
+}
+
+// Merge-join the sites of sg with the same sites shifted by 'offset'.
+// For each site whose neighbour at +offset is active, call f(input, output)
+// with the rows of the (neighbour, site) pair within the sample.
+template <uInt dimension, typename F>
+void SortedGrid_ForEachNeighbour(SortedGrid<dimension> &sg, Int *offset,
+                                 long *spatialSize, F f) {
+  int64_t delta = 0;
+  for (uInt i = 0; i < dimension; i++)
+    delta = delta * spatialSize[i] + offset[i];
+  auto &keys = sg.keys;
+  uInt n = keys.size(), j = 0;
+  Int p[dimension];
+  for (uInt o = 0; o < n; o++) {
+    int64_t target = (int64_t)keys[o] + delta;
+    if (target < 0)
+      continue;
+    while (j < n and (int64_t)keys[j] < target)
+      j++;
+    if (j == n)
+      break;
+    if ((int64_t)keys[j] != target)
+      continue;
+    // The key of a site just over a face of the grid wraps round to a site
+    // on the opposite face; only accept genuine neighbours.
+    SortedGrid_Point<dimension>(keys[o], spatialSize, p);
+    bool inside = true;
+    for (uInt i = 0; i < dimension; i++)
+      inside = inside and p[i] + offset[i] >= 0 and
+               p[i] + offset[i] < spatialSize[i];
+    if (inside)
+      f(sg.idx[j], sg.idx[o]);
+  }
+}
+
+// Filter offset k, enumerated in the same order as InputRegionCalculator_Valid
+template <uInt dimension>
+void SortedGrid_FilterOffset(uInt k, long *size, Int *offset) {
+  for (Int i = dimension - 1; i >= 0; i--) {
+    offset[i] = (Int)(k % size[i]) - size[i] / 2;
+    k /= size[i];
+  }
+}
+
+// Valid convolution rulebook from sorted grids. Each (sample, filter offset)
+// pair is an independent merge-join, so both passes parallelise over
+// batchSize * volume(size) tasks, even for a single sample.
+template <uInt dimension>
+uInt ValidConvolution_SortedGridsToRules(SortedGrids<dimension> &sortedGrids,
+                                         RuleBook &rules, long *size,
+                                         long *spatialSize) {
+  uInt sd = volume<dimension>(size);
+  uInt batchSize = sortedGrids.size();
+  uInt nTasks = batchSize * sd;
+  std::vector<uInt> cursors(nTasks, 0);
+  rules.clear();
+  {
+    uInt t;
+#pragma omp parallel for private(t) schedule(dynamic)
+    for (t = 0; t < nTasks; t++) {
+      Int offset[dimension];
+      SortedGrid_FilterOffset<dimension>(t % sd, size, offset);
+      uInt c = 0;
+      SortedGrid_ForEachNeighbour<dimension>(sortedGrids[t / sd], offset,
+                                             spatialSize,
+                                             [&](uInt, uInt) { c++; });
+      cursors[t] = c;
+    }
+  }
+  uInt countActiveInputs = rules.allocate(cursors, batchSize, sd);
+  if (countActiveInputs) {
+    auto r = &rules.rules[0];
+    uInt t;
+#pragma omp parallel for private(t) schedule(dynamic)
+    for (t = 0; t < nTasks; t++) {
+      auto &sg = sortedGrids[t / sd];
+      Int offset[dimension];
+      SortedGrid_FilterOffset<dimension>(t % sd, size, offset);
+      uInt cursor = cursors[t];
+      SortedGrid_ForEachNeighbour<dimension>(sg, offset, spatialSize,
+                                             [&](uInt input, uInt output) {
+                                               r[cursor++] = input + sg.ctr;
+                                               r[cursor++] = output + sg.ctr;
+                                             });
+    }
+  }
+  return countActiveInputs;
+}
+
+#endif /* SORTEDGRIDRULES_H */
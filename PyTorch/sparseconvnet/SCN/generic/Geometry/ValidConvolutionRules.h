@@ -22,69 +22,179 @@ InputRegionCalculator_Valid(const Point<dimension> &output, long *size) {
 
 // Call for each convolutional / max-pooling layer, once for each batch item.
 // rules is used to carry out the "lowering" whilst carrying out the convolution
+//
+// Rulebooks are built in two passes: count the rules for each filter offset,
+// size the flat RuleBook, then write the rules into place.
 
 template <uInt dimension>
-double ValidConvolution_SgToRules(SparseGrid<dimension> &grid, RuleBook &rules,
-                                  long *size) {
-  uInt sd = volume<dimension>(size);
-  double countActiveInputs = 0;
-  for (auto const &outputIter : grid.mp) {
-    auto inRegion =
-        InputRegionCalculator_Valid<dimension>(outputIter.first, size);
-    uInt rulesOffset = 0;
-    for (auto inputPoint : inRegion) {
-      auto inputIter = grid.mp.find(inputPoint);
-      if (inputIter != grid.mp.end()) {
-        rules[rulesOffset].push_back(inputIter->second + grid.ctr);
-        rules[rulesOffset].push_back(outputIter.second + grid.ctr);
-        countActiveInputs++;
-      }
-      rulesOffset++;
+void ValidConvolution_PointToRuleCounts(SparseGrid<dimension> &grid,
+                                        const Point<dimension> &output,
+                                        uInt *counts, long *size) {
+  auto inRegion = InputRegionCalculator_Valid<dimension>(output, size);
+  uInt rulesOffset = 0;
+  for (auto inputPoint : inRegion) {
+    if (grid.mp.find(inputPoint) != grid.mp.end())
+      counts[rulesOffset]++;
+    rulesOffset++;
+  }
+}
+
+// cursors[k] is the position in rules.rules of the next rule for offset k
+template <uInt dimension>
+void ValidConvolution_PointToRules(SparseGrid<dimension> &grid,
+                                   const Point<dimension> &output,
+                                   uInt outputIdx, uInt *r, uInt *cursors,
+                                   long *size) {
+  auto inRegion = InputRegionCalculator_Valid<dimension>(output, size);
+  uInt rulesOffset = 0;
+  for (auto inputPoint : inRegion) {
+    auto inputIter = grid.mp.find(inputPoint);
+    if (inputIter != grid.mp.end()) {
+      r[cursors[rulesOffset]++] = inputIter->second + grid.ctr;
+      r[cursors[rulesOffset]++] = outputIdx + grid.ctr;
     }
+    rulesOffset++;
   }
-  return countActiveInputs;
+}
+
+template <uInt dimension>
+void ValidConvolution_SgToRuleCounts(SparseGrid<dimension> &grid, uInt *counts,
+                                     long *size) {
+  for (auto const &outputIter : grid.mp)
+    ValidConvolution_PointToRuleCounts<dimension>(grid, outputIter.first,
+                                                  counts, size);
+}
+
+template <uInt dimension>
+void ValidConvolution_SgToRules(SparseGrid<dimension> &grid, RuleBook &rules,
+                                uInt *cursors, long *size) {
+  auto r = &rules.rules[0];
+  for (auto const &outputIter : grid.mp)
+    ValidConvolution_PointToRules<dimension>(grid, outputIter.first,
+                                             outputIter.second, r, cursors,
+                                             size);
 }
 
 template <uInt dimension>
 uInt ValidConvolution_SgsToRules(SparseGrids<dimension> &SGs, RuleBook &rules,
                                  long *size) {
   uInt sd = volume<dimension>(size);
-  uInt countActiveInputs = 0;
+  uInt batchSize = SGs.size();
+  std::vector<uInt> cursors(batchSize * sd, 0);
   rules.clear();
-  rules.resize(sd);
-  for (uInt i = 0; i < SGs.size(); i++)
-    countActiveInputs +=
-        ValidConvolution_SgToRules<dimension>(SGs[i], rules, size);
+  for (uInt i = 0; i < batchSize; i++)
+    ValidConvolution_SgToRuleCounts<dimension>(SGs[i], &cursors[i * sd], size);
+  uInt countActiveInputs = rules.allocate(cursors, batchSize, sd);
+  if (countActiveInputs)
+    for (uInt i = 0; i < batchSize; i++)
+      ValidConvolution_SgToRules<dimension>(SGs[i], rules, &cursors[i * sd],
+                                            size);
   return countActiveInputs;
 }
+
+// The OMP builder splits every SparseGrid into chunks of at most
+// ValidConvolution_ChunkSize output sites, so that a single large sample is
+// spread over all threads. Chunks are numbered in hash-table order, batch item
+// by batch item, so the resulting RuleBook is identical to the serial one.
+const uInt ValidConvolution_ChunkSize = 4096;
+
 template <uInt dimension>
 uInt ValidConvolution_SgsToRules_OMP(SparseGrids<dimension> &SGs,
                                      RuleBook &rules, long *size) {
-  std::vector<RuleBook> rbs(SGs.size());
-  std::vector<double> countActiveInputs(SGs.size());
-  rules.clear();
   uInt sd = volume<dimension>(size);
-  rules.resize(sd);
-  {
-    uInt i;
-#pragma omp parallel for private(i)
-    for (i = 0; i < SGs.size(); i++) {
-      rbs[i].resize(sd);
-      countActiveInputs[i] =
-          ValidConvolution_SgToRules<dimension>(SGs[i], rbs[i], size);
+  uInt batchSize = SGs.size();
+  rules.clear();
+
+  // Gather the (point, index) entries of each hash table and cut them into
+  // chunks; chunkGrid[c] is the batch item that chunk c belongs to.
+  std::vector<const typename SparseGridMap<dimension>::value_type *> entries;
+  std::vector<uInt> chunkStart, chunkGrid;
+  for (uInt i = 0; i < batchSize; i++) {
+    uInt j = 0;
+    for (auto const &iter : SGs[i].mp) {
+      if (j++ % ValidConvolution_ChunkSize == 0) {
+        chunkStart.push_back(entries.size());
+        chunkGrid.push_back(i);
+      }
+      entries.push_back(&iter);
     }
   }
+  uInt nChunks = chunkStart.size();
+  chunkStart.push_back(entries.size());
+
+  std::vector<uInt> cursors(nChunks * sd, 0);
   {
-    uInt i;
-#pragma omp parallel for private(i)
-    for (i = 0; i < sd; i++)
-      for (auto const &rb : rbs)
-        rules[i].insert(rules[i].end(), rb[i].begin(), rb[i].end());
+    uInt c;
+#pragma omp parallel for private(c) schedule(dynamic)
+    for (c = 0; c < nChunks; c++) {
+      auto &grid = SGs[chunkGrid[c]];
+      for (uInt j = chunkStart[c]; j < chunkStart[c + 1]; j++)
+        ValidConvolution_PointToRuleCounts<dimension>(grid, entries[j]->first,
+                                                      &cursors[c * sd], size);
+    }
+  }
+  uInt countActiveInputs = rules.allocate(cursors, nChunks, sd);
+  if (countActiveInputs) {
+    auto r = &rules.rules[0];
+    uInt c;
+#pragma omp parallel for private(c) schedule(dynamic)
+    for (c = 0; c < nChunks; c++) {
+      auto &grid = SGs[chunkGrid[c]];
+      for (uInt j = chunkStart[c]; j < chunkStart[c + 1]; j++)
+        ValidConvolution_PointToRules<dimension>(
+            grid, entries[j]->first, entries[j]->second, r, &cursors[c * sd],
+            size);
+    }
+  }
+  return countActiveInputs;
+}
+
+// Keep only the rules whose input and output rows carry the same label, e.g.
+// belong to the same spatial group. Row numbering is unchanged.
+void ValidConvolution_FilterRules(RuleBook &rules, RuleBook &filtered,
+                                  std::vector<uInt> &labels) {
+  uInt sd = rules.size();
+  std::vector<uInt> cursors(sd, 0);
+  filtered.clear();
+  uInt k;
+#pragma omp parallel for private(k)
+  for (k = 0; k < sd; k++) {
+    auto r = rules[k];
+    for (uInt j = 0; j < r.size(); j += 2)
+      if (labels[r[j]] == labels[r[j + 1]])
+        cursors[k]++;
+  }
+  if (filtered.allocate(cursors, 1, sd)) {
+    auto f = &filtered.rules[0];
+#pragma omp parallel for private(k)
+    for (k = 0; k < sd; k++) {
+      auto r = rules[k];
+      for (uInt j = 0; j < r.size(); j += 2)
+        if (labels[r[j]] == labels[r[j + 1]]) {
+          f[cursors[k]++] = r[j];
+          f[cursors[k]++] = r[j + 1];
+        }
+    }
+  }
+}
+
+// Output-stationary form of a valid convolution rulebook: row i of the
+// nActive x volume(size) table holds, for each filter offset, the input site
+// feeding output site i, or uInt_MAX if that neighbour is not active.
+// For a fixed offset each output occurs in at most one rule, so the rows of
+// the rulebook can be written in parallel.
+void ValidConvolution_RulesToNeighbourTable(RuleBook &rules,
+                                            std::vector<uInt> &table,
+                                            uInt nActive) {
+  uInt sd = rules.size();
+  table.assign(nActive * sd, uInt_MAX);
+  uInt k;
+#pragma omp parallel for private(k)
+  for (k = 0; k < sd; k++) {
+    auto r = rules[k];
+    for (uInt j = 0; j < r.size(); j += 2)
+      table[r[j + 1] * sd + k] = r[j];
   }
-  uInt countActiveInputs_ = 0;
-  for (auto &i : countActiveInputs)
-    countActiveInputs_ += i;
-  return countActiveInputs_;
 }
 
 #endif /* VALIDCONVOLUTIONRULES_H */
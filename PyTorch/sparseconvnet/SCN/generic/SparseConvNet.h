@@ -54,8 +54,76 @@ template <uInt dimension>
 using SparseGrids = std::vector<SparseGrid<dimension>>;
 
 // Each convolution/pooling operation requires the calculation of a 'rulebook'
-// setting out how the output points depend on the points in the layer below
-using RuleBook = std::vector<std::vector<uInt>>;
+// setting out how the output points depend on the points in the layer below.
+//
+// The rulebook is stored flat (CSR style): row k, e.g. the (input, output)
+// pairs for filter offset k, occupies rules[offsets[k]] .. rules[offsets[k+1]-1]
+// of a single contiguous array. rb[k] returns a RuleBookRow view of row k, so
+// kernels can iterate over the rows as before, whilst the GPU code can upload
+// the whole book with one copy.
+class RuleBookRow {
+public:
+  uInt *ptr;
+  uInt n;
+  RuleBookRow(uInt *ptr, uInt n) : ptr(ptr), n(n) {}
+  uInt size() const { return n; }
+  bool empty() const { return n == 0; }
+  uInt &operator[](uInt i) { return ptr[i]; }
+  uInt *begin() { return ptr; }
+  uInt *end() { return ptr + n; }
+};
+
+class RuleBook {
+public:
+  std::vector<uInt> offsets; // size() + 1 entries once the book is built
+  std::vector<uInt> rules;
+
+  uInt size() const { return offsets.empty() ? 0 : offsets.size() - 1; }
+  bool empty() const { return offsets.empty(); }
+  void clear() {
+    offsets.clear();
+    rules.clear();
+  }
+  RuleBookRow operator[](uInt k) {
+    return RuleBookRow(rules.data() + offsets[k], offsets[k + 1] - offsets[k]);
+  }
+
+  // Size the book from a counting pass.
+  // counts[g * nRows + k] is the number of (input, output) pairs that group g
+  // (typically a sample in the batch) contributes to row k. Groups are stored
+  // one after another within each row. On return counts[g * nRows + k] is the
+  // position in 'rules' where group g should write its first pair for row k.
+  // Returns the total number of pairs.
+  uInt allocate(std::vector<uInt> &counts, uInt nGroups, uInt nRows) {
+    offsets.resize(nRows + 1);
+    uInt ctr = 0;
+    for (uInt k = 0; k < nRows; k++) {
+      offsets[k] = ctr;
+      for (uInt g = 0; g < nGroups; g++) {
+        uInt c = counts[g * nRows + k];
+        counts[g * nRows + k] = ctr;
+        ctr += 2 * c;
+      }
+    }
+    offsets[nRows] = ctr;
+    rules.resize(ctr);
+    return ctr / 2;
+  }
+
+  class iterator {
+  public:
+    RuleBook *rb;
+    uInt k;
+    RuleBookRow operator*() { return (*rb)[k]; }
+    iterator &operator++() {
+      ++k;
+      return *this;
+    }
+    bool operator!=(const iterator &other) const { return k != other.k; }
+  };
+  iterator begin() { return {this, 0}; }
+  iterator end() { return {this, size()}; }
+};
 
 // Code relating to squares/cubes/rectangles/cuboids etc
 // integer powers - ok for filter sizes, could overflow if we calculate
@@ -93,15 +161,10 @@ template <uInt dimension> uInt volume(long *point) {
 
 uInt ruleBookMaxSize(RuleBook &rb) {
   uInt m = 0;
-  for (auto &r : rb)
-    m = std::max(m, (uInt)r.size());
-  return m;
-}
-uInt ruleBookTotalSize(RuleBook &rb) {
-  uInt m = 0;
-  for (auto &r : rb)
-    m += (uInt)r.size();
+  for (uInt k = 0; k < rb.size(); k++)
+    m = std::max(m, rb.offsets[k + 1] - rb.offsets[k]);
   return m;
 }
+uInt ruleBookTotalSize(RuleBook &rb) { return rb.rules.size(); }
 
 #endif /* SPARSECONVNET_H */
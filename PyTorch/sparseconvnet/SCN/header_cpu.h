@@ -7,6 +7,7 @@
 long scn_readPtr(void **ptr);
 void scn_writePtr(long p, void **ptr);
 double scn_ruleBookBits(void);
+long scn_metadataVersion(void);
 void scn_2_drawCurve(void **m, THFloatTensor *features, THFloatTensor *stroke);
 double scn_1_addSampleFromThresholdedTensor(
   void **m, THFloatTensor *features_, THFloatTensor *tensor_,
@@ -17,9 +18,15 @@ void scn_1_createMetadataForDenseToSparse(
 void scn_1_setInputBatchSpatialLocations(
   void **m, THFloatTensor *features_, THLongTensor *locations_, THFloatTensor *vecs_, THLongTensor *nz_nums_);
 void scn_1_freeMetadata(void **metadata);
+_Bool scn_1_saveMetadata(void **m, const char *filename);
+_Bool scn_1_loadMetadata(void **m, const char *filename);
+void scn_1_serializeMetadata(void **m, THByteTensor *buffer);
+_Bool scn_1_deserializeMetadata(void **m, THByteTensor *buffer);
 void scn_1_generateRuleBooks3s2(void **m);
 void scn_1_generateRuleBooks2s2(void **m);
 void scn_1_setInputSpatialSize(void **m, THLongTensor *spatialSize);
+void scn_1_setGridBackend(void **m, _Bool sorted);
+double scn_1_gridBytes(void **m, _Bool sorted);
 void scn_1_setInputSpatialLocation(void **m, THFloatTensor *features,
   THLongTensor *location, THFloatTensor *vec, _Bool overwrite);
 void scn_1_setInputSpatialLocations(void **m, THFloatTensor *features,
@@ -38,9 +45,15 @@ void scn_2_createMetadataForDenseToSparse(
 void scn_2_setInputBatchSpatialLocations(
   void **m, THFloatTensor *features_, THLongTensor *locations_, THFloatTensor *vecs_, THLongTensor *nz_nums_);
 void scn_2_freeMetadata(void **metadata);
+_Bool scn_2_saveMetadata(void **m, const char *filename);
+_Bool scn_2_loadMetadata(void **m, const char *filename);
+void scn_2_serializeMetadata(void **m, THByteTensor *buffer);
+_Bool scn_2_deserializeMetadata(void **m, THByteTensor *buffer);
 void scn_2_generateRuleBooks3s2(void **m);
 void scn_2_generateRuleBooks2s2(void **m);
 void scn_2_setInputSpatialSize(void **m, THLongTensor *spatialSize);
+void scn_2_setGridBackend(void **m, _Bool sorted);
+double scn_2_gridBytes(void **m, _Bool sorted);
 void scn_2_setInputSpatialLocation(void **m, THFloatTensor *features,
   THLongTensor *location, THFloatTensor *vec, _Bool overwrite);
 void scn_2_setInputSpatialLocations(void **m, THFloatTensor *features,
@@ -60,9 +73,15 @@ void scn_3_createMetadataForDenseToSparse(
 void scn_3_setInputBatchSpatialLocations(
   void **m, THFloatTensor *features_, THLongTensor *locations_, THFloatTensor *vecs_, THLongTensor *nz_nums_);
 void scn_3_freeMetadata(void **metadata);
+_Bool scn_3_saveMetadata(void **m, const char *filename);
+_Bool scn_3_loadMetadata(void **m, const char *filename);
+void scn_3_serializeMetadata(void **m, THByteTensor *buffer);
+_Bool scn_3_deserializeMetadata(void **m, THByteTensor *buffer);
 void scn_3_generateRuleBooks3s2(void **m);
 void scn_3_generateRuleBooks2s2(void **m);
 void scn_3_setInputSpatialSize(void **m, THLongTensor *spatialSize);
+void scn_3_setGridBackend(void **m, _Bool sorted);
+double scn_3_gridBytes(void **m, _Bool sorted);
 void scn_3_setInputSpatialLocation(void **m, THFloatTensor *features,
   THLongTensor *location, THFloatTensor *vec, _Bool overwrite);
 void scn_3_setInputSpatialLocations(void **m, THFloatTensor *features,
@@ -77,6 +96,7 @@ void scn_3_getSampleWeight(void **m, THLongTensor *spatialSize, THFloatTensor *s
 // void scn_3_precomputeValidRules(void **m, THLongTensor *inputSize, THLongTensor *filterSize);
 void scn_3_getConvMask(void **m, THLongTensor *inputSize, THLongTensor *filterSize, THFloatTensor *mask);
 void scn_3_getValidRules(void **m, THLongTensor *inputSize, THLongTensor *filterSize);
+void scn_3_getGroupValidRules(void **m, void **group_m, THLongTensor *inputSize, THLongTensor *filterSize, THLongTensor *abc, long groupNum);
 void scn_3_getConvRulesAndOutput(void **m, THLongTensor *inputSize, THLongTensor *outputSize, THLongTensor *filterSize, THLongTensor *stride);
 void scn_3_getConvRules2AndOutput(void **m, THLongTensor *inputSize, THLongTensor *outputSize, THLongTensor *filterSize, THLongTensor *stride);
 
@@ -90,9 +110,15 @@ void scn_4_createMetadataForDenseToSparse(
 void scn_4_setInputBatchSpatialLocations(
   void **m, THFloatTensor *features_, THLongTensor *locations_, THFloatTensor *vecs_, THLongTensor *nz_nums_);
 void scn_4_freeMetadata(void **metadata);
+_Bool scn_4_saveMetadata(void **m, const char *filename);
+_Bool scn_4_loadMetadata(void **m, const char *filename);
+void scn_4_serializeMetadata(void **m, THByteTensor *buffer);
+_Bool scn_4_deserializeMetadata(void **m, THByteTensor *buffer);
 void scn_4_generateRuleBooks3s2(void **m);
 void scn_4_generateRuleBooks2s2(void **m);
 void scn_4_setInputSpatialSize(void **m, THLongTensor *spatialSize);
+void scn_4_setGridBackend(void **m, _Bool sorted);
+double scn_4_gridBytes(void **m, _Bool sorted);
 void scn_4_setInputSpatialLocation(void **m, THFloatTensor *features,
   THLongTensor *location, THFloatTensor *vec, _Bool overwrite);
 void scn_4_setInputSpatialLocations(void **m, THFloatTensor *features,
@@ -112,9 +138,15 @@ void scn_5_createMetadataForDenseToSparse(
 void scn_5_setInputBatchSpatialLocations(
   void **m, THFloatTensor *features_, THLongTensor *locations_, THFloatTensor *vecs_, THLongTensor *nz_nums_);
 void scn_5_freeMetadata(void **metadata);
+_Bool scn_5_saveMetadata(void **m, const char *filename);
+_Bool scn_5_loadMetadata(void **m, const char *filename);
+void scn_5_serializeMetadata(void **m, THByteTensor *buffer);
+_Bool scn_5_deserializeMetadata(void **m, THByteTensor *buffer);
 void scn_5_generateRuleBooks3s2(void **m);
 void scn_5_generateRuleBooks2s2(void **m);
 void scn_5_setInputSpatialSize(void **m, THLongTensor *spatialSize);
+void scn_5_setGridBackend(void **m, _Bool sorted);
+double scn_5_gridBytes(void **m, _Bool sorted);
 void scn_5_setInputSpatialLocation(void **m, THFloatTensor *features,
   THLongTensor *location, THFloatTensor *vec, _Bool overwrite);
 void scn_5_setInputSpatialLocations(void **m, THFloatTensor *features,
@@ -134,9 +166,15 @@ void scn_6_createMetadataForDenseToSparse(
 void scn_6_setInputBatchSpatialLocations(
   void **m, THFloatTensor *features_, THLongTensor *locations_, THFloatTensor *vecs_, THLongTensor *nz_nums_);
 void scn_6_freeMetadata(void **metadata);
+_Bool scn_6_saveMetadata(void **m, const char *filename);
+_Bool scn_6_loadMetadata(void **m, const char *filename);
+void scn_6_serializeMetadata(void **m, THByteTensor *buffer);
+_Bool scn_6_deserializeMetadata(void **m, THByteTensor *buffer);
 void scn_6_generateRuleBooks3s2(void **m);
 void scn_6_generateRuleBooks2s2(void **m);
 void scn_6_setInputSpatialSize(void **m, THLongTensor *spatialSize);
+void scn_6_setGridBackend(void **m, _Bool sorted);
+double scn_6_gridBytes(void **m, _Bool sorted);
 void scn_6_setInputSpatialLocation(void **m, THFloatTensor *features,
   THLongTensor *location, THFloatTensor *vec, _Bool overwrite);
 void scn_6_setInputSpatialLocations(void **m, THFloatTensor *features,
@@ -156,9 +194,15 @@ void scn_7_createMetadataForDenseToSparse(
 void scn_7_setInputBatchSpatialLocations(
   void **m, THFloatTensor *features_, THLongTensor *locations_, THFloatTensor *vecs_, THLongTensor *nz_nums_);
 void scn_7_freeMetadata(void **metadata);
+_Bool scn_7_saveMetadata(void **m, const char *filename);
+_Bool scn_7_loadMetadata(void **m, const char *filename);
+void scn_7_serializeMetadata(void **m, THByteTensor *buffer);
+_Bool scn_7_deserializeMetadata(void **m, THByteTensor *buffer);
 void scn_7_generateRuleBooks3s2(void **m);
 void scn_7_generateRuleBooks2s2(void **m);
 void scn_7_setInputSpatialSize(void **m, THLongTensor *spatialSize);
+void scn_7_setGridBackend(void **m, _Bool sorted);
+double scn_7_gridBytes(void **m, _Bool sorted);
 void scn_7_setInputSpatialLocation(void **m, THFloatTensor *features,
   THLongTensor *location, THFloatTensor *vec, _Bool overwrite);
 void scn_7_setInputSpatialLocations(void **m, THFloatTensor *features,
@@ -178,9 +222,15 @@ void scn_8_createMetadataForDenseToSparse(
 void scn_8_setInputBatchSpatialLocations(
   void **m, THFloatTensor *features_, THLongTensor *locations_, THFloatTensor *vecs_, THLongTensor *nz_nums_);
 void scn_8_freeMetadata(void **metadata);
+_Bool scn_8_saveMetadata(void **m, const char *filename);
+_Bool scn_8_loadMetadata(void **m, const char *filename);
+void scn_8_serializeMetadata(void **m, THByteTensor *buffer);
+_Bool scn_8_deserializeMetadata(void **m, THByteTensor *buffer);
 void scn_8_generateRuleBooks3s2(void **m);
 void scn_8_generateRuleBooks2s2(void **m);
 void scn_8_setInputSpatialSize(void **m, THLongTensor *spatialSize);
+void scn_8_setGridBackend(void **m, _Bool sorted);
+double scn_8_gridBytes(void **m, _Bool sorted);
 void scn_8_setInputSpatialLocation(void **m, THFloatTensor *features,
   THLongTensor *location, THFloatTensor *vec, _Bool overwrite);
 void scn_8_setInputSpatialLocations(void **m, THFloatTensor *features,
@@ -200,9 +250,15 @@ void scn_9_createMetadataForDenseToSparse(
 void scn_9_setInputBatchSpatialLocations(
   void **m, THFloatTensor *features_, THLongTensor *locations_, THFloatTensor *vecs_, THLongTensor *nz_nums_);
 void scn_9_freeMetadata(void **metadata);
+_Bool scn_9_saveMetadata(void **m, const char *filename);
+_Bool scn_9_loadMetadata(void **m, const char *filename);
+void scn_9_serializeMetadata(void **m, THByteTensor *buffer);
+_Bool scn_9_deserializeMetadata(void **m, THByteTensor *buffer);
 void scn_9_generateRuleBooks3s2(void **m);
 void scn_9_generateRuleBooks2s2(void **m);
 void scn_9_setInputSpatialSize(void **m, THLongTensor *spatialSize);
+void scn_9_setGridBackend(void **m, _Bool sorted);
+double scn_9_gridBytes(void **m, _Bool sorted);
 void scn_9_setInputSpatialLocation(void **m, THFloatTensor *features,
   THLongTensor *location, THFloatTensor *vec, _Bool overwrite);
 void scn_9_setInputSpatialLocations(void **m, THFloatTensor *features,
@@ -222,9 +278,15 @@ void scn_10_createMetadataForDenseToSparse(
 void scn_10_setInputBatchSpatialLocations(
   void **m, THFloatTensor *features_, THLongTensor *locations_, THFloatTensor *vecs_, THLongTensor *nz_nums_);
 void scn_10_freeMetadata(void **metadata);
+_Bool scn_10_saveMetadata(void **m, const char *filename);
+_Bool scn_10_loadMetadata(void **m, const char *filename);
+void scn_10_serializeMetadata(void **m, THByteTensor *buffer);
+_Bool scn_10_deserializeMetadata(void **m, THByteTensor *buffer);
 void scn_10_generateRuleBooks3s2(void **m);
 void scn_10_generateRuleBooks2s2(void **m);
 void scn_10_setInputSpatialSize(void **m, THLongTensor *spatialSize);
+void scn_10_setGridBackend(void **m, _Bool sorted);
+double scn_10_gridBytes(void **m, _Bool sorted);
 void scn_10_setInputSpatialLocation(void **m, THFloatTensor *features,
   THLongTensor *location, THFloatTensor *vec, _Bool overwrite);
 void scn_10_setInputSpatialLocations(void **m, THFloatTensor *features,
@@ -389,6 +451,18 @@ void scn_cpu_float1Deconvolution_backward(
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_float1DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float1DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 // Max Pooling
 void scn_cpu_float1MaxPooling_updateOutput(
   THLongTensor *inputSize, THLongTensor *outputSize,
@@ -420,6 +494,15 @@ void scn_cpu_float1ValidConvolution_backward(
   THFloatTensor *input_features, THFloatTensor *d_input_features,
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_float1SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float1SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_float2ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THFloatTensor *input_features,
@@ -466,6 +549,18 @@ void scn_cpu_float2Deconvolution_backward(
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_float2DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float2DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 
 // Max Pooling
 void scn_cpu_float2MaxPooling_updateOutput(
@@ -498,6 +593,15 @@ void scn_cpu_float2ValidConvolution_backward(
   THFloatTensor *input_features, THFloatTensor *d_input_features,
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_float2SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float2SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_float3ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THFloatTensor *input_features,
@@ -544,6 +648,18 @@ void scn_cpu_float3Deconvolution_backward(
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_float3DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float3DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 // Max Pooling
 void scn_cpu_float3MaxPooling_updateOutput(
   THLongTensor *inputSize, THLongTensor *outputSize,
@@ -575,6 +691,15 @@ void scn_cpu_float3ValidConvolution_backward(
   THFloatTensor *input_features, THFloatTensor *d_input_features,
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_float3SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float3SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_float4ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THFloatTensor *input_features,
@@ -621,6 +746,18 @@ void scn_cpu_float4Deconvolution_backward(
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_float4DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float4DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 
 // Max Pooling
 void scn_cpu_float4MaxPooling_updateOutput(
@@ -653,6 +790,15 @@ void scn_cpu_float4ValidConvolution_backward(
   THFloatTensor *input_features, THFloatTensor *d_input_features,
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_float4SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float4SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_float5ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THFloatTensor *input_features,
@@ -699,6 +845,18 @@ void scn_cpu_float5Deconvolution_backward(
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_float5DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float5DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 // Max Pooling
 void scn_cpu_float5MaxPooling_updateOutput(
   THLongTensor *inputSize, THLongTensor *outputSize,
@@ -730,6 +888,15 @@ void scn_cpu_float5ValidConvolution_backward(
   THFloatTensor *input_features, THFloatTensor *d_input_features,
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_float5SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float5SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_float6ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THFloatTensor *input_features,
@@ -776,6 +943,18 @@ void scn_cpu_float6Deconvolution_backward(
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_float6DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float6DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 
 // Max Pooling
 void scn_cpu_float6MaxPooling_updateOutput(
@@ -808,6 +987,15 @@ void scn_cpu_float6ValidConvolution_backward(
   THFloatTensor *input_features, THFloatTensor *d_input_features,
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_float6SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float6SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_float7ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THFloatTensor *input_features,
@@ -854,6 +1042,18 @@ void scn_cpu_float7Deconvolution_backward(
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_float7DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float7DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 // Max Pooling
 void scn_cpu_float7MaxPooling_updateOutput(
   THLongTensor *inputSize, THLongTensor *outputSize,
@@ -885,6 +1085,15 @@ void scn_cpu_float7ValidConvolution_backward(
   THFloatTensor *input_features, THFloatTensor *d_input_features,
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_float7SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float7SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_float8ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THFloatTensor *input_features,
@@ -931,6 +1140,18 @@ void scn_cpu_float8Deconvolution_backward(
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_float8DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float8DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 
 // Max Pooling
 void scn_cpu_float8MaxPooling_updateOutput(
@@ -963,6 +1184,15 @@ void scn_cpu_float8ValidConvolution_backward(
   THFloatTensor *input_features, THFloatTensor *d_input_features,
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_float8SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float8SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_float9ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THFloatTensor *input_features,
@@ -1009,6 +1239,18 @@ void scn_cpu_float9Deconvolution_backward(
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_float9DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float9DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 // Max Pooling
 void scn_cpu_float9MaxPooling_updateOutput(
   THLongTensor *inputSize, THLongTensor *outputSize,
@@ -1040,6 +1282,15 @@ void scn_cpu_float9ValidConvolution_backward(
   THFloatTensor *input_features, THFloatTensor *d_input_features,
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_float9SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float9SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_float10ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THFloatTensor *input_features,
@@ -1086,6 +1337,18 @@ void scn_cpu_float10Deconvolution_backward(
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_float10DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float10DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 // Max Pooling
 void scn_cpu_float10MaxPooling_updateOutput(
   THLongTensor *inputSize, THLongTensor *outputSize,
@@ -1118,6 +1381,15 @@ void scn_cpu_float10ValidConvolution_backward(
   THFloatTensor *input_features, THFloatTensor *d_input_features,
   THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
   THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_float10SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *output_features, THFloatTensor *weight,
+  THFloatTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_float10SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THFloatTensor *input_features, THFloatTensor *d_input_features,
+  THFloatTensor *d_output_features, THFloatTensor *weight, THFloatTensor *d_weight,
+  THFloatTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_double1ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THDoubleTensor *input_features,
@@ -1164,6 +1436,18 @@ void scn_cpu_double1Deconvolution_backward(
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_double1DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double1DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 // Max Pooling
 void scn_cpu_double1MaxPooling_updateOutput(
   THLongTensor *inputSize, THLongTensor *outputSize,
@@ -1195,6 +1479,15 @@ void scn_cpu_double1ValidConvolution_backward(
   THDoubleTensor *input_features, THDoubleTensor *d_input_features,
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_double1SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double1SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_double2ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THDoubleTensor *input_features,
@@ -1241,6 +1534,18 @@ void scn_cpu_double2Deconvolution_backward(
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_double2DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double2DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 // Max Pooling
 void scn_cpu_double2MaxPooling_updateOutput(
   THLongTensor *inputSize, THLongTensor *outputSize,
@@ -1272,6 +1577,15 @@ void scn_cpu_double2ValidConvolution_backward(
   THDoubleTensor *input_features, THDoubleTensor *d_input_features,
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_double2SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double2SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_double3ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THDoubleTensor *input_features,
@@ -1318,6 +1632,18 @@ void scn_cpu_double3Deconvolution_backward(
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_double3DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double3DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 // Max Pooling
 void scn_cpu_double3MaxPooling_updateOutput(
   THLongTensor *inputSize, THLongTensor *outputSize,
@@ -1349,6 +1675,15 @@ void scn_cpu_double3ValidConvolution_backward(
   THDoubleTensor *input_features, THDoubleTensor *d_input_features,
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_double3SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double3SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_double4ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THDoubleTensor *input_features,
@@ -1395,6 +1730,18 @@ void scn_cpu_double4Deconvolution_backward(
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_double4DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double4DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 // Max Pooling
 void scn_cpu_double4MaxPooling_updateOutput(
   THLongTensor *inputSize, THLongTensor *outputSize,
@@ -1426,6 +1773,15 @@ void scn_cpu_double4ValidConvolution_backward(
   THDoubleTensor *input_features, THDoubleTensor *d_input_features,
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_double4SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double4SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_double5ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THDoubleTensor *input_features,
@@ -1472,6 +1828,18 @@ void scn_cpu_double5Deconvolution_backward(
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_double5DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double5DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 // Max Pooling
 void scn_cpu_double5MaxPooling_updateOutput(
   THLongTensor *inputSize, THLongTensor *outputSize,
@@ -1503,6 +1871,15 @@ void scn_cpu_double5ValidConvolution_backward(
   THDoubleTensor *input_features, THDoubleTensor *d_input_features,
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_double5SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double5SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_double6ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THDoubleTensor *input_features,
@@ -1549,6 +1926,18 @@ void scn_cpu_double6Deconvolution_backward(
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_double6DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double6DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 // Max Pooling
 void scn_cpu_double6MaxPooling_updateOutput(
   THLongTensor *inputSize, THLongTensor *outputSize,
@@ -1580,6 +1969,15 @@ void scn_cpu_double6ValidConvolution_backward(
   THDoubleTensor *input_features, THDoubleTensor *d_input_features,
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_double6SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double6SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_double7ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THDoubleTensor *input_features,
@@ -1626,6 +2024,18 @@ void scn_cpu_double7Deconvolution_backward(
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_double7DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double7DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 // Max Pooling
 void scn_cpu_double7MaxPooling_updateOutput(
   THLongTensor *inputSize, THLongTensor *outputSize,
@@ -1657,6 +2067,15 @@ void scn_cpu_double7ValidConvolution_backward(
   THDoubleTensor *input_features, THDoubleTensor *d_input_features,
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_double7SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double7SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_double8ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THDoubleTensor *input_features,
@@ -1703,6 +2122,18 @@ void scn_cpu_double8Deconvolution_backward(
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_double8DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double8DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 // Max Pooling
 void scn_cpu_double8MaxPooling_updateOutput(
   THLongTensor *inputSize, THLongTensor *outputSize,
@@ -1734,6 +2165,15 @@ void scn_cpu_double8ValidConvolution_backward(
   THDoubleTensor *input_features, THDoubleTensor *d_input_features,
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_double8SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double8SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_double9ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THDoubleTensor *input_features,
@@ -1780,6 +2220,18 @@ void scn_cpu_double9Deconvolution_backward(
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_double9DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double9DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 // Max Pooling
 void scn_cpu_double9MaxPooling_updateOutput(
   THLongTensor *inputSize, THLongTensor *outputSize,
@@ -1811,6 +2263,15 @@ void scn_cpu_double9ValidConvolution_backward(
   THDoubleTensor *input_features, THDoubleTensor *d_input_features,
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_double9SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double9SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
   // ActivePooling
 void scn_cpu_double10ActivePooling_updateOutput(
   THLongTensor *inputSize, void **m, THDoubleTensor *input_features,
@@ -1857,6 +2318,18 @@ void scn_cpu_double10Deconvolution_backward(
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
 
+double scn_cpu_double10DenseDeconvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double10DenseDeconvolution_backward(
+  THLongTensor *inputSize, THLongTensor *outputSize,
+  THLongTensor *filterSize, THLongTensor *filterStride, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+
 // Max Pooling
 void scn_cpu_double10MaxPooling_updateOutput(
   THLongTensor *inputSize, THLongTensor *outputSize,
@@ -1888,3 +2361,12 @@ void scn_cpu_double10ValidConvolution_backward(
   THDoubleTensor *input_features, THDoubleTensor *d_input_features,
   THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
   THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
+double scn_cpu_double10SubmanifoldConvolution_updateOutput(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *output_features, THDoubleTensor *weight,
+  THDoubleTensor *bias, long filterVolume, void *rulesBuffer);
+void scn_cpu_double10SubmanifoldConvolution_backward(
+  THLongTensor *inputSize, THLongTensor *filterSize, void **m,
+  THDoubleTensor *input_features, THDoubleTensor *d_input_features,
+  THDoubleTensor *d_output_features, THDoubleTensor *weight, THDoubleTensor *d_weight,
+  THDoubleTensor *d_bias, long filterVolume, void *rulesBuffer);
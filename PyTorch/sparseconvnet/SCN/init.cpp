@@ -36,6 +36,9 @@
 #include "generic/CPU/Deconvolution.cpp"
 #include "generic/CPU/THGenerateDimFloatTypes.h"
 
+#include "generic/CPU/DenseDeconvolution.cpp"
+#include "generic/CPU/THGenerateDimFloatTypes.h"
+
 #include "generic/CPU/LeakyReLU.cpp"
 #include "generic/CPU/THGenerateFloatTypes.h"
 
@@ -48,9 +51,13 @@
 #include "generic/CPU/SparseToDense.cpp"
 #include "generic/CPU/THGenerateDimFloatTypes.h"
 
+#include "generic/CPU/SubmanifoldConvolution.cpp"
+#include "generic/CPU/THGenerateDimFloatTypes.h"
+
 extern "C" long scn_readPtr(void **ptr) { return (long)(ptr[0]); }
 extern "C" void scn_writePtr(long p, void **ptr) { ptr[0] = (void *)p; }
 extern "C" double scn_ruleBookBits() { return 8 * sizeof(uInt); }
+extern "C" long scn_metadataVersion() { return MetadataIO_Version; }
 
 #undef scn_D_
 #undef scn_DR_
@@ -16,7 +16,9 @@ def abstract(dimension, input, prediction, kernel_size = 1):
 	input_features = input.features
 	output_locations = torch.index_select(input_locations, 0, structure)
 
-	structure = Variable(structure, requires_grad=False).cuda()
+	structure = Variable(structure, requires_grad=False)
+	if input_features.is_cuda:
+		structure = structure.cuda()
 	output_features = torch.index_select(input_features, 0, structure)
 
 	output = scn.InputBatch(dimension, input.getSpatialSize())
@@ -19,8 +19,10 @@ def Add2_fun(input1, input2):
     output = SparseConvNetTensor()
     output.metadata = input2.metadata
     output.spatial_size = input2.spatial_size
-    input1_features = Variable(torch.zeros(input2.features.size()).cuda())
-    idxs = input2.getLocationsIndexInRef(input1).cuda()
+    input1_features = Variable(input2.features.data.new(input2.features.size()).zero_())
+    idxs = input2.getLocationsIndexInRef(input1)
+    if input2.features.is_cuda:
+        idxs = idxs.cuda()
     hit = (idxs != -1).nonzero().view(-1)
     input1_features[hit] = input1.features[idxs[hit]]
     output.features = input1_features + input2.features
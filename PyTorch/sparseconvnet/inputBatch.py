@@ -4,13 +4,26 @@
 # This source code is licensed under the license found in the
 # LICENSE file in the root directory of this source tree.
 
+import hashlib
+import os
 import torch
 from .metadata import Metadata
 from .utils import toLongTensor, dim_fn
 from .sparseConvNetTensor import SparseConvNetTensor
+from .SCN import scn_metadataVersion
 
 class InputBatch(SparseConvNetTensor):
-    def __init__(self, dimension, spatial_size):
+    def __init__(self, dimension, spatial_size, grid_backend='hash'):
+        """
+        grid_backend selects how valid convolution rulebooks find neighbours:
+        - 'hash': look up each neighbour in the per-sample hash table
+        - 'sorted': merge-join sorted arrays of site keys, one pass per
+          filter offset; this parallelises across filter offsets as well
+          as across samples. The hash tables are still built (the other
+          rulebooks use them); each sorted copy only lives while one
+          rulebook is built, see gridBytes().
+        """
+        assert grid_backend in ('hash', 'sorted')
         self.dimension = dimension
         self.spatial_size = toLongTensor(dimension, spatial_size)
         SparseConvNetTensor.__init__(self, None, None, spatial_size)
@@ -18,6 +31,8 @@ class InputBatch(SparseConvNetTensor):
         self.metadata = Metadata(dimension)
         dim_fn(dimension, 'setInputSpatialSize')(
             self.metadata.ffi, self.spatial_size)
+        dim_fn(dimension, 'setGridBackend')(
+            self.metadata.ffi, grid_backend == 'sorted')
 
     def addSample(self):
         dim_fn(self.dimension, 'batchAddSample')(
@@ -76,12 +91,56 @@ class InputBatch(SparseConvNetTensor):
             self.spatial_size,
             threshold)
 
-    def precomputeMetadata(self, stride):
+    def metadataCachePath(self, cache_dir, *key):
+        """
+        File name in cache_dir for this batch's metadata: a hash of the
+        spatial size, the input locations (in row order) and any extra key
+        values identifying what was precomputed. The file format version is
+        part of the name, so files written by another version are never
+        opened.
+        """
+        h = hashlib.sha1()
+        h.update(self.spatial_size.numpy().tobytes())
+        h.update(self.getSpatialLocations().numpy().tobytes())
+        h.update(repr(key).encode())
+        return os.path.join(cache_dir, '%s.v%d.scnm' % (h.hexdigest(), scn_metadataVersion()))
+
+    def loadMetadata(self, path):
+        return os.path.isfile(path) and self.metadata.load(path)
+
+    def saveMetadata(self, path):
+        # write then rename, so concurrent readers never see a partial file
+        tmp = path + '.' + str(os.getpid())
+        if self.metadata.save(tmp):
+            os.rename(tmp, path)
+
+    def precomputeMetadata(self, stride, cache_dir=None):
+        """
+        Build the rulebooks for a stack of valid and stride 2 convolutions.
+        With cache_dir set, rulebooks are read from / written to a file keyed
+        by the input geometry, so repeated passes over the same data skip
+        rule generation.
+        """
+        if cache_dir is not None:
+            path = self.metadataCachePath(cache_dir, 'precompute', stride)
+            if self.loadMetadata(path):
+                return
         if stride == 2:
             dim_fn(self.dimension, 'generateRuleBooks2s2')(self.metadata.ffi)
         else:
             dim_fn(self.dimension, 'generateRuleBooks3s2')(self.metadata.ffi)
+        if cache_dir is not None:
+            self.saveMetadata(path)
             
+    def gridBytes(self):
+        """
+        Memory held by the site index at every spatial size built so far:
+        {'hash': bytes of the hash tables, 'sorted': bytes of their
+        sorted-key copies, which are only held while rulebooks are built}
+        """
+        fn = dim_fn(self.dimension, 'gridBytes')
+        return {'hash': fn(self.metadata.ffi, False), 'sorted': fn(self.metadata.ffi, True)}
+
     # def getConvMask(self, filter_size):
     #    filter_size = toLongTensor(self.dimension, filter_size)
     #    mask = torch.FloatTensor(self.features.size(0)).fill_(0)
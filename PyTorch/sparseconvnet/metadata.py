@@ -10,12 +10,14 @@ Convolutions, valid convolutions and 'convolution reversing' deconvolutions
 all coexist within the same MetaData object as long as each spatial size
 only occurs once.
 
-Serialization is emulated by storing the pointer as an integer.
-This is sufficient for mutithreaded batch preparation: each 'serialized'
-object must be de-serialized exactly once.
+Pickling serializes the grids and all cached rulebooks into a byte string,
+so batches can be prepared in worker processes (e.g. by a
+torch.utils.data.DataLoader) and shipped to the training process.
 """
 
 import cffi
+import numpy as np
+import torch
 from .utils import dim_fn
 from .SCN import scn_readPtr, scn_writePtr, scn_3_setInputSpatialSize
 
@@ -35,10 +37,30 @@ class Metadata(object):
         #     del self.ffigc
         #     del self.ffi
 
+    def save(self, filename):
+        "Write grids, nActive and rulebooks to a binary file"
+        return bool(dim_fn(self.dimension, 'saveMetadata')(
+            self.ffi, filename.encode()))
+
+    def load(self, filename):
+        "Replace the contents with a file written by save(); False on failure"
+        return bool(dim_fn(self.dimension, 'loadMetadata')(
+            self.ffi, filename.encode()))
+
+    def serialize(self):
+        "Contents as bytes, in the same format as save()"
+        buffer = torch.ByteTensor()
+        dim_fn(self.dimension, 'serializeMetadata')(self.ffi, buffer)
+        return buffer.numpy().tobytes()
+
+    def deserialize(self, data):
+        buffer = torch.from_numpy(np.frombuffer(data, dtype=np.uint8).copy())
+        assert dim_fn(self.dimension, 'deserializeMetadata')(self.ffi, buffer), \
+            'Corrupt Metadata buffer'
+
     def __reduce__(self):
         if hasattr(self, 'ffi'):
-            del self.ffigc
-            del self.ffi
+            return (_unpickle_metadata, (self.dimension, self.serialize()))
         return (self.__class__, (self.dimension,))
 
     def __repr__(self):
@@ -47,3 +69,9 @@ class Metadata(object):
                 str(self.dimension) + ', p=' + str(scn_readPtr(self.ffi)) + '>>'
         else:
             return '<<Metadata:dim=' + str(self.dimension) + '>>'
+
+
+def _unpickle_metadata(dimension, data):
+    m = Metadata(dimension)
+    m.deserialize(data)
+    return m
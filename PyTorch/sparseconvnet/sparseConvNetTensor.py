@@ -7,6 +7,7 @@
 import torch
 
 from .utils import dim_fn, toLongTensor
+from .metadata import Metadata
 from torch.autograd import Variable
 import numpy as np
 import pdb
@@ -89,6 +90,24 @@ class SparseConvNetTensor(object):
         filterSize = toLongTensor(self.metadata.dimension, filterSize)
         dim_fn(self.metadata.dimension, 'getValidRules')(self.metadata.ffi, spatialSize, filterSize)
     
+    def groupView(self, spatialSize, filterSize, abc, group_num):
+        """
+        Spatial group view of this tensor at spatialSize: same features and
+        row order, but valid convolutions only join sites in the same group
+        (x*abc[0] + y*abc[1] + z*abc[2]) % group_num, taken in [0, group_num)
+        as in Python, so the weights may be negative. The grouped rules are
+        filtered from this tensor's own valid rules.
+        """
+        abc = list(abc)
+        assert len(abc) == self.metadata.dimension and group_num > 0, \
+            'groupView needs %d abc weights and group_num > 0' % self.metadata.dimension
+        group = SparseConvNetTensor(self.features, Metadata(self.metadata.dimension), spatialSize)
+        filterSize = toLongTensor(self.metadata.dimension, filterSize)
+        abc = torch.LongTensor(abc)
+        dim_fn(self.metadata.dimension, 'getGroupValidRules')(
+            self.metadata.ffi, group.metadata.ffi, spatialSize, filterSize, abc, group_num)
+        return group
+
     def getConvRulesAndOutput(self, inputSize, filterSize, stride):
         assert filterSize == 2 and stride == 2
         outputSize = inputSize/2
@@ -23,7 +23,8 @@ class ValidConvolutionFunction(Function):
         input_metadata,
         spatial_size,
         dimension,
-        filter_size):
+        filter_size,
+        fn_name='ValidConvolution'):
         ctx.input_features=input_features
         ctx.input_metadata=input_metadata
         ctx.spatial_size=spatial_size
@@ -32,9 +33,10 @@ class ValidConvolutionFunction(Function):
         ctx.output_features=input_features.new()
         ctx.dimension=dimension
         ctx.filter_size=filter_size
+        ctx.fn_name=fn_name
         sparseconvnet.forward_pass_multiplyAdd_count +=\
             dim_typed_fn(
-                dimension, input_features, 'ValidConvolution_updateOutput')(
+                dimension, input_features, fn_name + '_updateOutput')(
                 spatial_size,
                 filter_size,
                 input_metadata.ffi,
@@ -55,7 +57,7 @@ class ValidConvolutionFunction(Function):
         else:
             grad_bias = Variable(grad_output.data.new().resize_as_(ctx.bias).zero_())
         dim_typed_fn(
-            ctx.dimension, ctx.input_features, 'ValidConvolution_backward')(
+            ctx.dimension, ctx.input_features, ctx.fn_name + '_backward')(
             ctx.spatial_size,
             ctx.filter_size,
             ctx.input_metadata.ffi,
@@ -67,11 +69,19 @@ class ValidConvolutionFunction(Function):
             grad_bias.data if grad_bias is not None else nullptr,
             0, #remove this parameter
             torch.cuda.IntTensor() if ctx.input_features.is_cuda else nullptr)
-        return grad_input, grad_weight, grad_bias, None, None, None, None
+        return grad_input, grad_weight, grad_bias, None, None, None, None, None
 
 class ValidConvolution(Module):
-    def __init__(self, dimension, nIn, nOut, filter_size, bias):
+    """
+    mode='rulebook' gathers the (input, output) pairs for each filter offset
+    and multiplies them with one GEMM per offset.
+    mode='neighbours' (CPU only, odd filter sizes) computes each output row
+    directly from an nActive x filter_volume table of its neighbours, with
+    no gather/scatter buffers.
+    """
+    def __init__(self, dimension, nIn, nOut, filter_size, bias, mode='rulebook'):
         Module.__init__(self)
+        assert mode in ('rulebook', 'neighbours')
         self.dimension = dimension
         self.nIn = nIn
         self.nOut = nOut
@@ -85,9 +95,17 @@ class ValidConvolution(Module):
             self.bias = Parameter(torch.Tensor(nOut).zero_())
         else:
             self.bias = None
+        self.mode = mode
+        if mode == 'neighbours':
+            assert (self.filter_size % 2).min() == 1
 
     def forward(self, input):
         assert input.features.ndimension()==0 or input.features.size(1) == self.nIn
+        if self.mode == 'neighbours':
+            assert not input.features.is_cuda, 'mode=neighbours is CPU only'
+            fn_name = 'SubmanifoldConvolution'
+        else:
+            fn_name = 'ValidConvolution'
         output = SparseConvNetTensor()
         output.metadata = input.metadata
         output.spatial_size = input.spatial_size
@@ -98,7 +116,8 @@ class ValidConvolution(Module):
             input.metadata,
             input.spatial_size,
             self.dimension,
-            self.filter_size)
+            self.filter_size,
+            fn_name)
         return output
 
     def __repr__(self):
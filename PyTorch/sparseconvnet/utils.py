@@ -72,6 +72,98 @@ def threadDatasetIterator(d):
     return iterator
 
 
+def processDatasetIterator(d, num_workers=4, prefetch=6, pin_memory=False, seed=None, poll_interval=10):
+    """
+    Like threadDatasetIterator, but d[k] is computed in num_workers forked
+    processes, so loading, collation and rulebook generation do not compete
+    with the training loop for the GIL. Tensors are handed back through
+    shared memory, and Metadata is pickled by value.
+
+    Batch k is made by worker k % num_workers and batches are yielded in
+    order 0, 1, ..., with up to max(prefetch, num_workers) batches waiting.
+    np.random and random are reseeded from (seed, k) before each batch, so
+    the batches do not depend on num_workers. If seed is None it is drawn
+    from np.random each time the iterator starts. With pin_memory, the tensors of each
+    batch are copied to page-locked memory for faster host to GPU copies.
+    If a worker dies without reporting an error (e.g. it is killed for
+    running out of memory, or crashes in C++ code), a RuntimeError is raised
+    once its batch has not arrived within poll_interval seconds.
+    """
+    try:
+        import queue
+    except BaseException:
+        import Queue as queue
+    import random
+    import traceback
+    import numpy as np
+    import torch.multiprocessing as mp
+
+    def worker(i, q, base):
+        try:
+            for k in range(i, len(d), num_workers):
+                random.seed(base + k)
+                np.random.seed((base + k) % 2 ** 32)
+                q.put(d[k])
+        except BaseException:
+            q.put(RuntimeError('processDatasetIterator worker %d:\n%s' % (i, traceback.format_exc())))
+
+    def get(k, workers, queues):
+        # batch k, polling so that a dead worker raises instead of hanging
+        i = k % num_workers
+        while True:
+            try:
+                return queues[i].get(timeout=poll_interval)
+            except queue.Empty:
+                if not workers[i].is_alive():
+                    break
+        # a worker that exits flushes its queue first, so look once more
+        try:
+            return queues[i].get(timeout=poll_interval)
+        except queue.Empty:
+            raise RuntimeError('processDatasetIterator worker %d exited with code %s before sending batch %d'
+                               % (i, workers[i].exitcode, k))
+
+    def iterator():
+        base = np.random.randint(2 ** 31) if seed is None else seed
+        queues = [mp.Queue(max(1, prefetch // num_workers)) for i in range(num_workers)]
+        workers = [mp.Process(target=worker, args=(i, queues[i], base)) for i in range(num_workers)]
+        for w in workers:
+            w.daemon = True
+            w.start()
+        try:
+            for k in range(len(d)):
+                item = get(k, workers, queues)
+                if isinstance(item, RuntimeError):
+                    raise item
+                yield pinMemory(item) if pin_memory else item
+        finally:
+            for w in workers:
+                w.terminate()
+                w.join()
+    return iterator
+
+
+def pinMemory(obj, memo=None):
+    "Copy of obj with every CPU tensor in it (including the features of SparseConvNetTensors) in pinned memory"
+    memo = {} if memo is None else memo
+    if id(obj) in memo:
+        return memo[id(obj)]
+    if torch.is_tensor(obj):
+        r = obj.pin_memory()
+    elif isinstance(obj, dict):
+        r = type(obj)((k, pinMemory(v, memo)) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        r = type(obj)(pinMemory(v, memo) for v in obj)
+    elif hasattr(obj, 'features') and hasattr(obj, 'metadata'):
+        r = obj
+        if obj.features is not None:
+            obj.features = pinMemory(obj.features, memo)
+    else:
+        r = obj
+    memo[id(obj)] = r
+    return r
+
+
 def set(obj):
     if hasattr(obj, 'storage_type'):
         obj.set_(obj.storage_type()())
@@ -13,7 +13,16 @@ import pdb
 import time
 import sys
 sys.path.append('../suncg_data_tools/lib')
-import SUNCGData
+sys.path.append('../util')
+try:
+    import SUNCGData
+except ImportError:
+    # SUNCG data toolbox not built, labels are downsampled with numpy
+    SUNCGData = None
+from suncg_shards import SUNCGShards
+from suncg_index import sample_index, bucketed_order, budget_batches
+from suncg_collate import collate_inputs, scatter_labels, sample_weight_indices, downsample_weight_indices, \
+    downsample_labels
 m.patch()
 import pdb
 
@@ -29,6 +38,28 @@ def SUNCG_DATA():
     # SUNCG['train_data_num'] = 200
     SUNCG['train_batch_size'] = 4
     SUNCG['train_weight_path'] = '../data/weight/train/'
+    # set to the shard directories written by
+    # suncg_data_tools/script/pack_shards.py to read scenes from the packed
+    # shards instead of the .msg files, e.g. '../data/shards/train/'
+    SUNCG['train_shard_path'] = None
+    SUNCG['test_shard_path'] = None
+    # non-empty training scenes, written by suncg_data_tools/script/prepare.py;
+    # if it does not exist the index is taken from the shards, if any
+    SUNCG['train_index_path'] = '../data/index_train.npz'
+    # > 0 to batch together scenes with similar numbers of active sites,
+    # sorting buckets of this many batches
+    SUNCG['bucket_batches'] = 0
+    # > 0 for batches of up to train_max_batch_size scenes with at most this
+    # many active sites in total, instead of train_batch_size scenes: steps
+    # take more uniform time and memory. The losses are means over the
+    # weighted voxels of a batch, so they need no rescaling.
+    SUNCG['batch_site_budget'] = 0
+    SUNCG['train_max_batch_size'] = 8
+    # training batch loader: worker processes, batches prepared ahead, and
+    # whether to return batches in pinned memory
+    SUNCG['loader_workers'] = 4
+    SUNCG['loader_prefetch'] = 6
+    SUNCG['loader_pin_memory'] = torch.cuda.is_available()
     
     
     SUNCG['output_spatialSize'] = SUNCG['spatialSize']/4
@@ -40,6 +71,12 @@ def SUNCG_DATA():
     SUNCG['dataset_outputSize2'] = SUNCG['dataset_outputSize']/2
     SUNCG['output_offset2'] = SUNCG['output_offset']/2
 
+    # test scenes per forward pass in validation
+    SUNCG['test_batch_size'] = 4
+    # set to a directory to keep the test set rulebooks on disk between
+    # validation passes (one file per batch of test scenes)
+    SUNCG['test_metadata_cache'] = None
+
     SUNCG['easy_ratio'] = 0.1
     SUNCG['neg_ratio'] = 2
     return SUNCG
@@ -59,19 +96,31 @@ def train(DATASET, used_train_num):
 
     easy_ratio = DATASET['easy_ratio']
     neg_ratio = DATASET['neg_ratio']
-    d = range(train_data_num)
     
+    train_shards = SUNCGShards(DATASET['train_shard_path']) if DATASET['train_shard_path'] else None
+    # only scenes with active sites are sampled
+    sample_idx, sample_sites = sample_index(DATASET['train_index_path'], train_data_num, train_shards)
+
     def loadData(idx):
+        if train_shards is not None:
+            while train_shards.num_sites(idx) == 0: # check
+                print('discard data: %d' % idx)
+                idx = int(sample_idx[np.random.randint(len(sample_idx))])
+            return train_shards[idx]
         data = msgpack.load(open(train_data_path+str(idx)+'.msg', 'rb'))
         while np.asarray(data[b'input_nz']).size == 0: # check
             print('discard data:' + train_data_path+str(idx)+'.msg')
-            idx = np.random.randint(train_data_num)
+            idx = int(sample_idx[np.random.randint(len(sample_idx))])
             data = msgpack.load(open(train_data_path+str(idx)+'.msg', 'rb'))
         data[b'weight'] = msgpack.load(open(train_weight_path+str(idx)+'_weight.msg', 'rb'))
         return data
 
-    d = torchnet.dataset.ListDataset(d, load=loadData)
-    randperm = torch.randperm(len(d))
+    d = torchnet.dataset.ListDataset(sample_idx.tolist(), load=loadData)
+    scenes = d
+    if DATASET['bucket_batches'] > 0 and sample_sites is not None:
+        randperm = torch.from_numpy(bucketed_order(sample_sites, train_batch_size, DATASET['bucket_batches']))
+    else:
+        randperm = torch.randperm(len(d))
     def sampler(dataset, idx):
         return randperm[idx]
     d = torchnet.dataset.ResampleDataset(d, sampler=sampler, size=used_train_num*train_batch_size)
@@ -82,60 +131,36 @@ def train(DATASET, used_train_num):
     def merge(tbl):
         merge_time=time.time()
         input = scn.InputBatch(3, spatialSize)
-        target = []
-        target2 = []
-        batch_weight = []
-        batch_weight2 = []
-        count = 0
-        locations = np.empty((0,3)).astype(int)
-        vals = []
-        nz_nums = torch.LongTensor(train_batch_size)
-
-
-        for input_nz, input_val, target_nz, target_val, weight_info in zip(tbl[b'input_nz'], tbl[b'input_val'], tbl[b'target_nz'], tbl[b'target_val'], tbl[b'weight']):
-            locations = np.vstack((locations, input_nz))
-            vals = np.concatenate([vals,input_val])
-            nz_nums[count] = len(input_nz)
-            label = np.zeros(dataset_outputSize.tolist()).astype(np.float32)
-            label[target_nz.astype(int).tolist()] = target_val
-            target.append(label)
-            # compute downscale label
-            label2 = SUNCGData.downsampleLabel2(label, 2).reshape(dataset_outputSize2.tolist())
-            target2.append(label2)
-            # compute weight
-            weight = np.zeros(dataset_outputSize.tolist())
-            weight[weight_info[b'hard_pos'].astype(int).tolist()] = 1
-            hard_pos_num = weight_info[b'hard_pos'].shape[1]
-            easy_pos_num = min(int(hard_pos_num*easy_ratio), weight_info[b'easy_pos'].shape[1])
-            if easy_pos_num > 0:
-                easy_pos_idx = np.random.permutation(weight_info[b'easy_pos'].shape[1])[:easy_pos_num]
-                weight[weight_info[b'easy_pos'][:,easy_pos_idx].astype(int).tolist()] = 1
-            neg_num = int(min((hard_pos_num+easy_pos_num)*neg_ratio, weight_info[b'hard_neg'].shape[1] / (1-easy_ratio)))
-            hard_neg_num = int(min(neg_num * (1-easy_ratio), weight_info[b'hard_neg'].shape[1]))
-            if hard_neg_num > 0:
-                hard_neg_idx = np.random.permutation(weight_info[b'hard_neg'].shape[1])[:hard_neg_num]
-                weight[weight_info[b'hard_neg'][:,hard_neg_idx].astype(int).tolist()] = 1
-            easy_neg_num = neg_num - hard_neg_num
-            if easy_neg_num > 0:
-                easy_neg_idx = np.random.permutation(weight_info[b'easy_neg'].shape[1])[:easy_neg_num]
-                weight[weight_info[b'easy_neg'][:,easy_neg_idx].astype(int).tolist()] = 1
-            batch_weight.append(weight)
-
-            weight2 = weight.reshape([dataset_outputSize2[0], 2, dataset_outputSize2[1], 2, dataset_outputSize2[2], 2]).mean(5).mean(3).mean(1)
-            weight2[weight2 > 0] = 1
-            batch_weight2.append(weight2)
-            count = count + 1
+        locations, vals, nz_nums = collate_inputs(tbl[b'input_nz'], tbl[b'input_val'])
+        target = scatter_labels(tbl[b'target_nz'], tbl[b'target_val'], dataset_outputSize.tolist())
+        # compute downscale label
+        if SUNCGData is not None:
+            target2 = np.stack([SUNCGData.downsampleLabel2(label, 2).reshape(dataset_outputSize2.tolist()) for label in target])
+        else:
+            target2 = downsample_labels(target, 2)
+        # compute weight, as the indices of the voxels with weight 1
+        weight_idx, weight_count = sample_weight_indices(tbl[b'weight'], dataset_outputSize.tolist(), easy_ratio, neg_ratio)
+        weight2_idx, weight2_count = downsample_weight_indices(weight_idx, weight_count, dataset_outputSize.tolist())
 
         #put data at the center of the volume
-        input.setInputBatchLocations(torch.from_numpy(locations).long()+input_offset.view(1,3), \
-            torch.FloatTensor(vals).view(nz_nums.sum(),1), nz_nums)
+        input.setInputBatchLocations(torch.from_numpy(locations)+input_offset.view(1,3), \
+            torch.from_numpy(vals).view(-1,1), torch.from_numpy(nz_nums))
 
         precomputeStride = 2
         input.precomputeMetadata(precomputeStride)
-        return {'input': input, 'target': torch.LongTensor(np.array(target).astype(int)), 'weight':torch.FloatTensor(np.array(batch_weight)), \
-                                'target2': torch.LongTensor(np.array(target2).astype(int)), 'weight2':torch.FloatTensor(np.array(batch_weight2)) }
-    bd = torchnet.dataset.BatchDataset(d, train_batch_size, perm=perm, merge=merge)
-    tdi = scn.threadDatasetIterator(bd)
+        return {'input': input, 'target': torch.from_numpy(target.astype(np.int64)), \
+                                'weight_idx': torch.from_numpy(weight_idx), 'weight_count': torch.from_numpy(weight_count), \
+                                'target2': torch.from_numpy(target2.astype(np.int64)), \
+                                'weight2_idx': torch.from_numpy(weight2_idx), 'weight2_count': torch.from_numpy(weight2_count) }
+    if DATASET['batch_site_budget'] > 0 and sample_sites is not None:
+        batches = budget_batches(sample_sites, DATASET['batch_site_budget'], DATASET['train_max_batch_size'], used_train_num)
+        makebatch = torchnet.transform.makebatch(merge)
+        bd = torchnet.dataset.ListDataset(batches, load=lambda batch: makebatch([scenes[int(i)] for i in batch]))
+    else:
+        bd = torchnet.dataset.BatchDataset(d, train_batch_size, perm=perm, merge=merge)
+    # batches are loaded and collated in worker processes
+    tdi = scn.processDatasetIterator(bd, num_workers=DATASET['loader_workers'], prefetch=DATASET['loader_prefetch'],
+                                     pin_memory=DATASET['loader_pin_memory'])
 
     def iter():
         return tdi()
@@ -154,17 +179,33 @@ class SUNCGTestDataset(Dataset):
         self.test_data_num = 470 
         self.output_offset = SUNCG['output_offset']
         self.dataset_outputSize = SUNCG['dataset_outputSize']
+        self.batch_size = SUNCG['test_batch_size']
+        self.shards = SUNCGShards(SUNCG['test_shard_path']) if SUNCG['test_shard_path'] else None
+        self.metadata_cache = SUNCG['test_metadata_cache']
+        if self.metadata_cache is not None and not os.path.isdir(self.metadata_cache):
+            os.makedirs(self.metadata_cache)
     def __len__(self):
         return self.test_data_num
 
+    def load(self, idx):
+        if self.shards is not None:
+            data = self.shards[idx]
+        else:
+            print('load ' + self.test_data_path +str(idx)+'.msg')
+            data = msgpack.load(open(self.test_data_path+str(idx)+'.msg', 'rb'))
+        return data
+
     def __getitem__(self, idx):
-        print('load ' + self.test_data_path +str(idx)+'.msg')
-        data = msgpack.load(open(self.test_data_path+str(idx)+'.msg', 'rb'))
-        input_nz, input_val = data[b'input_nz'], data[b'input_val']
+        return self.get_batch([idx])
+
+    # the test scenes in indices as one batch
+    def get_batch(self, indices):
+        data = [self.load(idx) for idx in indices]
+        locations, vals, nz_nums = collate_inputs([d[b'input_nz'] for d in data], [d[b'input_val'] for d in data])
         input = scn.InputBatch(3, self.spatialSize)
-        input.addSample()
-        input.setLocations(torch.from_numpy(input_nz).long()+self.input_offset.view(1,3), torch.from_numpy(input_val).view(len(input_val), 1), 0)
-        input.precomputeMetadata(self.precomputeStride)
+        input.setInputBatchLocations(torch.from_numpy(locations)+self.input_offset.view(1,3), \
+            torch.from_numpy(vals).view(-1,1), torch.from_numpy(nz_nums))
+        input.precomputeMetadata(self.precomputeStride, self.metadata_cache)
         return {'input':input}
     
     
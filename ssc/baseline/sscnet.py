@@ -17,6 +17,8 @@ parser.add_argument('--output_offset', default=[], type=int, help='offset of the
 parser.add_argument('--dataset_outputSize', default=[], type=int, help='output size of suncg dataset')
 parser.add_argument('--output_offset2', default=[], type=int, help='offset for low resolution prediction')
 parser.add_argument('--dataset_outputSize2', default=[], type=int, help='output size of suncg dataset at low resolution')
+parser.add_argument('--sparse_loss', default=1, type=int, help='1 to compute the training loss on the sparse output sites, 0 on the dense outputs')
+parser.add_argument('--eval_workers', default=4, type=int, help='processes evaluating validation scenes, 0 to evaluate in the main process')
 
 config = parser.parse_args()
 os.environ['CUDA_VISIBLE_DEVICES'] = config.gpu_id
@@ -45,9 +47,12 @@ def main():
             self.stage1.add(scn.MaxPooling(3, 2, 2))
             self.stage2 = UNet6(3, nClasses)
             self.densePred = scn.SparseToDense(3, nClasses)
-        def forward(self, x):
+        def forward(self, x, dense=True):
             x1 = self.stage1(x)
             x2 = self.stage2(x1)
+            if not dense:
+                # sparse predictions, for sparse_site_weighted_cross_entropy
+                return [x2[0], x2[1]]
             o1 = self.densePred(x2[0])
             o2 = self.densePred(x2[1])
             return [o1, o2]
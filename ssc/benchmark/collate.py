@@ -0,0 +1,103 @@
+# Compare the per-scene merge() loop of ssc/*/data.py with the batched
+# collation in ssc/util/suncg_collate.py on SUNCG training scenes. The label
+# downsampling (SUNCGData.downsampleLabel2) is the same in both and is left
+# out. Run from this directory:
+#   python collate.py --num 64 --batch_size 4
+
+import argparse
+import sys
+import time
+
+parser = argparse.ArgumentParser(description='Batch collation benchmark')
+parser.add_argument('--data_path', default='../data/msg/train/', type=str, help='directory of SUNCG .msg scenes')
+parser.add_argument('--weight_path', default='../data/weight/train/', type=str, help='directory of SUNCG _weight.msg files')
+parser.add_argument('--num', default=64, type=int, help='number of scenes')
+parser.add_argument('--batch_size', default=4, type=int, help='scenes per batch')
+parser.add_argument('--repeat', default=3, type=int, help='timed runs per batch')
+config = parser.parse_args()
+
+import numpy as np
+import msgpack
+import msgpack_numpy as m
+sys.path.append('../util')
+from suncg_collate import collate_inputs, scatter_labels, sample_weights, downsample_weight
+m.patch()
+
+dataset_outputSize = [60, 36, 60]
+dataset_outputSize2 = [30, 18, 30]
+easy_ratio = 0.1
+neg_ratio = 2
+
+
+def merge_loop(batch):
+    # the collation loop merge() used before suncg_collate
+    target = []
+    batch_weight = []
+    batch_weight2 = []
+    locations = np.empty((0,3)).astype(int)
+    vals = []
+    nz_nums = []
+    for data in batch:
+        input_nz, input_val = data[b'input_nz'], data[b'input_val']
+        target_nz, target_val, weight_info = data[b'target_nz'], data[b'target_val'], data[b'weight']
+        locations = np.vstack((locations, input_nz))
+        vals = np.concatenate([vals,input_val])
+        nz_nums.append(len(input_nz))
+        label = np.zeros(dataset_outputSize).astype(np.float32)
+        label[tuple(target_nz)] = target_val
+        target.append(label)
+        weight = np.zeros(dataset_outputSize)
+        weight[tuple(weight_info[b'hard_pos'])] = 1
+        hard_pos_num = weight_info[b'hard_pos'].shape[1]
+        easy_pos_num = min(int(hard_pos_num*easy_ratio), weight_info[b'easy_pos'].shape[1])
+        if easy_pos_num > 0:
+            easy_pos_idx = np.random.permutation(weight_info[b'easy_pos'].shape[1])[:easy_pos_num]
+            weight[tuple(weight_info[b'easy_pos'][:,easy_pos_idx])] = 1
+        neg_num = int(min((hard_pos_num+easy_pos_num)*neg_ratio, weight_info[b'hard_neg'].shape[1] / (1-easy_ratio)))
+        hard_neg_num = int(min(neg_num * (1-easy_ratio), weight_info[b'hard_neg'].shape[1]))
+        if hard_neg_num > 0:
+            hard_neg_idx = np.random.permutation(weight_info[b'hard_neg'].shape[1])[:hard_neg_num]
+            weight[tuple(weight_info[b'hard_neg'][:,hard_neg_idx])] = 1
+        easy_neg_num = neg_num - hard_neg_num
+        if easy_neg_num > 0:
+            easy_neg_idx = np.random.permutation(weight_info[b'easy_neg'].shape[1])[:easy_neg_num]
+            weight[tuple(weight_info[b'easy_neg'][:,easy_neg_idx])] = 1
+        batch_weight.append(weight)
+        weight2 = weight.reshape([dataset_outputSize2[0], 2, dataset_outputSize2[1], 2, dataset_outputSize2[2], 2]).mean(5).mean(3).mean(1)
+        weight2[weight2 > 0] = 1
+        batch_weight2.append(weight2)
+    return locations, vals, np.array(nz_nums), np.array(target), np.array(batch_weight), np.array(batch_weight2)
+
+
+def merge_batched(batch):
+    locations, vals, nz_nums = collate_inputs([d[b'input_nz'] for d in batch], [d[b'input_val'] for d in batch])
+    target = scatter_labels([d[b'target_nz'] for d in batch], [d[b'target_val'] for d in batch], dataset_outputSize)
+    batch_weight = sample_weights([d[b'weight'] for d in batch], dataset_outputSize, easy_ratio, neg_ratio)
+    return locations, vals, nz_nums, target, batch_weight, downsample_weight(batch_weight)
+
+
+scenes = []
+for idx in range(config.num):
+    data = msgpack.load(open(config.data_path + str(idx) + '.msg', 'rb'))
+    if np.asarray(data[b'input_nz']).size > 0:
+        data[b'weight'] = msgpack.load(open(config.weight_path + str(idx) + '_weight.msg', 'rb'))
+        scenes.append(data)
+batches = [scenes[i:i + config.batch_size] for i in range(0, len(scenes), config.batch_size)]
+print('%d batches, %d sites' % (len(batches), sum(len(s[b'input_nz']) for s in scenes)))
+
+for batch in batches:
+    np.random.seed(0)
+    a = merge_loop(batch)
+    np.random.seed(0)
+    b = merge_batched(batch)
+    for x, y in zip(a, b):
+        assert x.shape == y.shape and np.array_equal(x, y), 'batched collation differs'
+
+for name, fn in [('loop', merge_loop), ('batched', merge_batched)]:
+    times = []
+    for batch in batches:
+        for _ in range(config.repeat):
+            start = time.time()
+            fn(batch)
+            times.append(time.time() - start)
+    print('%-8s collate %.4fs/batch (min %.4fs)' % (name, np.mean(times), np.min(times)))
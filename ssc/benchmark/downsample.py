@@ -0,0 +1,86 @@
+# Time label downsampling on full 240x144x240 SUNCG label volumes (4x, as
+# SUNCGData.downsampleLabel in prepare_data.py) and on 60x36x60 training
+# targets (2x, as SUNCGData.downsampleLabel2 in merge()), with the SUNCG data
+# toolbox and with the numpy version in ssc/util/suncg_collate.py. Both are
+# checked against a direct Python port of the original mode() /
+# modeLargerZero() rule on a sample of blocks. Run from this directory:
+#   python downsample.py --data_list ../data/depthbin/SUNCGtest_49700_49884 --num 4
+# Without --data_list, synthetic label volumes are used.
+
+import argparse
+import sys
+import time
+
+parser = argparse.ArgumentParser(description='Label downsampling benchmark')
+parser.add_argument('--data_list', default=None, type=str, help='SUNCG depthbin directory to read labels from')
+parser.add_argument('--num', default=4, type=int, help='number of label volumes')
+parser.add_argument('--repeat', default=3, type=int, help='timed runs per volume')
+parser.add_argument('--check_blocks', default=2000, type=int, help='blocks per volume checked against the reference')
+config = parser.parse_args()
+
+import numpy as np
+sys.path.append('../suncg_data_tools/lib')
+sys.path.append('../util')
+from suncg_collate import downsample_labels
+try:
+    import SUNCGData
+except ImportError:
+    SUNCGData = None
+    print('SUNCGData not built, timing numpy only')
+
+gridsize = [240, 144, 240]
+
+
+def reference_block(values):
+    # mode() / modeLargerZero() of downsample.hpp on one block, values in x, y, z order
+    with_zeros = np.count_nonzero((values < np.float32(0.001)) | (values > 254)) > np.float32(0.95 * len(values))
+    old_mode, old_count = 0, 0
+    for n, v in enumerate(values):
+        if with_zeros or (v > 0 and v < 255):
+            count = np.count_nonzero(values[n + 1:] == v)
+            if count > old_count:
+                old_mode, old_count = v, count
+    return old_mode
+
+
+def check(label, out, factor, rng):
+    Z, Y, X = label.shape
+    out = out.reshape(Z // factor, Y // factor, X // factor)
+    for _ in range(config.check_blocks):
+        z, y, x = [rng.randint(s) for s in out.shape]
+        block = label[z*factor:(z+1)*factor, y*factor:(y+1)*factor, x*factor:(x+1)*factor]
+        values = block.transpose(2, 1, 0).reshape(-1)
+        assert reference_block(values) == out[z, y, x], 'downsampled label differs from the reference'
+
+
+def synthetic_labels(rng):
+    # rooms of empty / outside voxels and objects, with noisy boundaries
+    z, y, x = np.meshgrid(*[np.arange(s) for s in gridsize[::-1]], indexing='ij')
+    region = ((x // rng.randint(4, 12)) + (y // rng.randint(4, 12)) * 3 + (z // rng.randint(4, 12)) * 7) % 14
+    label = np.where(region < 5, 0, np.where(region < 7, 255, region - 6)).astype(np.float32)
+    noise = rng.rand(*label.shape) < 0.2
+    label[noise] = rng.randint(0, 13, noise.sum())
+    return label
+
+
+rng = np.random.RandomState(0)
+if config.data_list:
+    files = SUNCGData.getDataFiles([config.data_list])[:config.num]
+    labels = [SUNCGData.getLabels(f[:-3] + 'bin').reshape(gridsize[::-1]) for f in files]
+else:
+    labels = [synthetic_labels(rng) for _ in range(config.num)]
+
+for name, factor, volumes in [('full 4x', 4, labels),
+                              ('target 2x', 2, [downsample_labels(l[None], 4)[0] for l in labels])]:
+    methods = [('numpy', lambda l: downsample_labels(l[None], factor).reshape(-1))]
+    if SUNCGData is not None:
+        methods.insert(0, ('SUNCGData', lambda l: SUNCGData.downsampleLabel2(l, factor)))
+    for method, fn in methods:
+        times = []
+        for label in volumes:
+            for _ in range(config.repeat):
+                start = time.time()
+                out = fn(label)
+                times.append(time.time() - start)
+            check(label, out, factor, rng)
+        print('%-9s %-9s %.4fs/volume (min %.4fs)' % (name, method, np.mean(times), np.min(times)))
@@ -0,0 +1,61 @@
+# Compare rulebook construction with the hash and sorted grid backends
+# on SUNCG test scenes. Run from this directory:
+#   python rulebook_backends.py --num 20
+
+import argparse
+import time
+
+parser = argparse.ArgumentParser(description='Rulebook backend benchmark')
+parser.add_argument('--data_path', default='../data/msg/test/', type=str, help='directory of SUNCG .msg scenes')
+parser.add_argument('--num', default=20, type=int, help='number of scenes')
+parser.add_argument('--batch_size', default=1, type=int, help='scenes per InputBatch')
+parser.add_argument('--repeat', default=3, type=int, help='timed runs per batch')
+config = parser.parse_args()
+
+import torch
+import numpy as np
+import msgpack
+import msgpack_numpy as m
+import sparseconvnet as scn
+m.patch()
+
+spatialSize = torch.LongTensor([256, 256, 256])
+input_offset = spatialSize / 2 - torch.LongTensor([240, 144, 240]) / 2
+
+
+def build(scenes, backend):
+    input = scn.InputBatch(3, spatialSize, grid_backend=backend)
+    for input_nz, input_val in scenes:
+        input.addSample()
+        input.setLocations(torch.from_numpy(input_nz).long() + input_offset.view(1, 3),
+                           torch.from_numpy(input_val).float().view(-1, 1), 0)
+    start = time.time()
+    input.precomputeMetadata(2)
+    return input, time.time() - start
+
+
+scenes = []
+for idx in range(config.num):
+    data = msgpack.load(open(config.data_path + str(idx) + '.msg', 'rb'))
+    if np.asarray(data[b'input_nz']).size > 0:
+        scenes.append((data[b'input_nz'], data[b'input_val']))
+batches = [scenes[i:i + config.batch_size] for i in range(0, len(scenes), config.batch_size)]
+print('%d batches, %d sites' % (len(batches), sum(len(s[0]) for s in scenes)))
+
+# The hash tables are built with either backend; 'sorted' adds a copy of
+# them as sorted keys while each valid rulebook is built, so the two
+# structures are reported separately.
+for backend in ['hash', 'sorted']:
+    times, hash_mb, sorted_mb = [], [], []
+    for batch in batches:
+        for _ in range(config.repeat):
+            input, t = build(batch, backend)
+            times.append(t)
+            size = input.gridBytes()
+            hash_mb.append(size['hash'] / 2.0 ** 20)
+            sorted_mb.append(size['sorted'] / 2.0 ** 20)
+            del input
+    print('%-6s precomputeMetadata %.4fs/batch (min %.4fs), hash tables %.1fMB/batch%s'
+          % (backend, np.mean(times), np.min(times), np.mean(hash_mb),
+             ', sorted keys %.1fMB/batch (freed after each rulebook)' % np.mean(sorted_mb)
+             if backend == 'sorted' else ''))
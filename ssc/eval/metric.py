@@ -3,6 +3,7 @@ import numpy as np
 import scipy.io as sio
 import h5py
 import os
+import multiprocessing
 
 obj_class = ['empty','ceiling','floor','wall','window','chair','bed','sofa','table','tvs','furn','objs']
 numoffiles = 470
@@ -66,87 +67,182 @@ def evaluate_completion(GTV, V, empty_conf_V, vol, conf_threshold):
 	return results
 	
 
-# predobjTensor: (n, c, z, y, x)
-def eval_suncg(predobjTensor):
-	resultsFullSeg = []
-	resultsFullOcc = []
-	numoffiles = predobjTensor.shape[0]
-	print(numoffiles)
+# Streaming evaluation: predictions are added one scene at a time and only
+# the running counts are kept. The voxels evaluated for completion
+# (-1 <= vol < 0) are a subset of those evaluated for segmentation
+# (|vol| < 1 or vol == -1), so a single bincount over (completion voxel,
+# ground truth, prediction) gives both the segmentation confusion matrix and
+# the occupancy counts of a scene. The results are the same as those of
+# evaluate_prediction and evaluate_completion.
+numofclasses = max(len(obj_class), int(mapIds.max()) + 1)
+
+def load_groundtruth(batchId):
+	ld = h5py.File(groundtruth_path+Filename[batchId][0]+'_gt_d4.mat', 'r')
+	sceneVox = np.asarray(ld['sceneVox_ds'])
+	ld = h5py.File(evalvol_path+Filename[batchId][0]+'_vol_d4.mat', 'r')
+	vol = np.asarray(ld['flipVol_ds'])
+	sceneVox[np.logical_or(sceneVox==255, np.isnan(sceneVox))] = 0
+	labelobj = mapIds[sceneVox.astype(int)]
+	return labelobj, vol
+
+# 0: not evaluated, 1: segmentation only, 2: segmentation and completion
+def evaluation_region(vol):
+	return np.logical_or(np.abs(vol)<1, vol==-1).astype(np.int64) + np.logical_and(vol<0, vol>=-1)
+
+def confusion_counts(GTV, V, region):
+	# (2, numofclasses, numofclasses) counts of (ground truth, prediction) over
+	# the segmentation voxels outside / inside the completion voxels
+	assert np.all(GTV.shape == V.shape), 'GTV shape'+str(GTV.shape)+'not equal to V shape'+str(V.shape)
+	key = (region.astype(np.int64) * numofclasses + GTV.astype(np.int64)) * numofclasses + V.astype(np.int64)
+	return np.bincount(key.ravel(), minlength=3*numofclasses*numofclasses).reshape(3, numofclasses, numofclasses)[1:]
+
+# The ground truth of the test set, preprocessed once into a single file:
+# the mapped labels as uint8 and the two evaluation regions as bitmasks. It is
+# built from the .mat files on first use (or by running this file) and loaded
+# once per process.
+groundtruth_cache_path = dataRootfolder + 'eval/SUNCGtest_49700_49884_gt_cache.npz'
+groundtruth_cache = None
+
+def build_groundtruth_cache(path=groundtruth_cache_path):
+	labels = []
+	nonfree = []
+	completion = []
 	for batchId in range(numoffiles):
-		ld = h5py.File(groundtruth_path+Filename[batchId][0]+'_gt_d4.mat')
-		sceneVox = np.asarray(ld['sceneVox_ds'])
-		ld = h5py.File(evalvol_path+Filename[batchId][0]+'_vol_d4.mat')
-		vol = np.asarray(ld['flipVol_ds'])
-		sceneVox[np.logical_or(sceneVox==255, np.isnan(sceneVox))] = 0
-		labelobj = mapIds[sceneVox.astype(int)]
-		# get prediction
-		predobj_conf = np.squeeze(predobjTensor[batchId,:])
-		# test_mat = np.asarray([[1,2,3],[4,5,6]])
-		# sio.savemat('check.mat',{'sceneVox_py':sceneVox, 'predobj_conf_py':predobj_conf, 'test_mat':test_mat})		
-		predobj = np.argmax(predobj_conf, axis=0)
-
-		nonfree_voxels_to_evaluate = np.logical_or(np.abs(vol)<1, vol==-1)
-		resultsFullSeg.append(evaluate_prediction(labelobj, predobj, nonfree_voxels_to_evaluate, classtoEvaluate))
-		resultsFullOcc.append(evaluate_completion(labelobj, predobj, predobj_conf[0,:,:,:], vol, []))
-
-	tps = np.ones(classtoEvaluate.size)*np.finfo(float).eps
-	fps = np.ones(classtoEvaluate.size)*np.finfo(float).eps
-	fns = np.ones(classtoEvaluate.size)*np.finfo(float).eps
-	for results in resultsFullSeg:
-		tps += results['tp']
-		fps += results['fp']
-		fns += results['fn']
-	full_precision = tps / (tps + fps)
-	full_recall = tps / (tps + fns)
-	full_iou = tps / (tps + fns + fps)
-	print('Semantic Scene Compeltion:\nprec ,recall , IoU\nmean:'+str(np.mean(full_precision))+', '+str(np.mean(full_recall))+', ' +str(np.mean(full_iou)))
-	for idx in range(classtoEvaluate.size):
-		print(obj_class[idx+1]+ ' '+ str(full_precision[idx]) + ' ' + str(full_recall[idx]) + ' ' + str(full_iou[idx])) 
-	# completion
-	occ_precisions = [results['precision'] for results in resultsFullOcc]
-	occ_recalls = [results['recall'] for results in resultsFullOcc]
-	occ_ious = [results['iou'] for results in resultsFullOcc]
-
-	print('Scene Completion:\nprec, recall, IoU\n'+str(np.mean(occ_precisions))+', '+str(np.mean(occ_recalls))+', '+str(np.mean(occ_ious)))
-	return np.mean(full_iou), np.mean(occ_ious)
+		labelobj, vol = load_groundtruth(batchId)
+		labels.append(labelobj.astype(np.uint8))
+		region = evaluation_region(vol)
+		nonfree.append(np.packbits(region > 0))
+		completion.append(np.packbits(region > 1))
+	with open(path + '.tmp', 'wb') as f:
+		np.savez(f, filenames=np.array([Filename[batchId][0] for batchId in range(numoffiles)]),
+			labels=np.stack(labels), nonfree=np.stack(nonfree), completion=np.stack(completion))
+	os.rename(path + '.tmp', path)
+	print('wrote evaluation ground truth of %d scenes to %s' % (numoffiles, path))
+
+def load_groundtruth_cache(path=groundtruth_cache_path):
+	global groundtruth_cache
+	if groundtruth_cache is None:
+		filenames = [Filename[batchId][0] for batchId in range(numoffiles)]
+		if not os.path.isfile(path) or list(np.load(path)['filenames']) != filenames:
+			build_groundtruth_cache(path)
+		cache = np.load(path)
+		groundtruth_cache = {key: cache[key] for key in ['labels', 'nonfree', 'completion']}
+	return groundtruth_cache
+
+# (labelobj, region) of scene batchId from the cache
+def cached_groundtruth(batchId):
+	cache = load_groundtruth_cache()
+	labelobj = cache['labels'][batchId]
+	size = labelobj.size
+	region = np.unpackbits(cache['nonfree'][batchId])[:size] + np.unpackbits(cache['completion'][batchId])[:size]
+	return labelobj, region.reshape(labelobj.shape)
+
+# confusion_counts of scene batchId, from predicted labels (z, y, x) or from
+# class scores (c, z, y, x)
+def scene_counts(batchId, predobj):
+	labelobj, region = cached_groundtruth(batchId)
+	return confusion_counts(labelobj, np.squeeze(predobj), region)
+
+def scene_counts_from_scores(batchId, predobj_conf):
+	return scene_counts(batchId, np.argmax(np.squeeze(predobj_conf), axis=0))
+
+# With num_workers > 0, scenes are evaluated in a pool of worker processes,
+# which load the ground truth cache once, while the caller goes on predicting
+# the next scenes. At most max_pending scenes per worker are in flight. The
+# counts are reduced in the order the scenes were added, so the results are
+# the same as without workers.
+class SUNCGEvaluator(object):
+	def __init__(self, classtoEvaluate=classtoEvaluate, num_workers=0, max_pending=2):
+		self.classtoEvaluate = classtoEvaluate
+		self.confusion = np.zeros((numofclasses, numofclasses), dtype=np.int64)
+		self.occ_precisions = []
+		self.occ_recalls = []
+		self.occ_ious = []
+		self.pool = None
+		self.pending = []
+		if num_workers > 0:
+			# built here rather than by every worker
+			load_groundtruth_cache()
+			self.pool = multiprocessing.Pool(num_workers, initializer=load_groundtruth_cache)
+			self.max_pending = max_pending * num_workers
+
+	def accumulate(self, counts):
+		self.confusion += counts.sum(0)
+		# completion: occupancy over the completion voxels
+		tp_occ = counts[1, 1:, 1:].sum()
+		fp_occ = counts[1, 0, 1:].sum()
+		fn_occ = counts[1, 1:, 0].sum()
+		self.occ_ious.append(float(tp_occ) / (tp_occ+fp_occ+fn_occ))
+		self.occ_precisions.append(tp_occ / (tp_occ+fp_occ+np.finfo(float).eps))
+		self.occ_recalls.append(tp_occ / (tp_occ+fn_occ+np.finfo(float).eps))
+
+	def submit(self, fn, batchId, prediction):
+		if self.pool is None:
+			self.accumulate(fn(batchId, prediction))
+			return
+		self.pending.append(self.pool.apply_async(fn, (batchId, prediction)))
+		while len(self.pending) > self.max_pending:
+			self.accumulate(self.pending.pop(0).get())
+
+	# predobj: predicted labels (z, y, x) of scene batchId
+	def add(self, batchId, predobj):
+		self.submit(scene_counts, batchId, predobj)
+
+	# predobj_conf: class scores (c, z, y, x) of scene batchId
+	def add_scores(self, batchId, predobj_conf):
+		self.submit(scene_counts_from_scores, batchId, predobj_conf)
+
+	# waits for the pending scenes and shuts the pool down, also when one of
+	# them failed (the pool is then terminated); closing twice is harmless
+	def close(self):
+		pending, self.pending = self.pending, []
+		pool, self.pool = self.pool, None
+		ok = False
+		try:
+			for result in pending:
+				self.accumulate(result.get())
+			ok = True
+		finally:
+			if pool is not None:
+				if ok:
+					pool.close()
+				else:
+					pool.terminate()
+				pool.join()
+
+	def summary(self):
+		self.close()
+		print(len(self.occ_ious))
+		tp = np.diag(self.confusion)[self.classtoEvaluate]
+		tps = tp + np.finfo(float).eps
+		fps = self.confusion.sum(0)[self.classtoEvaluate] - tp + np.finfo(float).eps
+		fns = self.confusion.sum(1)[self.classtoEvaluate] - tp + np.finfo(float).eps
+		full_precision = tps / (tps + fps)
+		full_recall = tps / (tps + fns)
+		full_iou = tps / (tps + fns + fps)
+		print('Semantic Scene Compeltion:\nprec ,recall , IoU\nmean:'+str(np.mean(full_precision))+', '+str(np.mean(full_recall))+', ' +str(np.mean(full_iou)))
+		for idx in range(self.classtoEvaluate.size):
+			print(obj_class[idx+1]+ ' '+ str(full_precision[idx]) + ' ' + str(full_recall[idx]) + ' ' + str(full_iou[idx])) 
+		# completion
+		print('Scene Completion:\nprec, recall, IoU\n'+str(np.mean(self.occ_precisions))+', '+str(np.mean(self.occ_recalls))+', '+str(np.mean(self.occ_ious)))
+		return np.mean(full_iou), np.mean(self.occ_ious)
+
+
+# predobjTensor: (n, c, z, y, x)
+def eval_suncg(predobjTensor, num_workers=0):
+	evaluator = SUNCGEvaluator(num_workers=num_workers)
+	for batchId in range(predobjTensor.shape[0]):
+		evaluator.add_scores(batchId, predobjTensor[batchId,:])
+	return evaluator.summary()
 
 
 # predLabelTensor: (n, z, y, x)
-def eval_suncg2(predLabelTensor):
-	resultsFullSeg = []
-	resultsFullOcc = []
-	numoffiles = predLabelTensor.shape[0]
-	print(numoffiles)
-	for batchId in range(numoffiles):
-		ld = h5py.File(groundtruth_path+Filename[batchId][0]+'_gt_d4.mat')
-		sceneVox = np.asarray(ld['sceneVox_ds'])
-		ld = h5py.File(evalvol_path+Filename[batchId][0]+'_vol_d4.mat')
-		vol = np.asarray(ld['flipVol_ds'])
-		sceneVox[np.logical_or(sceneVox==255, np.isnan(sceneVox))] = 0
-		labelobj = mapIds[sceneVox.astype(int)]
-		# get prediction
-		predobj = np.squeeze(predLabelTensor[batchId,:])
-
-		nonfree_voxels_to_evaluate = np.logical_or(np.abs(vol)<1, vol==-1)
-		resultsFullSeg.append(evaluate_prediction(labelobj, predobj, nonfree_voxels_to_evaluate, classtoEvaluate))
-		resultsFullOcc.append(evaluate_completion(labelobj, predobj, [], vol, []))
-
-	tps = np.ones(classtoEvaluate.size)*np.finfo(float).eps
-	fps = np.ones(classtoEvaluate.size)*np.finfo(float).eps
-	fns = np.ones(classtoEvaluate.size)*np.finfo(float).eps
-	for results in resultsFullSeg:
-		tps += results['tp']
-		fps += results['fp']
-		fns += results['fn']
-	full_precision = tps / (tps + fps)
-	full_recall = tps / (tps + fns)
-	full_iou = tps / (tps + fns + fps)
-	print('Semantic Scene Compeltion:\nprec ,recall , IoU\nmean:'+str(np.mean(full_precision))+', '+str(np.mean(full_recall))+', ' +str(np.mean(full_iou)))
-	for idx in range(classtoEvaluate.size):
-		print(obj_class[idx+1]+ ' '+ str(full_precision[idx]) + ' ' + str(full_recall[idx]) + ' ' + str(full_iou[idx])) 
-	# completion
-	occ_precisions = [results['precision'] for results in resultsFullOcc]
-	occ_recalls = [results['recall'] for results in resultsFullOcc]
-	occ_ious = [results['iou'] for results in resultsFullOcc]
-
-	print('Scene Completion:\nprec, recall, IoU\n'+str(np.mean(occ_precisions))+', '+str(np.mean(occ_recalls))+', '+str(np.mean(occ_ious)))
+def eval_suncg2(predLabelTensor, num_workers=0):
+	evaluator = SUNCGEvaluator(num_workers=num_workers)
+	for batchId in range(predLabelTensor.shape[0]):
+		evaluator.add(batchId, predLabelTensor[batchId,:])
+	return evaluator.summary()
+
+
+if __name__ == '__main__':
+	build_groundtruth_cache()
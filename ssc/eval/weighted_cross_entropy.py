@@ -1,3 +1,4 @@
+import math
 import torch
 from torch.autograd import Variable
 import torch.nn.functional as F
@@ -27,3 +28,83 @@ def weighted_cross_entropy(output, target, weight=None):
 	losses = -logpy*(weight.view(-1,1))
 	return losses.sum() / weight.sum()
 
+
+def sparse_weighted_cross_entropy(output, target, index, count):
+	# output n c *
+	# target n *
+	# index: flat indices (into *) of the voxels with weight 1, for each
+	#        sample in turn, as made by suncg_collate.sample_weight_indices
+	# count: number of indices of each sample (a list or CPU LongTensor)
+	# Same loss as weighted_cross_entropy with a 0/1 weight, but only the
+	# logits of the weighted voxels are gathered and soft-maxed.
+
+	n, c = output.size(0), output.size(1)
+	output = output.contiguous().view(n, c, -1)
+	target = target.contiguous().view(n, -1)
+	logits, labels = [], []
+	start = 0
+	if torch.is_tensor(count):
+		count = count.tolist()
+	for b, num in enumerate(count):
+		if num > 0:
+			idx = index[start:start+num]
+			logits.append(output[b].index_select(1, idx))
+			labels.append(target[b].index_select(0, idx))
+		start += num
+	if start == 0:
+		# no sample has a weighted voxel: zero loss, still attached to output
+		return output.sum() * 0
+	logp = F.log_softmax(torch.cat(logits, 1).t())
+	logpy = torch.gather(logp, 1, torch.cat(labels, 0).view(-1,1))
+	return -logpy.sum() / start
+
+
+def sparse_site_weighted_cross_entropy(output, offset, size, target, index, count):
+	# output: SparseConvNetTensor of c logits per active site, the input of
+	#         SparseToDense
+	# offset, size: the crop of the dense output that target covers, as
+	#         output_offset / dataset_outputSize
+	# target, index, count: as in sparse_weighted_cross_entropy
+	# Same loss as sparse_weighted_cross_entropy on the cropped SparseToDense
+	# output, without making the dense output or its gradient. Weighted voxels
+	# at active sites take their row of output.features; the others have
+	# all-zero logits in the dense output, so each adds log(c) to the loss and
+	# nothing to the gradient.
+
+	features = output.features
+	c = features.size(1)
+	# coordinates and sample of each active site, in the crop
+	locations = output.getSpatialLocations()
+	if features.is_cuda:
+		locations = locations.cuda()
+	offset = locations.new([int(o) for o in offset]).view(1, 3)
+	size = locations.new([int(s) for s in size]).view(1, 3)
+	volume = int(size.prod())
+	coords = locations[:, :3] - offset
+	inside = ((coords >= 0).long() + (coords < size).long()).sum(1) == 6
+	rows = inside.nonzero().view(-1)
+	coords = coords.index_select(0, rows)
+	flat = (coords[:, 0] * size[0, 1] + coords[:, 1]) * size[0, 2] + coords[:, 2] \
+		+ locations[:, 3].index_select(0, rows) * volume
+	# row of output.features at each voxel of the crop, -1 if not active
+	if torch.is_tensor(count):
+		count = count.tolist()
+	row_of = locations.new(len(count) * volume).fill_(-1)
+	row_of.index_copy_(0, flat, rows)
+
+	if sum(count) == 0:
+		# no sample has a weighted voxel: zero loss, still attached to features
+		return features.sum() * 0
+	index = index.data if isinstance(index, Variable) else index
+	sample = torch.cat([locations.new(num).fill_(b) for b, num in enumerate(count) if num > 0])
+	voxel = index + sample * volume
+	site = row_of.index_select(0, voxel)
+	active = (site >= 0).nonzero().view(-1)
+	start = voxel.numel()
+	inactive_loss = (start - active.numel()) * math.log(c)
+	if active.numel() == 0:
+		return (features.sum() * 0 + inactive_loss) / start
+	logp = F.log_softmax(features.index_select(0, Variable(site.index_select(0, active))))
+	labels = target.view(-1).index_select(0, Variable(voxel.index_select(0, active)))
+	logpy = torch.gather(logp, 1, labels.view(-1,1))
+	return (-logpy.sum() + inactive_loss) / start
@@ -17,6 +17,8 @@ parser.add_argument('--output_offset', default=[], type=int, help='offset of the
 parser.add_argument('--dataset_outputSize', default=[], type=int, help='output size of suncg dataset')
 parser.add_argument('--output_offset2', default=[], type=int, help='offset for low resolution prediction')
 parser.add_argument('--dataset_outputSize2', default=[], type=int, help='output size of suncg dataset at low resolution')
+parser.add_argument('--sparse_loss', default=1, type=int, help='1 to compute the training loss on the sparse output sites, 0 on the dense outputs')
+parser.add_argument('--eval_workers', default=4, type=int, help='processes evaluating validation scenes, 0 to evaluate in the main process')
 parser.add_argument('--abc', default=[1,2,3], type=int, help='param of sgc')
 parser.add_argument('--group_num', default=4, type=int, help='group num of sgc')
 
@@ -50,7 +52,7 @@ def main():
             self.densePred = scn.SparseToDense(3, nClasses)
             self.sgc_config = sgc_config
 
-        def forward(self, x, group_x):
+        def forward(self, x, group_x, dense=True):
             x1 = spatialGroupConv(x, self.stage1, self.sgc_config[0], self.sgc_config[1], group_x[0])
             x1 = self.stage1_2(x1)
 
@@ -58,6 +60,9 @@ def main():
             x2 = self.stage2_2(x2)
 
             x3 = self.stage3(x2, group_x[2:])
+            if not dense:
+                # sparse predictions, for sparse_site_weighted_cross_entropy
+                return [x3[0], x3[1]]
             o1 = self.densePred(x3[0])
             o2 = self.densePred(x3[1])
             
@@ -20,9 +20,9 @@ import sys
 sys.path.append("../eval/")
 sys.path.append("../util/")
 from logger import Logger
-from weighted_cross_entropy import weighted_cross_entropy
+from weighted_cross_entropy import sparse_weighted_cross_entropy, sparse_site_weighted_cross_entropy
 from data import SUNCG_DATA, SUNCGTestDataset
-from metric import eval_suncg
+from metric import SUNCGEvaluator
 
 
 def TrainValidate(model, train_dataset, test_dataset, config):
@@ -68,24 +68,32 @@ def TrainValidate(model, train_dataset, test_dataset, config):
         for batch_idx, batch in enumerate(train_dataset['train']()):
             train_start = time.time()
             if config.use_gpu:
-                batch['input'], batch['target'], batch['weight'], batch['target2'], batch['weight2'] \
-                    = batch['input'].cuda(), batch['target'].cuda(), batch['weight'].cuda(), batch['target2'].cuda(), batch['weight2'].cuda()
+                batch['input'], batch['target'], batch['weight_idx'], batch['target2'], batch['weight2_idx'] \
+                    = batch['input'].cuda(), batch['target'].cuda(), batch['weight_idx'].cuda(), batch['target2'].cuda(), batch['weight2_idx'].cuda()
 
             batch['input'].to_variable(requires_grad=True)
-            batch['target'], batch['weight'], batch['target2'], batch['weight2'] \
-                = Variable(batch['target']), Variable(batch['weight']), Variable(batch['target2']), Variable(batch['weight2'])
+            batch['target'], batch['weight_idx'], batch['target2'], batch['weight2_idx'] \
+                = Variable(batch['target']), Variable(batch['weight_idx']), Variable(batch['target2']), Variable(batch['weight2_idx'])
             optimizer.zero_grad()
-            output = model(batch['input'], batch['input_groups'])
-            output1 = output[0][:,:,config.output_offset[0]:(config.output_offset[0]+config.dataset_outputSize[0]),\
-                                    config.output_offset[1]:(config.output_offset[1]+config.dataset_outputSize[1]),\
-                                    config.output_offset[2]:(config.output_offset[2]+config.dataset_outputSize[2])]
-
-            output2 = output[1][:,:,config.output_offset2[0]:(config.output_offset2[0]+config.dataset_outputSize2[0]),\
-                                    config.output_offset2[1]:(config.output_offset2[1]+config.dataset_outputSize2[1]),\
-                                    config.output_offset2[2]:(config.output_offset2[2]+config.dataset_outputSize2[2])]
-
-            loss1 = weighted_cross_entropy(output1, batch['target'], batch['weight'])
-            loss2 = weighted_cross_entropy(output2, batch['target2'], batch['weight2'])
+            if config.sparse_loss:
+                # loss on the active output sites, the dense outputs are never made
+                output = model(batch['input'], batch['input_groups'], dense=False)
+                loss1 = sparse_site_weighted_cross_entropy(output[0], config.output_offset, config.dataset_outputSize, \
+                                                           batch['target'], batch['weight_idx'], batch['weight_count'])
+                loss2 = sparse_site_weighted_cross_entropy(output[1], config.output_offset2, config.dataset_outputSize2, \
+                                                           batch['target2'], batch['weight2_idx'], batch['weight2_count'])
+            else:
+                output = model(batch['input'], batch['input_groups'])
+                output1 = output[0][:,:,config.output_offset[0]:(config.output_offset[0]+config.dataset_outputSize[0]),\
+                                        config.output_offset[1]:(config.output_offset[1]+config.dataset_outputSize[1]),\
+                                        config.output_offset[2]:(config.output_offset[2]+config.dataset_outputSize[2])]
+
+                output2 = output[1][:,:,config.output_offset2[0]:(config.output_offset2[0]+config.dataset_outputSize2[0]),\
+                                        config.output_offset2[1]:(config.output_offset2[1]+config.dataset_outputSize2[1]),\
+                                        config.output_offset2[2]:(config.output_offset2[2]+config.dataset_outputSize2[2])]
+
+                loss1 = sparse_weighted_cross_entropy(output1, batch['target'], batch['weight_idx'], batch['weight_count'])
+                loss2 = sparse_weighted_cross_entropy(output2, batch['target2'], batch['weight2_idx'], batch['weight2_count'])
             loss = loss1 + loss2
             loss.backward()
             optimizer.step()
@@ -99,7 +107,7 @@ def TrainValidate(model, train_dataset, test_dataset, config):
             # Check if we want to write or validation
             b_validate = (train_iter % config.train_num) == 0
             if b_validate:
-                ssc_iou, cmp_iou = valid_model(model, test_dataset)
+                ssc_iou, cmp_iou = valid_model(model, test_dataset, config.eval_workers)
                 logger_valid.append([ssc_iou, cmp_iou])
                 if ssc_iou > best_acc:
                     print('Saving best model with va_res = {}'.format(ssc_iou))
@@ -122,27 +130,32 @@ def TrainValidate(model, train_dataset, test_dataset, config):
             if train_iter % config.train_num == 0:
                 break
 
-def valid_model(model, test_dataset):
+def valid_model(model, test_dataset, num_workers=0):
     model.eval()
-    predictions = []
+    # scenes are evaluated as they are predicted, in num_workers processes
+    # while the next scenes are predicted; only the counts are kept
+    evaluator = SUNCGEvaluator(num_workers=num_workers)
     output_offset = test_dataset.output_offset
     dataset_outputSize = test_dataset.dataset_outputSize
 
-    for idx in range(len(test_dataset)):
-        test_input = test_dataset[idx]
-        input = test_input['input']
-        input_groups = test_input['input_groups']
-        input = input.cuda()
-        output = model(input, input_groups)
-        predictions.append(output[0].cpu().data.numpy()[:,:,output_offset[0]:(output_offset[0]+dataset_outputSize[0]),\
-                                                           output_offset[1]:(output_offset[1]+dataset_outputSize[1]),\
-                                                           output_offset[2]:(output_offset[2]+dataset_outputSize[2])])
-    predictions = np.vstack(predictions)
-    # import h5py
-    # fp = h5py.File('predictions.msg', "w")
-    # result = fp.create_dataset("result", predictions.shape, dtype='f')
-    # result[...] = predictions
-    # fp.close()
-    return eval_suncg(predictions)
+    # the evaluator's worker pool is shut down even if prediction or evaluation fails
+    try:
+        for start in range(0, len(test_dataset), test_dataset.batch_size):
+            indices = list(range(start, min(start + test_dataset.batch_size, len(test_dataset))))
+            batch = test_dataset.get_batch(indices)
+            input = batch['input'].cuda()
+            # no autograd graph is kept for validation
+            input.to_variable(volatile=True)
+            output = model(input, batch['input_groups'])
+            # crop and take the argmax on the device, only uint8 labels are copied back
+            _, predobj = output[0][:,:,output_offset[0]:(output_offset[0]+dataset_outputSize[0]),\
+                                       output_offset[1]:(output_offset[1]+dataset_outputSize[1]),\
+                                       output_offset[2]:(output_offset[2]+dataset_outputSize[2])].max(1)
+            predobj = predobj.data.byte().cpu().numpy()
+            for i, idx in enumerate(indices):
+                evaluator.add(idx, predobj[i])
+        return evaluator.summary()
+    finally:
+        evaluator.close()
 
 
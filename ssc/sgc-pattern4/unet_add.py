@@ -7,12 +7,6 @@ import time
 import numpy as np
 import pdb
 
-def partition(locations, a, b, c, group_num, batch_size):
-    sample_add_batch = (locations[:,0]*a+locations[:,1]*b+locations[:,2]*c)%group_num*batch_size
-    locations[:,-1] = locations[:,-1] + sample_add_batch
-    return locations
-
-
 def res(m, dimension, a, b):
     m.add(scn.ConcatTable()
           .add(scn.Identity() if a == b else scn.NetworkInNetwork(a, b, False))
@@ -27,11 +21,7 @@ def spatialGroupConv(x, model, abc, group_num, group_x=None):
     # we will use the precompute rules if we have, rules are precomputed by precomputeMetadata()
     # or it will compute rules itself, see getRuleBook() in Metadata.h
     if group_x == None: 
-        locations = x.getSpatialLocations()
-        batch_size = torch.LongTensor(locations[:,-1]).max() + 1
-        locations = partition(locations, abc[0], abc[1], abc[2], group_num, batch_size)
-        group_x = scn.InputBatch(3, x.getSpatialSize())
-        group_x.setLocations(locations, torch.Tensor(len(locations)).view(-1,1))
+        group_x = x.groupView(x.getSpatialSize(), 3, abc, group_num)
     assert group_x.features.size(0) == x.features.size(0)
     group_x.features = x.features
     group_x = model(group_x)
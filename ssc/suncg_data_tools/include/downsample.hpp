@@ -4,6 +4,7 @@
 #include <glog/logging.h>
 #include <iostream>
 #include <numeric>
+#include <algorithm>
 // find mode  in an vector besides zeros
 template <typename Dtype>
 float modeLargerZero(const std::vector<Dtype>& values) {
@@ -40,36 +41,89 @@ float mode(const std::vector<Dtype>& values) {
   return old_mode;
 }
 
+// Labels are class ids in [0, 255], so the mode of each block is taken from
+// a 256-bin histogram of its values, read in memory order. mode() and
+// modeLargerZero() see the values in x, y, z order and return the most
+// frequent one occurring at least twice, ties going to the value seen first,
+// else 0; the position of the first occurrence of each label in that order is
+// kept to break ties the same way. Blocks holding any value that is not a
+// label fall back to mode() / modeLargerZero().
 template<typename Dtype>
 void downsampleLabel_cpu(std::vector<int> data_vox_size, std::vector<int> label_vox_size,
 					int label_downscale, Dtype * segmentation_label_full, 
 					Dtype* segmentation_label_downscale){
   Dtype emptyT = (0.95 * label_downscale * label_downscale * label_downscale);
-  for (int i = 0;  i < label_vox_size[0] * label_vox_size[1] * label_vox_size[2]; ++i) {
-    int z = floor(i / (label_vox_size[0] * label_vox_size[1]));
-    int y = floor((i - (z * label_vox_size[0] * label_vox_size[1])) / label_vox_size[0]);
+  int num_label_voxels = label_vox_size[0] * label_vox_size[1] * label_vox_size[2];
+#pragma omp parallel
+  {
+  int counts[256] = {0};
+  int first[256];
+  int distinct[256];
+  int i;
+#pragma omp for private(i) schedule(static)
+  for (i = 0;  i < num_label_voxels; ++i) {
+    int z = i / (label_vox_size[0] * label_vox_size[1]);
+    int y = (i - (z * label_vox_size[0] * label_vox_size[1])) / label_vox_size[0];
     int x = i - (z * label_vox_size[0] * label_vox_size[1]) - (y * label_vox_size[0]);
 
-    std::vector<Dtype> field_vals;
+    int num_distinct = 0;
     int zero_count = 0;
-    for (int tmp_x = x * label_downscale; tmp_x < (x + 1) * label_downscale; ++tmp_x) {
-      for (int tmp_y = y * label_downscale; tmp_y < (y + 1) * label_downscale; ++tmp_y) {
-        for (int tmp_z = z * label_downscale; tmp_z < (z + 1) * label_downscale; ++tmp_z) {
-          int tmp_vox_idx = tmp_z * data_vox_size[0] * data_vox_size[1] + tmp_y * data_vox_size[0] + tmp_x;
-          //LOG(INFO)<<"tmp vox idx:"<<tmp_vox_idx;
-          field_vals.push_back(segmentation_label_full[tmp_vox_idx]); // MG: TODO: -> Can't this be preallocated since the target size is always [60x36x60]?
-          //LOG(INFO)<<"push back";
-          if (segmentation_label_full[tmp_vox_idx] < Dtype(0.001f) || segmentation_label_full[tmp_vox_idx] > Dtype(254)) {
+    bool labels_only = true;
+    for (int dz = 0; dz < label_downscale; ++dz) {
+      for (int dy = 0; dy < label_downscale; ++dy) {
+        Dtype *row = segmentation_label_full + (z * label_downscale + dz) * data_vox_size[0] * data_vox_size[1]
+                     + (y * label_downscale + dy) * data_vox_size[0] + x * label_downscale;
+        for (int dx = 0; dx < label_downscale; ++dx) {
+          Dtype value = row[dx];
+          if (value < Dtype(0.001f) || value > Dtype(254)) {
             zero_count++;
           }
+          if (!(value >= 0 && value <= 255) || Dtype(int(value)) != value) {
+            labels_only = false;
+            continue;
+          }
+          int label = int(value);
+          // position in the x, y, z order of mode()
+          int position = (dx * label_downscale + dy) * label_downscale + dz;
+          if (counts[label]++ == 0) {
+            distinct[num_distinct++] = label;
+            first[label] = position;
+          } else if (position < first[label]) {
+            first[label] = position;
+          }
         }
       }
     }
-    if (zero_count > emptyT) {
-      segmentation_label_downscale[i] = Dtype(mode(field_vals));
+
+    if (labels_only) {
+      bool with_zeros = zero_count > emptyT;
+      int best = 0;
+      int best_count = 1;
+      for (int n = 0; n < num_distinct; ++n) {
+        int label = distinct[n];
+        if (!with_zeros && (label == 0 || label == 255))
+          continue;
+        if (counts[label] > best_count || (counts[label] == best_count && best_count > 1 && first[label] < first[best])) {
+          best = label;
+          best_count = counts[label];
+        }
+      }
+      segmentation_label_downscale[i] = Dtype(best);
     } else {
-      segmentation_label_downscale[i] = Dtype(modeLargerZero(field_vals)); // object label mode without zeros
+      std::vector<Dtype> field_vals;
+      for (int tmp_x = x * label_downscale; tmp_x < (x + 1) * label_downscale; ++tmp_x)
+        for (int tmp_y = y * label_downscale; tmp_y < (y + 1) * label_downscale; ++tmp_y)
+          for (int tmp_z = z * label_downscale; tmp_z < (z + 1) * label_downscale; ++tmp_z)
+            field_vals.push_back(segmentation_label_full[tmp_z * data_vox_size[0] * data_vox_size[1] + tmp_y * data_vox_size[0] + tmp_x]);
+      if (zero_count > emptyT) {
+        segmentation_label_downscale[i] = Dtype(mode(field_vals));
+      } else {
+        segmentation_label_downscale[i] = Dtype(modeLargerZero(field_vals)); // object label mode without zeros
+      }
     }
+    for (int n = 0; n < num_distinct; ++n)
+      counts[distinct[n]] = 0;
+  }
   }
 }
 
@@ -0,0 +1,289 @@
+#ifndef _TSDF_CPU_HPP_
+#define _TSDF_CPU_HPP_
+
+// CPU versions of the TSDF kernels in tsdf.hpp, parallelised with OpenMP.
+//
+// The GPU SquaredDistanceTransform / CompleteTSDF search a (2r+1)^3 window
+// (r = vox_margin / vox_unit) around every voxel for the nearest occupied
+// voxel, and only distances < r change the output. Every voxel at distance
+// < r lies inside the window, so the same values can be read from an exact
+// Euclidean distance transform of the occupied voxels, computed in linear
+// time with the separable lower envelope algorithm of Felzenszwalb and
+// Huttenlocher. With exact_distance = false the window search is used as on
+// the GPU.
+
+#include <algorithm>
+#include <cmath>
+#include <limits>
+#include <vector>
+
+const int EDT_INF = std::numeric_limits<int>::max();
+
+// 1D squared distance transform of the n values f[0], f[stride], ... in
+// place, using v and z (sizes n and n+1) as scratch.
+inline void DistanceTransform1D_cpu(int *f, int n, int stride, int *v, double *z, int *d) {
+  int k = -1;
+  for (int q = 0; q < n; ++q) {
+    int fq = f[q * stride];
+    if (fq == EDT_INF)
+      continue;
+    if (k < 0) {
+      k = 0;
+      v[0] = q;
+      z[0] = -std::numeric_limits<double>::infinity();
+      z[1] = std::numeric_limits<double>::infinity();
+      continue;
+    }
+    double s;
+    while (true) {
+      int p = v[k];
+      s = ((double(fq) + double(q) * q) - (double(f[p * stride]) + double(p) * p)) / (2.0 * (q - p));
+      if (s > z[k])
+        break;
+      --k;
+    }
+    ++k;
+    v[k] = q;
+    z[k] = s;
+    z[k + 1] = std::numeric_limits<double>::infinity();
+  }
+  if (k < 0)
+    return; // nothing occupied on this line
+  k = 0;
+  for (int q = 0; q < n; ++q) {
+    while (z[k + 1] < q)
+      ++k;
+    int p = v[k];
+    d[q] = (q - p) * (q - p) + f[p * stride];
+  }
+  for (int q = 0; q < n; ++q)
+    f[q * stride] = d[q];
+}
+
+// d2[i] = squared distance from voxel i to the nearest voxel with
+// occupied[i] > 0 (EDT_INF if there is none). Indexing as in tsdf.hpp:
+// vox_idx = z * vox_size[0] * vox_size[1] + y * vox_size[0] + x
+template <typename Dtype>
+void SquaredEDT_cpu(const int *vox_size, const Dtype *occupied, std::vector<int> &d2) {
+  int X = vox_size[0], Y = vox_size[1], Z = vox_size[2];
+  int num_voxels = X * Y * Z;
+  d2.resize(num_voxels);
+  int i;
+#pragma omp parallel for private(i)
+  for (i = 0; i < num_voxels; ++i)
+    d2[i] = occupied[i] > 0 ? 0 : EDT_INF;
+  int n_max = std::max(X, std::max(Y, Z));
+  int dims[3] = {X, Y, Z};
+  int strides[3] = {1, X, X * Y};
+  for (int axis = 0; axis < 3; ++axis) {
+    int n = dims[axis], stride = strides[axis];
+    int num_lines = num_voxels / n;
+#pragma omp parallel
+    {
+      std::vector<int> v(n_max), d(n_max);
+      std::vector<double> z(n_max + 1);
+      int line;
+#pragma omp for private(line) schedule(static)
+      for (line = 0; line < num_lines; ++line) {
+        // start of the line'th line along axis
+        int start;
+        if (axis == 0)
+          start = line * X;
+        else if (axis == 1)
+          start = (line / X) * X * Y + line % X;
+        else
+          start = line;
+        DistanceTransform1D_cpu(&d2[start], n, stride, &v[0], &z[0], &d[0]);
+      }
+    }
+  }
+}
+
+template <typename Dtype>
+void tsdfTransform_cpu(Dtype *vox_info, Dtype *vox_tsdf) {
+  int num_voxels = int(vox_info[0 + 2]) * int(vox_info[1 + 2]) * int(vox_info[2 + 2]);
+  int vox_idx;
+#pragma omp parallel for private(vox_idx)
+  for (vox_idx = 0; vox_idx < num_voxels; ++vox_idx) {
+    Dtype value = vox_tsdf[vox_idx];
+    Dtype sign;
+    if (std::fabs(value) < 0.001)
+      sign = 1;
+    else
+      sign = value / std::fabs(value);
+    vox_tsdf[vox_idx] = sign * (1.0 - std::fabs(value));
+  }
+}
+
+template <typename Dtype>
+void depth2Grid_cpu(Dtype *cam_info, Dtype *vox_info, Dtype *depth_data, Dtype *vox_binary) {
+  int frame_width = cam_info[0];
+  int frame_height = cam_info[1];
+  Dtype *cam_K = cam_info + 2;
+  Dtype *cam_pose = cam_info + 11;
+  Dtype vox_unit = vox_info[0];
+  int vox_size[3];
+  for (int i = 0; i < 3; ++i)
+    vox_size[i] = vox_info[i + 2];
+  Dtype *vox_origin = vox_info + 5;
+
+  // serial: several pixels can mark the same voxel
+  for (int pixel_y = 0; pixel_y < frame_height; ++pixel_y)
+    for (int pixel_x = 0; pixel_x < frame_width; ++pixel_x) {
+      Dtype point_depth = depth_data[pixel_y * frame_width + pixel_x];
+      Dtype point_cam[3];
+      point_cam[0] = (pixel_x - cam_K[2]) * point_depth / cam_K[0];
+      point_cam[1] = (pixel_y - cam_K[5]) * point_depth / cam_K[4];
+      point_cam[2] = point_depth;
+      Dtype point_base[3];
+      for (int i = 0; i < 3; ++i)
+        point_base[i] = cam_pose[i * 4 + 0] * point_cam[0] + cam_pose[i * 4 + 1] * point_cam[1] +
+                        cam_pose[i * 4 + 2] * point_cam[2] + cam_pose[i * 4 + 3];
+      // World coordinate to grid coordinate
+      int z = (int)std::floor((point_base[0] - vox_origin[0]) / vox_unit);
+      int x = (int)std::floor((point_base[1] - vox_origin[1]) / vox_unit);
+      int y = (int)std::floor((point_base[2] - vox_origin[2]) / vox_unit);
+      if (x >= 0 && x < vox_size[0] && y >= 0 && y < vox_size[1] && z >= 0 && z < vox_size[2])
+        vox_binary[z * vox_size[0] * vox_size[1] + y * vox_size[0] + x] = Dtype(1.0);
+    }
+}
+
+// Smallest |distance| / search_region < |vox_tsdf[vox_idx]| to an occupied
+// voxel, written with the given sign; vox_tsdf is left unchanged if none.
+template <typename Dtype>
+inline void NearestOccupied_cpu(const int *vox_size, const Dtype *occupied, const std::vector<int> *d2,
+                                int search_region, int vox_idx, int x, int y, int z, Dtype sign,
+                                Dtype *vox_tsdf) {
+  if (d2) {
+    int d = (*d2)[vox_idx];
+    if (d == EDT_INF)
+      return;
+    float tsdf_value = sqrtf(float(d)) / (float)search_region;
+    if (tsdf_value < std::fabs(vox_tsdf[vox_idx]))
+      vox_tsdf[vox_idx] = Dtype(tsdf_value * sign);
+    return;
+  }
+  for (int iix = std::max(0, x - search_region); iix < std::min(vox_size[0], x + search_region + 1); iix++)
+    for (int iiy = std::max(0, y - search_region); iiy < std::min(vox_size[1], y + search_region + 1); iiy++)
+      for (int iiz = std::max(0, z - search_region); iiz < std::min(vox_size[2], z + search_region + 1); iiz++) {
+        int iidx = iiz * vox_size[0] * vox_size[1] + iiy * vox_size[0] + iix;
+        if (occupied[iidx] > 0) {
+          float xd = std::abs(x - iix);
+          float yd = std::abs(y - iiy);
+          float zd = std::abs(z - iiz);
+          float tsdf_value = sqrtf(xd * xd + yd * yd + zd * zd) / (float)search_region;
+          if (tsdf_value < std::fabs(vox_tsdf[vox_idx]))
+            vox_tsdf[vox_idx] = Dtype(tsdf_value * sign);
+        }
+      }
+}
+
+template <typename Dtype>
+void SquaredDistanceTransform_cpu(Dtype *cam_info, Dtype *vox_info, Dtype *depth_data, Dtype *vox_binary,
+                                  Dtype *vox_tsdf, bool exact_distance) {
+  Dtype vox_unit = vox_info[0];
+  Dtype vox_margin = vox_info[1];
+  int vox_size[3];
+  for (int i = 0; i < 3; ++i)
+    vox_size[i] = vox_info[i + 2];
+  Dtype *vox_origin = vox_info + 5;
+  int frame_width = cam_info[0];
+  int frame_height = cam_info[1];
+  Dtype *cam_K = cam_info + 2;
+  Dtype *cam_pose = cam_info + 11;
+  int search_region = (int)roundf(vox_margin / vox_unit);
+  int num_voxels = vox_size[0] * vox_size[1] * vox_size[2];
+
+  std::vector<int> d2;
+  if (exact_distance)
+    SquaredEDT_cpu(vox_size, vox_binary, d2);
+
+  int vox_idx;
+#pragma omp parallel for private(vox_idx) schedule(dynamic, 4096)
+  for (vox_idx = 0; vox_idx < num_voxels; ++vox_idx) {
+    int z = (vox_idx / (vox_size[0] * vox_size[1])) % vox_size[2];
+    int y = (vox_idx / vox_size[0]) % vox_size[1];
+    int x = vox_idx % vox_size[0];
+    if (vox_binary[vox_idx] > 0) {
+      vox_tsdf[vox_idx] = 0;
+      continue;
+    }
+    // Get point in world coordinates XYZ -> YZX
+    Dtype point_base[3];
+    point_base[0] = Dtype(z) * vox_unit + vox_origin[0];
+    point_base[1] = Dtype(x) * vox_unit + vox_origin[1];
+    point_base[2] = Dtype(y) * vox_unit + vox_origin[2];
+    // Get point in current camera coordinates
+    for (int i = 0; i < 3; ++i)
+      point_base[i] = point_base[i] - cam_pose[i * 4 + 3];
+    Dtype point_cam[3];
+    for (int i = 0; i < 3; ++i)
+      point_cam[i] = cam_pose[0 * 4 + i] * point_base[0] + cam_pose[1 * 4 + i] * point_base[1] +
+                     cam_pose[2 * 4 + i] * point_base[2];
+    if (point_cam[2] <= 0)
+      continue;
+    // Project point to 2D
+    int pixel_x = roundf(cam_K[0] * (point_cam[0] / point_cam[2]) + cam_K[2]);
+    int pixel_y = roundf(cam_K[4] * (point_cam[1] / point_cam[2]) + cam_K[5]);
+    if (pixel_x < 0 || pixel_x >= frame_width || pixel_y < 0 || pixel_y >= frame_height) // outside FOV
+      continue;
+    Dtype point_depth = depth_data[pixel_y * frame_width + pixel_x];
+    if (point_depth < Dtype(0.5f) || point_depth > Dtype(8.0f))
+      continue;
+    if (roundf(point_depth) == 0) { // missing depth
+      vox_tsdf[vox_idx] = Dtype(-1.0);
+      continue;
+    }
+    Dtype sign;
+    if (std::fabs(point_depth - point_cam[2]) < 0.0001)
+      sign = 1; // avoid NaN
+    else
+      sign = (point_depth - point_cam[2]) / std::fabs(point_depth - point_cam[2]);
+    vox_tsdf[vox_idx] = Dtype(sign);
+    NearestOccupied_cpu(vox_size, vox_binary, exact_distance ? &d2 : (std::vector<int> *)NULL,
+                        search_region, vox_idx, x, y, z, sign, vox_tsdf);
+  }
+}
+
+template <typename Dtype>
+void ComputeTSDF_cpu(Dtype *cam_info, Dtype *vox_info, Dtype *depth_data, Dtype *vox_tsdf,
+                     bool exact_distance) {
+  int num_voxels = int(vox_info[2]) * int(vox_info[3]) * int(vox_info[4]);
+  std::vector<Dtype> vox_binary(num_voxels, Dtype(0));
+  // from depth map to binary voxel representation
+  depth2Grid_cpu(cam_info, vox_info, depth_data, &vox_binary[0]);
+  // distance transform
+  SquaredDistanceTransform_cpu(cam_info, vox_info, depth_data, &vox_binary[0], vox_tsdf, exact_distance);
+}
+
+template <typename Dtype>
+void CompleteTSDF_cpu(Dtype *vox_info, Dtype *occupancy_label, Dtype *vox_tsdf, bool exact_distance) {
+  Dtype vox_unit = vox_info[0];
+  Dtype vox_margin = vox_info[1];
+  int vox_size[3];
+  for (int i = 0; i < 3; ++i)
+    vox_size[i] = vox_info[i + 2];
+  int search_region = (int)round(vox_margin / vox_unit);
+  int num_voxels = vox_size[0] * vox_size[1] * vox_size[2];
+
+  std::vector<int> d2;
+  if (exact_distance)
+    SquaredEDT_cpu(vox_size, occupancy_label, d2);
+
+  int vox_idx;
+#pragma omp parallel for private(vox_idx) schedule(dynamic, 4096)
+  for (vox_idx = 0; vox_idx < num_voxels; ++vox_idx) {
+    vox_tsdf[vox_idx] = 1.0;
+    int z = (vox_idx / (vox_size[0] * vox_size[1])) % vox_size[2];
+    int y = (vox_idx / vox_size[0]) % vox_size[1];
+    int x = vox_idx % vox_size[0];
+    if (occupancy_label[vox_idx] > 0) {
+      vox_tsdf[vox_idx] = 0.0f;
+      continue;
+    }
+    NearestOccupied_cpu(vox_size, occupancy_label, exact_distance ? &d2 : (std::vector<int> *)NULL,
+                        search_region, vox_idx, x, y, z, Dtype(1), vox_tsdf);
+  }
+}
+
+#endif
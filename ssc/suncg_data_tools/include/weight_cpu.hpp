@@ -0,0 +1,45 @@
+#ifndef _WEIGHT_CPU_HPP_
+#define _WEIGHT_CPU_HPP_
+
+// CPU version of DetermineHardPos in weight.hpp, parallelised with OpenMP.
+
+#include <algorithm>
+
+/*-------------------- determine hard pos example --------------------*/
+template <typename Dtype>
+void DetermineHardPos_cpu(const int * label_vox_size, int num_label_voxels, Dtype * segmentation_label_downscale, Dtype * hard_pos, int margin) {
+    int threshold = (margin*2+1)*(margin*2+1)*(margin*2+1);
+    int vox_idx;
+#pragma omp parallel for private(vox_idx)
+    for (vox_idx = 0; vox_idx < num_label_voxels; ++vox_idx) {
+        int z = int((vox_idx / ( label_vox_size[0] * label_vox_size[1]))%label_vox_size[2]) ;
+        int y = int((vox_idx / label_vox_size[0]) % label_vox_size[1]);
+        int x = int(vox_idx % label_vox_size[0]);
+
+        hard_pos[vox_idx] = -1;// default, neg example
+        if (segmentation_label_downscale[vox_idx] == 255){
+            hard_pos[vox_idx] = -2;
+            continue;
+        }
+        if (segmentation_label_downscale[vox_idx] >0 && segmentation_label_downscale[vox_idx] <255){
+            Dtype pos_label = segmentation_label_downscale[vox_idx];
+            int same_label_count = 0;
+            for (int iix = std::max(0,x-margin); iix <= std::min(label_vox_size[0]-1,x+margin); iix++){
+              for (int iiy = std::max(0,y-margin); iiy <= std::min(label_vox_size[1]-1,y+margin); iiy++){
+                for (int iiz = std::max(0,z-margin); iiz <= std::min(label_vox_size[2]-1,z+margin); iiz++){
+                  int iidx = iiz * label_vox_size[0] * label_vox_size[1] + iiy * label_vox_size[0] + iix;
+                  if (segmentation_label_downscale[iidx] == pos_label){
+                    same_label_count++;
+                  }
+                }
+              }
+            }
+            if(same_label_count == threshold)
+              hard_pos[vox_idx] = 0; // easy pos example
+            else if (same_label_count < threshold)
+              hard_pos[vox_idx] = 1; // hard pos example
+        }
+    }
+}
+
+#endif
@@ -0,0 +1,77 @@
+# Check the CPU backend of SUNCGData (gpu_num < 0) against reference outputs
+# of the CUDA backend. On a machine with a GPU, store the references once:
+#   python check_cpu_backend.py --save --gpu 0
+# then, on any machine (also with a CPU_ONLY build), compare:
+#   python check_cpu_backend.py
+# getHardPos2 must match exactly. The TSDFs may differ on a few voxels whose
+# projection lands on a pixel boundary, as the GPU rounds float math
+# differently; --max_mismatch bounds the fraction of such voxels.
+import sys
+sys.path.append('../lib')
+import argparse
+import os
+import time
+import numpy as np
+import SUNCGData
+
+parser = argparse.ArgumentParser(description='Compare the SUNCGData CPU backend with stored GPU outputs')
+parser.add_argument('--data_list', default='../../data/depthbin/SUNCGtest_49700_49884', type=str)
+parser.add_argument('--reference_dir', default='../../data/cpu_backend_reference/', type=str)
+parser.add_argument('--num', default=8, type=int, help='number of scenes')
+parser.add_argument('--save', action='store_true', help='store references computed on --gpu')
+parser.add_argument('--gpu', default=0, type=int)
+parser.add_argument('--window', action='store_true', help='also check the (slow) window distance search')
+parser.add_argument('--max_mismatch', default=1e-4, type=float, help='allowed fraction of differing TSDF voxels')
+config = parser.parse_args()
+
+gridsize = np.asarray([240,144,240])
+downscale = 4
+gridsize_downscale = (gridsize / downscale).astype(int)
+
+
+def compute(depth_file, gpu_num):
+    bin_file = depth_file[:-3] + 'bin'
+    label_full = SUNCGData.getLabels(bin_file).reshape(gridsize[::-1])
+    label_downscale = SUNCGData.downsampleLabel(label_full).reshape(gridsize_downscale[::-1])
+    return {'tsdf': SUNCGData.getTSDF(depth_file, bin_file, gpu_num),
+            'complete_tsdf': SUNCGData.getCompleteTSDF(bin_file, gpu_num),
+            'hard_pos': SUNCGData.getHardPos2(label_downscale, 1, gpu_num)}
+
+
+def compare(name, cpu, ref):
+    if name == 'hard_pos':
+        mismatch = np.count_nonzero(cpu != ref)
+        ok = mismatch == 0
+    else:
+        mismatch = np.count_nonzero(np.abs(cpu - ref) > 1e-5)
+        ok = mismatch <= config.max_mismatch * ref.size
+    print('  %-14s %s: %d of %d voxels differ, max abs diff %g'
+          % (name, 'ok' if ok else 'FAILED', mismatch, ref.size, np.abs(cpu - ref).max()))
+    return ok
+
+
+if config.save:
+    depth_files = SUNCGData.getDataFiles([config.data_list])[:config.num]
+    if not os.path.exists(config.reference_dir):
+        os.makedirs(config.reference_dir)
+    for idx, depth_file in enumerate(depth_files):
+        ref = compute(depth_file, config.gpu)
+        np.savez_compressed(config.reference_dir + '%d.npz' % idx, depth_file=depth_file, **ref)
+    print('saved %d references to %s' % (len(depth_files), config.reference_dir))
+    sys.exit(0)
+
+modes = [True, False] if config.window else [True]
+all_ok = True
+for idx in range(config.num):
+    ref = np.load(config.reference_dir + '%d.npz' % idx)
+    depth_file = str(ref['depth_file'])
+    for exact in modes:
+        SUNCGData.setExactDistance(exact)
+        start = time.time()
+        cpu = compute(depth_file, -1)
+        print('%s (%s distance, %.2fs)' % (depth_file, 'exact' if exact else 'window', time.time() - start))
+        for name in ['tsdf', 'complete_tsdf', 'hard_pos']:
+            all_ok = compare(name, cpu[name], ref[name]) and all_ok
+SUNCGData.setExactDistance(True)
+print('CPU backend matches the references' if all_ok else 'CPU backend differs from the references')
+sys.exit(0 if all_ok else 1)
@@ -0,0 +1,99 @@
+# Pack the per-scene .msg files written by prepare.py (listed in
+# data/manifest_<split>.json) into memory-mappable shards, see
+# ssc/util/suncg_shards.py. Shards older than their .msg files, or holding
+# other scenes than the current --shard_size gives them, are rebuilt.
+#   python pack_shards.py --split train
+#   python pack_shards.py --split test
+# Then point SUNCG['train_shard_path'] / SUNCG['test_shard_path'] in data.py
+# at ../data/shards/train/ and ../data/shards/test/.
+import sys
+sys.path.append('../../util')
+import argparse
+import glob
+import json
+import os
+import numpy as np
+import msgpack
+import msgpack_numpy as m
+m.patch()
+from multiprocessing import Pool as ThreadPool
+from suncg_shards import write_shard, shard_range
+
+parser = argparse.ArgumentParser(description='Pack SUNCG .msg files into shards')
+parser.add_argument('--split', default='train', type=str, help='train or test')
+parser.add_argument('--data_dir', default='../../data/', type=str)
+parser.add_argument('--shard_size', default=1024, type=int, help='scenes per shard')
+parser.add_argument('--tsdf_dtype', default='float32', type=str, help='float32 or float16')
+parser.add_argument('--num_thread', default=12, type=int)
+config = parser.parse_args()
+
+msg_dir = config.data_dir + 'msg/' + config.split + '/'
+weight_dir = config.data_dir + 'weight/' + config.split + '/'
+shard_dir = config.data_dir + 'shards/' + config.split + '/'
+if not os.path.exists(shard_dir):
+    os.makedirs(shard_dir)
+
+# the scenes and their indices come from the manifest written by prepare.py.
+# Scene idx is stored at position idx % shard_size of shard idx // shard_size,
+# so the indices must be 0..num-1 without gaps.
+manifest_path = config.data_dir + 'manifest_%s.json' % config.split
+if not os.path.isfile(manifest_path):
+    sys.exit('%s not found, run prepare.py (with --adopt_existing for data written '
+             'by prepare_data.py) first' % manifest_path)
+entries = json.load(open(manifest_path))['scenes'].values()
+indices = set(e['idx'] for e in entries)
+num = max(indices) + 1 if indices else 0
+gaps = sorted(set(range(num)) - indices)
+if gaps:
+    sys.exit('%s has no scene with index %s, rerun prepare.py' % (manifest_path, ', '.join(map(str, gaps[:10]))))
+has_weight = any('weight' in e.get('outputs', {}) for e in entries)
+
+
+def msgPath(idx):
+    return msg_dir + str(idx) + '.msg'
+
+
+def weightPath(idx):
+    return weight_dir + str(idx) + '_weight.msg'
+
+
+missing = [f for idx in range(num) for f in ([msgPath(idx)] + ([weightPath(idx)] if has_weight else []))
+           if not os.path.isfile(f)]
+if missing:
+    sys.exit('%d input files are missing, e.g. %s; rerun prepare.py' % (len(missing), ', '.join(missing[:5])))
+print('packing %d %s scenes%s' % (num, config.split, ' with weights' if has_weight else ''))
+
+
+def packShard(shard):
+    path = shard_dir + '%05d.shard' % shard
+    inputs = range(shard * config.shard_size, min((shard + 1) * config.shard_size, num))
+    sources = [msgPath(idx) for idx in inputs] + ([weightPath(idx) for idx in inputs] if has_weight else [])
+    # rebuilt when it holds other scenes (e.g. after a --shard_size change) or
+    # when any of its scenes was rewritten since it was packed
+    if shard_range(path) == (inputs[0], len(inputs)) and \
+            os.path.getmtime(path) >= max(os.path.getmtime(f) for f in sources):
+        print(path + ' is up to date')
+        return
+    scenes = []
+    for idx in inputs:
+        data = msgpack.load(open(msgPath(idx), 'rb'))
+        if has_weight:
+            data[b'weight'] = msgpack.load(open(weightPath(idx), 'rb'))
+        scenes.append(data)
+    write_shard(path, scenes, np.dtype(config.tsdf_dtype), inputs[0])
+    print(path)
+
+
+num_shards = (num + config.shard_size - 1) // config.shard_size
+# shards past the last one, left by an earlier run with more scenes or a
+# smaller --shard_size, would be read as more scenes
+for path in glob.glob(shard_dir + '*.shard'):
+    name = os.path.basename(path)[:-len('.shard')]
+    if not name.isdigit() or int(name) >= num_shards:
+        os.remove(path)
+        print('removed ' + path)
+
+pool = ThreadPool(config.num_thread)
+pool.map(packShard, range(num_shards))
+pool.close()
+pool.join()
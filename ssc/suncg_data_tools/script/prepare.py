@@ -0,0 +1,300 @@
+# Prepare the SUNCG scenes (msg/<split>/<idx>.msg, as read by ssc/*/data.py)
+# and training weights (weight/<split>/<idx>_weight.msg) in one resumable pass.
+#   python prepare.py                                  # train and test scenes, train weights
+#   python prepare.py --split test --outputs data
+#   python prepare.py --gpus 0                         # compute on the CPU
+# Both outputs of a depth/bin pair are made from one read of its labels.
+# data/manifest_<split>.json records, for every scene, its index, the size and
+# mtime of its source files, and for every output its checksum, size, voxel
+# counts and format version. A rerun only processes scenes with a missing or
+# stale output: not in the manifest, source changed, output file missing or
+# of a different size (or checksum, with --verify), or written with an older
+# format version. Bump DATA_VERSION / WEIGHT_VERSION when a format changes.
+# Scenes keep their index across runs; new scenes are numbered after the last
+# one. On the first run scenes are numbered by list position, like the old
+# prepare_data.py / prepare_weight.py, and --adopt_existing records their
+# outputs instead of regenerating them (only valid if the depthbin lists have
+# not changed since they were written).
+# After each split, data/index_<split>.npz lists the scenes with active input
+# sites (and weights, for the splits that have them), see
+# ssc/util/suncg_index.py.
+import sys
+sys.path.append('../lib')
+sys.path.append('../../util')
+import argparse
+import hashlib
+import json
+import os
+import time
+import numpy as np
+import msgpack
+import msgpack_numpy as m
+m.patch()
+from multiprocessing import Pool
+import SUNCGData
+from suncg_index import write_index
+
+DATA_VERSION = 1
+WEIGHT_VERSION = 1
+VERSIONS = {'data': DATA_VERSION, 'weight': WEIGHT_VERSION}
+
+DATA_LISTS = {
+    'train': ['SUNCGtrain_1_500', 'SUNCGtrain_501_1000', 'SUNCGtrain_1001_2000',
+              'SUNCGtrain_1001_3000', 'SUNCGtrain_3001_5000', 'SUNCGtrain_5001_7000'],
+    'test': ['SUNCGtest_49700_49884'],
+}
+
+gridsize = np.asarray([240,144,240])
+downscale = 4
+gridsize_downscale = (gridsize / downscale).astype(int)
+# every axis of the grid is < 256, so coordinates are stored as uint8 (n, 3)
+# arrays and labels as uint8, instead of int64 and float
+coord_dtype = np.uint8
+assert gridsize.max() <= np.iinfo(coord_dtype).max + 1
+
+parser = argparse.ArgumentParser(description='Prepare SUNCG scenes and weights')
+parser.add_argument('--split', default=['train', 'test'], nargs='+', help='train and/or test')
+parser.add_argument('--outputs', default=['data', 'weight'], nargs='+', help='data and/or weight')
+parser.add_argument('--weight_split', default=['train'], nargs='+', help='splits to write weights for')
+parser.add_argument('--data_dir', default='../../data/', type=str)
+parser.add_argument('--gpus', default=1, type=int, help='scenes are spread over this many GPUs; 0 computes on the CPU')
+parser.add_argument('--num_thread', default=12, type=int)
+parser.add_argument('--num', default=None, type=int, help='only the first num scenes of each split, for a quick test')
+parser.add_argument('--verify', action='store_true', help='also compare the checksums of existing outputs')
+parser.add_argument('--adopt_existing', action='store_true',
+                    help='record outputs already on disk for scenes not in the manifest instead of regenerating them')
+parser.add_argument('--save_every', default=100, type=int, help='scenes between manifest checkpoints')
+parser.add_argument('--report_every', default=100, type=int, help='scenes between throughput reports')
+
+
+def getDataFiles(data_lists):
+    data_files = SUNCGData.getDataFiles(data_lists)
+    data_files_valid = []
+    for depth_file in data_files:
+        bin_file = depth_file[:-3] + 'bin'
+        if os.path.isfile(depth_file) and os.path.isfile(bin_file):
+            data_files_valid.append(depth_file)
+    print('total vaild files:' + str(len(data_files_valid)))
+    return data_files_valid
+
+
+def outputPath(split, output, idx):
+    if output == 'data':
+        return 'msg/%s/%d.msg' % (split, idx)
+    return 'weight/%s/%d_weight.msg' % (split, idx)
+
+
+def sourceInfo(data_dir, depth_file):
+    info = {}
+    for name, path in [('depth', depth_file), ('bin', depth_file[:-3] + 'bin')]:
+        st = os.stat(data_dir + path)
+        info[name] = {'path': path, 'size': st.st_size, 'mtime': int(st.st_mtime)}
+    return info
+
+
+def sha1(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def writeOutput(path, obj, **kwargs):
+    # write to a temporary file and rename it, so an interrupted run never
+    # leaves a partial output behind
+    buf = msgpack.packb(obj, **kwargs)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(buf)
+    os.rename(path + '.tmp', path)
+    return {'sha1': hashlib.sha1(buf).hexdigest(), 'size': len(buf)}
+
+
+def sceneData(tsdf, label_downscale):
+    input_nz = tsdf.nonzero()
+    input_val = tsdf[input_nz]
+    label_legal = label_downscale.copy()
+    label_legal[label_downscale > 254] = 0
+    target_nz = label_legal.nonzero()
+    target_val = label_legal[target_nz]
+    scene = {'input_nz': np.asarray(input_nz).T.astype(coord_dtype), 'input_val': input_val.astype(np.float32),
+             'target_nz': np.asarray(target_nz).astype(coord_dtype), 'target_val': target_val.astype(np.uint8)}
+    return scene, {'input_num': len(input_val), 'target_num': len(target_val)}
+
+
+def sceneWeight(hard_pos, tsdf, rng):
+    # hard_pos = -2 , invalid
+    surface = np.logical_and(tsdf<0.99, tsdf>0)
+    weight = {'hard_pos': np.asarray((hard_pos == 1).nonzero()),
+              'easy_pos': np.asarray((hard_pos == 0).nonzero()),
+              'hard_neg': np.asarray(np.logical_and(hard_pos==-1, surface).nonzero()),
+              'easy_neg': np.asarray(np.logical_and(hard_pos==-1, np.logical_not(surface)).nonzero())}
+    hard_pos_num = weight['hard_pos'].shape[1]
+    easy_pos_num = weight['easy_pos'].shape[1]
+    hard_neg_num = weight['hard_neg'].shape[1]
+    easy_neg_num = weight['easy_neg'].shape[1]
+    select = {'hard_pos': slice(None),
+              'easy_pos': rng.permutation(easy_pos_num)[:min(hard_pos_num, easy_pos_num)],
+              'hard_neg': rng.permutation(hard_neg_num)[:min(int(hard_pos_num*5.5), hard_neg_num)],
+              'easy_neg': rng.permutation(easy_neg_num)[:min(int(hard_pos_num*2), easy_neg_num)]}
+    weight = dict((k, v.astype(np.uint8)[:, select[k]]) for k, v in weight.items())
+    return weight, dict((k + '_num', v.shape[1]) for k, v in weight.items())
+
+
+def processScene(job):
+    data_dir, split, idx, depth_file, outputs, gpu_num = job
+    try:
+        depth_file = data_dir + depth_file
+        bin_file = depth_file[:-3] + 'bin'
+        label_full = SUNCGData.getLabels(bin_file).reshape(gridsize[::-1])
+        label_downscale = SUNCGData.downsampleLabel(label_full).reshape(gridsize_downscale[::-1])
+        written = {}
+        if 'data' in outputs:
+            tsdf = SUNCGData.getTSDF(depth_file, bin_file, gpu_num).reshape(gridsize[::-1])
+            scene, counts = sceneData(tsdf, label_downscale)
+            written['data'] = writeOutput(data_dir + outputPath(split, 'data', idx), scene, use_single_float=True)
+            written['data'].update(counts)
+        if 'weight' in outputs:
+            hard_pos = SUNCGData.getHardPos2(label_downscale, 1, gpu_num).reshape(gridsize_downscale[::-1])
+            complete_tsdf = SUNCGData.getCompleteTSDF(bin_file, gpu_num).reshape(gridsize[::-1])
+            complete_tsdf = SUNCGData.downsampleTSDF(complete_tsdf).reshape(gridsize_downscale[::-1])
+            # seeded by scene, so the sampled voxels do not depend on the worker
+            weight, counts = sceneWeight(hard_pos, complete_tsdf, np.random.RandomState(idx))
+            written['weight'] = writeOutput(data_dir + outputPath(split, 'weight', idx), weight)
+            written['weight'].update(counts)
+        return idx, written, None
+    except Exception as e:
+        return idx, None, '%s: %r' % (depth_file, e)
+
+
+def adoptOutput(path, output):
+    "Manifest record of an output written before the manifest existed"
+    obj = msgpack.load(open(path, 'rb'))
+    get = lambda k: obj[k] if k in obj else obj[k.encode()]
+    if output == 'data':
+        counts = {'input_num': len(get('input_val')), 'target_num': len(get('target_val'))}
+    else:
+        counts = dict((k + '_num', np.asarray(get(k)).shape[1]) for k in ['hard_pos', 'easy_pos', 'hard_neg', 'easy_neg'])
+    record = {'sha1': sha1(path), 'size': os.path.getsize(path)}
+    record.update(counts)
+    return record
+
+
+def loadManifest(path):
+    if os.path.isfile(path):
+        return json.load(open(path))
+    return {'scenes': {}}
+
+
+def saveManifest(path, manifest):
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f)
+    os.rename(path + '.tmp', path)
+
+
+def isStale(config, entry, source, output, split, idx):
+    record = entry.get('outputs', {}).get(output)
+    if entry.get('source') != source or record is None or record.get('version') != VERSIONS[output]:
+        return True
+    path = config.data_dir + outputPath(split, output, idx)
+    if not os.path.isfile(path) or os.path.getsize(path) != record['size']:
+        return True
+    return config.verify and sha1(path) != record['sha1']
+
+
+def prepareSplit(config, split):
+    manifest_path = config.data_dir + 'manifest_%s.json' % split
+    manifest = loadManifest(manifest_path)
+    scenes = manifest['scenes']
+    first_run = len(scenes) == 0
+    outputs = [o for o in config.outputs if o != 'weight' or split in config.weight_split]
+    with_weight = split in config.weight_split
+    for output in outputs:
+        d = os.path.dirname(config.data_dir + outputPath(split, output, 0))
+        if not os.path.isdir(d):
+            os.makedirs(d)
+
+    depth_files = getDataFiles([config.data_dir + 'depthbin/' + l for l in DATA_LISTS[split]])
+    depth_files = [os.path.relpath(f, config.data_dir) for f in depth_files][:config.num]
+    next_idx = max([s['idx'] for s in scenes.values()] + [-1]) + 1
+    jobs = []
+    for position, depth_file in enumerate(depth_files):
+        source = sourceInfo(config.data_dir, depth_file)
+        if depth_file not in scenes:
+            scenes[depth_file] = {'idx': position if first_run else next_idx, 'source': source, 'outputs': {}}
+            next_idx = max(next_idx, scenes[depth_file]['idx'] + 1)
+        entry = scenes[depth_file]
+        idx = entry['idx']
+        if entry['source'] != source:
+            entry['source'], entry['outputs'] = source, {}
+        todo = []
+        for output in outputs:
+            path = config.data_dir + outputPath(split, output, idx)
+            if config.adopt_existing and output not in entry['outputs'] and os.path.isfile(path):
+                entry['outputs'][output] = adoptOutput(path, output)
+                entry['outputs'][output]['version'] = VERSIONS[output]
+            if isStale(config, entry, source, output, split, idx):
+                todo.append(output)
+        if todo:
+            gpu_num = idx % config.gpus if config.gpus > 0 else -1
+            jobs.append((config.data_dir, split, idx, depth_file, todo, gpu_num))
+    by_idx = dict((s['idx'], s) for s in scenes.values())
+    missing = len(scenes) - len(depth_files) if config.num is None else 0
+    print('%s: %d scenes, %d up to date, %d to process%s' % (split, len(depth_files), len(depth_files) - len(jobs),
+          len(jobs), ', %d in the manifest but no longer listed' % missing if missing > 0 else ''))
+    saveManifest(manifest_path, manifest)
+
+    start = time.time()
+    done, failed, written_bytes = 0, 0, 0
+    pool = Pool(config.num_thread)
+    try:
+        for idx, written, error in pool.imap_unordered(processScene, jobs):
+            done += 1
+            if error is not None:
+                failed += 1
+                print('failed ' + error)
+            else:
+                for output, record in written.items():
+                    record['version'] = VERSIONS[output]
+                    by_idx[idx]['outputs'][output] = record
+                    written_bytes += record['size']
+            if done % config.save_every == 0:
+                saveManifest(manifest_path, manifest)
+            if done % config.report_every == 0 or done == len(jobs):
+                elapsed = time.time() - start
+                rate = done / elapsed
+                print('%s: %d/%d scenes, %.2f scenes/s, %.1f MB/s, eta %.0fs' % (split, done, len(jobs), rate,
+                      written_bytes / elapsed / 2 ** 20, (len(jobs) - done) / rate))
+    finally:
+        pool.terminate()
+        pool.join()
+        saveManifest(manifest_path, manifest)
+    if failed:
+        print('%s: %d scenes failed, rerun to retry them' % (split, failed))
+    writeIndex(config, split, scenes, with_weight)
+    return failed
+
+
+def writeIndex(config, split, scenes, with_weight):
+    idx, num_sites = [], []
+    for entry in scenes.values():
+        data = entry['outputs'].get('data')
+        if data is None or data['input_num'] == 0 or (with_weight and 'weight' not in entry['outputs']):
+            continue
+        idx.append(entry['idx'])
+        num_sites.append(data['input_num'])
+    path = config.data_dir + 'index_%s.npz' % split
+    write_index(path, idx, num_sites)
+    print('%s: %d of %d scenes in %s' % (split, len(idx), len(scenes), path))
+
+
+def main(argv=None):
+    config = parser.parse_args(argv)
+    failed = 0
+    for split in config.split:
+        failed += prepareSplit(config, split)
+    return failed
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main() else 0)
@@ -7,11 +7,34 @@
 #include "params.hpp"
 #include "downsample.hpp"
 #include "suncg_io.hpp"
+#include "tsdf_cpu.hpp"
+#include "weight_cpu.hpp"
+#ifndef CPU_ONLY
 #include "tsdf.hpp"
 #include "device_alternate.hpp"
 #include "weight.hpp"
+#endif
 
 using namespace boost::python;
+
+// getTSDF, getCompleteTSDF, getHardPos and getHardPos2 run on the CPU when
+// gpu_num < 0 (always, in a CPU_ONLY build). On the CPU, distances are read
+// from an exact distance transform unless setExactDistance(False) is called,
+// which switches back to the window search of the GPU kernels; both give the
+// same result.
+bool cpu_exact_distance = true;
+
+void setExactDistance(bool exact){
+  cpu_exact_distance = exact;
+}
+
+bool useCPU(int gpu_num){
+#ifdef CPU_ONLY
+  return true;
+#else
+  return gpu_num < 0;
+#endif
+}
 // reference https://jianfengwang.wordpress.com/tag/python-numpy-cc/
 boost::python::object downsampleLabel(PyObject* label_full){
   PyArrayObject* label_full_array = PyArray_GETCONTIGUOUS((PyArrayObject*)label_full);
@@ -105,17 +128,9 @@ boost::python::object getLabels(const std::string &filename){
 }
 
 boost::python::object getTSDF(const std::string & depth_filename, const std::string & bin_filename, int gpu_num){
-  cudaSetDevice(gpu_num);
   // read depth image
   float *depth_data = new float[frame_height * frame_width];
-  float *depth_data_GPU;
-  CUDA_CHECK(cudaMalloc(&depth_data_GPU,
-                    frame_height * frame_width * sizeof(float)));
-
   ReadDepthImage(depth_filename, depth_data, frame_width, frame_height);
-  CUDA_CHECK(cudaMemcpy(depth_data_GPU, depth_data, 
-            frame_height * frame_width * sizeof(float),
-                      cudaMemcpyHostToDevice));
   // read vox origin and cam pose
   float vox_origin[3];
   float cam_pose[16];
@@ -148,30 +163,51 @@ boost::python::object getTSDF(const std::string & depth_filename, const std::str
   vox_info[6] = vox_origin[1];
   vox_info[7] = vox_origin[2];
 
-  float *cam_info_GPU;
-  float *vox_info_GPU;
-  CUDA_CHECK(cudaMalloc(&cam_info_GPU, 27 * sizeof(float)));
-  CUDA_CHECK(cudaMalloc(&vox_info_GPU, 8 * sizeof(float)));
-  CUDA_CHECK(cudaMemcpy(cam_info_GPU, cam_info, 27 * sizeof(float),
-                        cudaMemcpyHostToDevice));
-  CUDA_CHECK(cudaMemcpy(vox_info_GPU, vox_info, 8 * sizeof(float),
+  int num_voxels = data_full_vox_size[0]*data_full_vox_size[1]*data_full_vox_size[2];
+  float * tsdf_data_CPU = new float[num_voxels];
+  if (useCPU(gpu_num)){
+    std::fill(tsdf_data_CPU, tsdf_data_CPU + num_voxels, float(1.0));
+    ComputeTSDF_cpu(cam_info, vox_info, depth_data, tsdf_data_CPU, cpu_exact_distance);
+    // transform tsdf to fliped tsdf
+    tsdfTransform_cpu(vox_info, tsdf_data_CPU);
+  }
+#ifndef CPU_ONLY
+  else {
+    cudaSetDevice(gpu_num);
+    float *depth_data_GPU;
+    CUDA_CHECK(cudaMalloc(&depth_data_GPU,
+                      frame_height * frame_width * sizeof(float)));
+    CUDA_CHECK(cudaMemcpy(depth_data_GPU, depth_data, 
+              frame_height * frame_width * sizeof(float),
                         cudaMemcpyHostToDevice));
+    float *cam_info_GPU;
+    float *vox_info_GPU;
+    CUDA_CHECK(cudaMalloc(&cam_info_GPU, 27 * sizeof(float)));
+    CUDA_CHECK(cudaMalloc(&vox_info_GPU, 8 * sizeof(float)));
+    CUDA_CHECK(cudaMemcpy(cam_info_GPU, cam_info, 27 * sizeof(float),
+                          cudaMemcpyHostToDevice));
+    CUDA_CHECK(cudaMemcpy(vox_info_GPU, vox_info, 8 * sizeof(float),
+                          cudaMemcpyHostToDevice));
 
-  float *tsdf_data_GPU;
-  int num_voxels = data_full_vox_size[0]*data_full_vox_size[1]*data_full_vox_size[2];
-  CUDA_CHECK(cudaMalloc(&tsdf_data_GPU, num_voxels * sizeof(float)));
-  GPU_set_value(num_voxels, tsdf_data_GPU, float(1.0));
-  ComputeTSDF(cam_info, vox_info, cam_info_GPU, vox_info_GPU, depth_data_GPU, tsdf_data_GPU);
-  // transform tsdf to fliped tsdf
-  int THREADS_NUM = 1024;
-  int BLOCK_NUM = int((num_voxels + size_t(THREADS_NUM) - 1) / THREADS_NUM);
-  tsdfTransform <<< BLOCK_NUM, THREADS_NUM >>> (vox_info_GPU, tsdf_data_GPU);
+    float *tsdf_data_GPU;
+    CUDA_CHECK(cudaMalloc(&tsdf_data_GPU, num_voxels * sizeof(float)));
+    GPU_set_value(num_voxels, tsdf_data_GPU, float(1.0));
+    ComputeTSDF(cam_info, vox_info, cam_info_GPU, vox_info_GPU, depth_data_GPU, tsdf_data_GPU);
+    // transform tsdf to fliped tsdf
+    int THREADS_NUM = 1024;
+    int BLOCK_NUM = int((num_voxels + size_t(THREADS_NUM) - 1) / THREADS_NUM);
+    tsdfTransform <<< BLOCK_NUM, THREADS_NUM >>> (vox_info_GPU, tsdf_data_GPU);
 
-  float * tsdf_data_CPU = new float[num_voxels];
-  // copy back to cpu
-  CUDA_CHECK(cudaMemcpy(tsdf_data_CPU, tsdf_data_GPU,
-                        num_voxels * sizeof(float),
-                        cudaMemcpyDeviceToHost));
+    // copy back to cpu
+    CUDA_CHECK(cudaMemcpy(tsdf_data_CPU, tsdf_data_GPU,
+                          num_voxels * sizeof(float),
+                          cudaMemcpyDeviceToHost));
+    CUDA_CHECK(cudaFree(depth_data_GPU));
+    CUDA_CHECK(cudaFree(cam_info_GPU));
+    CUDA_CHECK(cudaFree(vox_info_GPU));
+    CUDA_CHECK(cudaFree(tsdf_data_GPU));
+  }
+#endif
 
   // handle python obj
   std::vector<float>  vec(tsdf_data_CPU, tsdf_data_CPU + num_voxels);
@@ -184,17 +220,11 @@ boost::python::object getTSDF(const std::string & depth_filename, const std::str
   // release memory
   delete[] depth_data;
   delete[] tsdf_data_CPU;
-  CUDA_CHECK(cudaFree(depth_data_GPU));
-  CUDA_CHECK(cudaFree(cam_info_GPU));
-  CUDA_CHECK(cudaFree(vox_info_GPU));
-  CUDA_CHECK(cudaFree(tsdf_data_GPU));
   
   return arr.copy();
 }
 
 boost::python::object getCompleteTSDF(const std::string & bin_filename, int gpu_num){
-  cudaSetDevice(gpu_num);
-
   // read label
   int num_full_voxels = data_full_vox_size[0] * data_full_vox_size[1] * data_full_vox_size[2];
 
@@ -205,12 +235,6 @@ boost::python::object getCompleteTSDF(const std::string & bin_filename, int gpu_
 
   ReadVoxLabel(bin_filename, vox_origin, cam_pose, occupancy_label_full, segmentation_class_map, segmentation_label_full);
 
-  float *occupancy_label_full_GPU;
-  CUDA_CHECK(cudaMalloc(&occupancy_label_full_GPU,
-                    num_full_voxels * sizeof(float)));
-  CUDA_CHECK(cudaMemcpy(occupancy_label_full_GPU, occupancy_label_full, 
-            num_full_voxels * sizeof(float), cudaMemcpyHostToDevice));
- 
   float vox_info[8];
   vox_info[0] = vox_unit;
   vox_info[1] = vox_margin;
@@ -218,22 +242,38 @@ boost::python::object getCompleteTSDF(const std::string & bin_filename, int gpu_
     vox_info[i + 2] = float(data_full_vox_size[i]);
   // vox info[5~7] is not needed for computing complete tsdf
 
-  float *vox_info_GPU;
-  CUDA_CHECK(cudaMalloc(&vox_info_GPU, 8 * sizeof(float)));
-  CUDA_CHECK(cudaMemcpy(vox_info_GPU, vox_info, 8 * sizeof(float),
-                        cudaMemcpyHostToDevice));
+  float *complete_tsdf_CPU = new float[num_full_voxels];
+  if (useCPU(gpu_num)){
+    CompleteTSDF_cpu(vox_info, occupancy_label_full, complete_tsdf_CPU, cpu_exact_distance);
+  }
+#ifndef CPU_ONLY
+  else {
+    cudaSetDevice(gpu_num);
+    float *occupancy_label_full_GPU;
+    CUDA_CHECK(cudaMalloc(&occupancy_label_full_GPU,
+                      num_full_voxels * sizeof(float)));
+    CUDA_CHECK(cudaMemcpy(occupancy_label_full_GPU, occupancy_label_full, 
+              num_full_voxels * sizeof(float), cudaMemcpyHostToDevice));
+    float *vox_info_GPU;
+    CUDA_CHECK(cudaMalloc(&vox_info_GPU, 8 * sizeof(float)));
+    CUDA_CHECK(cudaMemcpy(vox_info_GPU, vox_info, 8 * sizeof(float),
+                          cudaMemcpyHostToDevice));
 
-  float *complete_tsdf_GPU;
-  CUDA_CHECK(cudaMalloc(&complete_tsdf_GPU, num_full_voxels * sizeof(float)));
-  int THREADS_NUM = 1024;
-  int BLOCK_NUM = int((num_full_voxels + size_t(THREADS_NUM) - 1) / THREADS_NUM);
-  CompleteTSDF<<<BLOCK_NUM, THREADS_NUM>>>(vox_info_GPU, occupancy_label_full_GPU, complete_tsdf_GPU);
+    float *complete_tsdf_GPU;
+    CUDA_CHECK(cudaMalloc(&complete_tsdf_GPU, num_full_voxels * sizeof(float)));
+    int THREADS_NUM = 1024;
+    int BLOCK_NUM = int((num_full_voxels + size_t(THREADS_NUM) - 1) / THREADS_NUM);
+    CompleteTSDF<<<BLOCK_NUM, THREADS_NUM>>>(vox_info_GPU, occupancy_label_full_GPU, complete_tsdf_GPU);
 
-  float *complete_tsdf_CPU = new float[num_full_voxels];
-  // copy back to cpu
-  CUDA_CHECK(cudaMemcpy(complete_tsdf_CPU, complete_tsdf_GPU,
-                        num_full_voxels * sizeof(float),
-                        cudaMemcpyDeviceToHost));
+    // copy back to cpu
+    CUDA_CHECK(cudaMemcpy(complete_tsdf_CPU, complete_tsdf_GPU,
+                          num_full_voxels * sizeof(float),
+                          cudaMemcpyDeviceToHost));
+    CUDA_CHECK(cudaFree(occupancy_label_full_GPU));
+    CUDA_CHECK(cudaFree(vox_info_GPU));
+    CUDA_CHECK(cudaFree(complete_tsdf_GPU));
+  }
+#endif
 
   // handle python obj
   std::vector<float>  vec(complete_tsdf_CPU, complete_tsdf_CPU + num_full_voxels);
@@ -247,9 +287,6 @@ boost::python::object getCompleteTSDF(const std::string & bin_filename, int gpu_
   delete[] occupancy_label_full;
   delete[] segmentation_label_full;
   delete[] complete_tsdf_CPU;
-  CUDA_CHECK(cudaFree(occupancy_label_full_GPU));
-  CUDA_CHECK(cudaFree(vox_info_GPU));
-  CUDA_CHECK(cudaFree(complete_tsdf_GPU));
   
   return arr.copy();
 }
@@ -273,13 +310,20 @@ boost::python::list getDataFiles(const boost::python::object& iterable) {
 }
 
 boost::python::object getHardPos(PyObject* label_downscale, int margin, int gpu_num){
-  cudaSetDevice(gpu_num);
   PyArrayObject* label_downscale_array =  PyArray_GETCONTIGUOUS((PyArrayObject*)label_downscale);
   float* label_downscale_ptr = (float*)PyArray_DATA(label_downscale_array);
   
   int num_label_voxels = label_vox_size[0] * label_vox_size[1] * label_vox_size[2];
   float* hard_pos = new float[num_label_voxels];
-  DetermineHardPos(&label_vox_size[0], num_label_voxels, label_downscale_ptr, hard_pos, margin);
+  if (useCPU(gpu_num)){
+    DetermineHardPos_cpu(&label_vox_size[0], num_label_voxels, label_downscale_ptr, hard_pos, margin);
+  }
+#ifndef CPU_ONLY
+  else {
+    cudaSetDevice(gpu_num);
+    DetermineHardPos(&label_vox_size[0], num_label_voxels, label_downscale_ptr, hard_pos, margin);
+  }
+#endif
 
   std::vector<float>  vec(hard_pos, hard_pos + num_label_voxels);
   npy_intp size = vec.size();
@@ -293,7 +337,6 @@ boost::python::object getHardPos(PyObject* label_downscale, int margin, int gpu_
   return arr.copy();
 }
 boost::python::object getHardPos2(PyObject* label_downscale, int margin, int gpu_num){
-  cudaSetDevice(gpu_num);
   PyArrayObject* label_downscale_array =  PyArray_GETCONTIGUOUS((PyArrayObject*)label_downscale);
   float* label_downscale_ptr = (float*)PyArray_DATA(label_downscale_array);
   npy_intp *shape = PyArray_DIMS(label_downscale_array);
@@ -303,7 +346,15 @@ boost::python::object getHardPos2(PyObject* label_downscale, int margin, int gpu
   }
   int num_label_voxels = label_size[0] * label_size[1] * label_size[2];
   float* hard_pos = new float[num_label_voxels];
-  DetermineHardPos(&label_size[0], num_label_voxels, label_downscale_ptr, hard_pos, margin);
+  if (useCPU(gpu_num)){
+    DetermineHardPos_cpu(&label_size[0], num_label_voxels, label_downscale_ptr, hard_pos, margin);
+  }
+#ifndef CPU_ONLY
+  else {
+    cudaSetDevice(gpu_num);
+    DetermineHardPos(&label_size[0], num_label_voxels, label_downscale_ptr, hard_pos, margin);
+  }
+#endif
 
   std::vector<float>  vec(hard_pos, hard_pos + num_label_voxels);
   npy_intp size = vec.size();
@@ -340,5 +391,6 @@ BOOST_PYTHON_MODULE(SUNCGData)
   boost::python::def("getDataFiles",getDataFiles);
   boost::python::def("getHardPos",getHardPos);
   boost::python::def("getHardPos2",getHardPos2);
+  boost::python::def("setExactDistance",setExactDistance);
 }
 
@@ -0,0 +1,164 @@
+# Batch collation for SUNCG scenes, used by merge() in ssc/*/data.py
+#
+# Every output is allocated once for the whole batch. The dense label and
+# weight volumes are filled with a single scatter through flat voxel indices
+# b * volume + ravel(z, y, x), and the half resolution weights are reduced
+# from strided slices of the full resolution ones. For the loss, the weights
+# can instead be kept as the flat indices of the weighted voxels.
+# downsample_labels is a numpy version of SUNCGData.downsampleLabel2, for
+# when the SUNCG data toolbox is not built.
+from __future__ import absolute_import
+import numpy as np
+
+__all__ = ['collate_inputs', 'scatter_labels', 'sample_weight_indices', 'downsample_weight_indices',
+           'sample_weights', 'downsample_weight', 'downsample_labels']
+
+
+def collate_inputs(input_nzs, input_vals):
+    """
+    Concatenate the active sites of a batch of scenes.
+    Returns (n, 3) int64 locations, (n,) float32 values and the number of
+    sites of each scene.
+    """
+    nz_nums = np.array([len(nz) for nz in input_nzs], dtype=np.int64)
+    locations = np.empty((nz_nums.sum(), 3), dtype=np.int64)
+    vals = np.empty(nz_nums.sum(), dtype=np.float32)
+    start = 0
+    for input_nz, input_val, n in zip(input_nzs, input_vals, nz_nums):
+        locations[start:start + n] = input_nz
+        vals[start:start + n] = input_val
+        start += n
+    return locations, vals, nz_nums
+
+
+def _flat_index(coords, size, b):
+    # coords is (3, n); index into a (batch,) + size array viewed as 1D
+    return np.ravel_multi_index(tuple(np.asarray(coords, dtype=np.int64)), size) + b * int(np.prod(size))
+
+
+def scatter_labels(target_nzs, target_vals, size):
+    """(batch,) + size float32 label volumes, zero except at target_nz."""
+    size = tuple(int(s) for s in size)
+    labels = np.zeros((len(target_nzs),) + size, dtype=np.float32)
+    if len(target_nzs):
+        idx = np.concatenate([_flat_index(nz, size, b) for b, nz in enumerate(target_nzs)])
+        labels.reshape(-1)[idx] = np.concatenate(target_vals)
+    return labels
+
+
+def sample_weight_indices(weight_infos, size, easy_ratio, neg_ratio):
+    """
+    Select the voxels with weight 1: every hard positive and a random subset
+    of the easy positives, hard negatives and easy negatives. Samples in the
+    same order, and with the same np.random calls, as the original per-scene
+    loop in merge().
+    Returns the sorted flat voxel indices into size of the selected voxels of
+    each scene, concatenated, and the number selected in each scene.
+    """
+    size = tuple(int(s) for s in size)
+    indices = []
+    for weight_info in weight_infos:
+        hard_pos, easy_pos = weight_info[b'hard_pos'], weight_info[b'easy_pos']
+        hard_neg, easy_neg = weight_info[b'hard_neg'], weight_info[b'easy_neg']
+        idx = [_flat_index(hard_pos, size, 0)]
+        hard_pos_num = hard_pos.shape[1]
+        easy_pos_num = min(int(hard_pos_num*easy_ratio), easy_pos.shape[1])
+        if easy_pos_num > 0:
+            easy_pos_idx = np.random.permutation(easy_pos.shape[1])[:easy_pos_num]
+            idx.append(_flat_index(easy_pos[:, easy_pos_idx], size, 0))
+        neg_num = int(min((hard_pos_num+easy_pos_num)*neg_ratio, hard_neg.shape[1] / (1-easy_ratio)))
+        hard_neg_num = int(min(neg_num * (1-easy_ratio), hard_neg.shape[1]))
+        if hard_neg_num > 0:
+            hard_neg_idx = np.random.permutation(hard_neg.shape[1])[:hard_neg_num]
+            idx.append(_flat_index(hard_neg[:, hard_neg_idx], size, 0))
+        easy_neg_num = neg_num - hard_neg_num
+        if easy_neg_num > 0:
+            easy_neg_idx = np.random.permutation(easy_neg.shape[1])[:easy_neg_num]
+            idx.append(_flat_index(easy_neg[:, easy_neg_idx], size, 0))
+        indices.append(np.unique(np.concatenate(idx)))
+    return _concatenate_indices(indices)
+
+
+def downsample_weight_indices(index, count, size):
+    """
+    The selected voxels at half resolution, as returned by
+    sample_weight_indices: the 2x2x2 blocks holding any voxel of index.
+    """
+    size = tuple(int(s) for s in size)
+    half = tuple(s // 2 for s in size)
+    indices = []
+    for idx in np.split(index, np.cumsum(count)[:-1]):
+        coords = np.unravel_index(idx, size)
+        indices.append(np.unique(np.ravel_multi_index(tuple(c // 2 for c in coords), half)))
+    return _concatenate_indices(indices)
+
+
+def _concatenate_indices(indices):
+    count = np.array([len(idx) for idx in indices], dtype=np.int64)
+    index = np.concatenate(indices).astype(np.int64) if indices else np.zeros(0, dtype=np.int64)
+    return index, count
+
+
+def sample_weights(weight_infos, size, easy_ratio, neg_ratio):
+    """
+    (batch,) + size float32 weight volumes, 1 at the voxels selected by
+    sample_weight_indices and 0 elsewhere.
+    """
+    size = tuple(int(s) for s in size)
+    index, count = sample_weight_indices(weight_infos, size, easy_ratio, neg_ratio)
+    weights = np.zeros((len(weight_infos),) + size, dtype=np.float32)
+    offsets = np.repeat(np.arange(len(weight_infos), dtype=np.int64) * int(np.prod(size)), count)
+    weights.reshape(-1)[index + offsets] = 1
+    return weights
+
+
+def downsample_weight(weights):
+    """
+    Half resolution weights: 1 where any voxel of the 2x2x2 block has
+    non-zero weight. Takes the maximum of each pair of neighbouring slices
+    along z, y and x in turn, which is much faster than reducing a 7-D
+    reshape over three axes.
+    """
+    weights = np.maximum(weights[:, 0::2], weights[:, 1::2])
+    weights = np.maximum(weights[:, :, 0::2], weights[:, :, 1::2])
+    weights = np.maximum(weights[:, :, :, 0::2], weights[:, :, :, 1::2])
+    return (weights > 0).astype(np.float32)
+
+
+def downsample_labels(labels, factor):
+    """
+    SUNCGData.downsampleLabel2 applied to each volume of labels: the label of
+    every factor^3 block is the most frequent value occurring at least twice,
+    ties going to the value seen first in x, y, z order, else 0. Unless more
+    than 95% of the block is empty (0 or 255), empty values are not counted.
+    Like SUNCGData, the last axis of each volume is z and the first is x.
+    Returns (batch,) + (shape // factor) float32 volumes.
+    """
+    labels = np.asarray(labels, dtype=np.float32)
+    shape = labels.shape[1:]
+    Z, Y, X = shape[::-1]
+    z, y, x = Z // factor, Y // factor, X // factor
+    k = factor ** 3
+    # one row per block, its values in x, y, z order
+    v = labels.reshape((-1, Z, Y, X))[:, :z * factor, :y * factor, :x * factor]
+    v = v.reshape(-1, z, factor, y, factor, x, factor).transpose(0, 1, 3, 5, 6, 4, 2).reshape(-1, k)
+    with_zeros = ((v < 0.001) | (v > 254)).sum(1) > np.float32(0.95 * k)
+    # runs of equal values in each sorted row; a stable sort puts the first
+    # occurrence of each value at the start of its run
+    order = np.argsort(v, axis=1, kind='stable')
+    sorted_v = np.take_along_axis(v, order, axis=1)
+    start = np.ones(v.shape, dtype=bool)
+    start[:, 1:] = sorted_v[:, 1:] != sorted_v[:, :-1]
+    run = np.flatnonzero(start)
+    count = np.diff(np.append(run, v.size))
+    first = order.reshape(-1)[run]
+    value = sorted_v.reshape(-1)[run]
+    row = run // k
+    eligible = (count > 1) & (with_zeros[row] | ((value > 0) & (value < 255)))
+    # higher count first, then earlier first occurrence; unique within a row
+    score = np.where(eligible, count * (k + 1) + (k - first), -1)
+    best = np.maximum.reduceat(score, np.flatnonzero(np.r_[True, row[1:] != row[:-1]]))
+    win = (score >= 0) & (score == best[row])
+    out = np.zeros(len(v), dtype=np.float32)
+    out[row[win]] = value[win]
+    return out.reshape((-1,) + tuple(s // factor for s in shape))
@@ -0,0 +1,99 @@
+# Index of the usable SUNCG scenes of a split
+#
+# An index is an .npz file with two int64 arrays: 'idx', the numbers of the
+# scenes with at least one active input site (and, for training, weights), in
+# increasing order, and 'num_sites', their numbers of active input sites. It
+# is written by suncg_data_tools/script/prepare.py, and can be derived from
+# packed shards, so the training sampler draws only non-empty scenes instead
+# of loading and discarding empty ones. The numbers of sites also let batches
+# be composed by size, since the cost of the sparse layers grows with them.
+from __future__ import absolute_import
+import os
+import numpy as np
+
+__all__ = ['write_index', 'load_index', 'index_from_shards', 'sample_index', 'bucketed_order', 'budget_batches']
+
+
+def write_index(path, idx, num_sites):
+    idx = np.asarray(idx, dtype=np.int64)
+    num_sites = np.asarray(num_sites, dtype=np.int64)
+    order = np.argsort(idx)
+    with open(path + '.tmp', 'wb') as f:
+        np.savez(f, idx=idx[order], num_sites=num_sites[order])
+    os.rename(path + '.tmp', path)
+
+
+def load_index(path):
+    index = np.load(path)
+    return index['idx'], index['num_sites']
+
+
+def index_from_shards(shards):
+    """Index of the non-empty scenes in a SUNCGShards."""
+    num_sites = np.array([shards.num_sites(i) for i in range(len(shards))], dtype=np.int64)
+    idx = np.flatnonzero(num_sites)
+    return idx, num_sites[idx]
+
+
+def sample_index(path, num, shards=None):
+    """
+    (idx, num_sites) of the usable scenes among the first num: from the index
+    file at path if there is one, else from shards. Without either, every
+    scene is returned and num_sites is None.
+    """
+    if path is not None and os.path.isfile(path):
+        idx, num_sites = load_index(path)
+    elif shards is not None:
+        idx, num_sites = index_from_shards(shards)
+    else:
+        print('no scene index at %s, empty scenes are discarded while loading' % path)
+        return np.arange(num), None
+    keep = idx < num
+    return idx[keep], num_sites[keep]
+
+
+def bucketed_order(num_sites, batch_size, bucket_batches, rng=np.random):
+    """
+    Random order of range(len(num_sites)) in which the scenes of each batch
+    have similar numbers of sites, for more uniform step times. A random
+    permutation is cut into buckets of bucket_batches batches, each bucket is
+    sorted by number of sites and cut into batches, and the batches are
+    shuffled.
+    """
+    num_sites = np.asarray(num_sites)
+    perm = rng.permutation(len(num_sites))
+    bucket = batch_size * bucket_batches
+    order = np.concatenate([b[np.argsort(num_sites[b], kind='stable')]
+                            for b in np.split(perm, np.arange(bucket, len(perm), bucket))])
+    n = len(order) // batch_size * batch_size
+    batches = order[:n].reshape(-1, batch_size)[rng.permutation(n // batch_size)]
+    return np.concatenate([batches.reshape(-1), order[n:]])
+
+
+def budget_batches(num_sites, budget, max_batch_size, num_batches, bucket_batches=8, rng=np.random):
+    """
+    num_batches batches, as arrays of positions into num_sites, of at most
+    max_batch_size scenes and at most budget sites in total (a scene over
+    budget makes a batch of its own). A random permutation is cut into
+    buckets of bucket_batches * max_batch_size scenes, each bucket is sorted
+    by number of sites and cut greedily into batches, and the batches are
+    shuffled; further permutations are drawn until there are num_batches.
+    """
+    num_sites = np.asarray(num_sites)
+    bucket = max_batch_size * bucket_batches
+    batches = []
+    while len(batches) < num_batches:
+        epoch = []
+        perm = rng.permutation(len(num_sites))
+        for b in np.split(perm, np.arange(bucket, len(perm), bucket)):
+            b = b[np.argsort(num_sites[b], kind='stable')]
+            start, total = 0, 0
+            for i, n in enumerate(num_sites[b]):
+                if i > start and (total + n > budget or i - start == max_batch_size):
+                    epoch.append(b[start:i])
+                    start, total = i, 0
+                total += n
+            if len(b) > start:
+                epoch.append(b[start:])
+        batches += [epoch[i] for i in rng.permutation(len(epoch))]
+    return batches[:num_batches]
@@ -0,0 +1,221 @@
+# Packed SUNCG shards
+#
+# The prepared data is one msgpack file per scene (plus one per scene for the
+# training weights). A shard packs a run of consecutive scenes into a single
+# file of contiguous columns, so a scene is read by slicing memory-mapped
+# arrays instead of opening and parsing two files.
+#
+# Shard file layout:
+#   b'SUNCGSHD', uint64 header length, JSON header, then 64-byte aligned
+#   arrays. The header records the index of the first scene in the shard
+#   and the number of scenes. For every field it records its dtype, its number of
+#   columns and the file offsets of
+#     starts: uint64 array of num+1 row offsets, scene i owns rows
+#             starts[i]:starts[i+1]
+#     data:   rows x columns array
+#   Coordinates are stored one site per row as uint8 (every axis of the grid
+#   is < 256): input_nz as (n, 3), the (3, n) target and weight coordinates
+#   transposed to (n, 3).
+from __future__ import absolute_import
+import glob
+import json
+import os
+import struct
+import numpy as np
+
+__all__ = ['SUNCGShards', 'write_shard', 'shard_range', 'FIELDS']
+
+MAGIC = b'SUNCGSHD'
+VERSION = 2
+ALIGN = 64
+
+# name: (dtype, columns, stored transposed)
+FIELDS = {
+    'input_nz': (np.uint8, 3, False),
+    'input_val': (np.float32, 1, False),
+    'target_nz': (np.uint8, 3, True),
+    'target_val': (np.uint8, 1, False),
+    'hard_pos': (np.uint8, 3, True),
+    'easy_pos': (np.uint8, 3, True),
+    'hard_neg': (np.uint8, 3, True),
+    'easy_neg': (np.uint8, 3, True),
+}
+WEIGHT_FIELDS = ['hard_pos', 'easy_pos', 'hard_neg', 'easy_neg']
+
+
+def _column(name, value, dtype):
+    columns, transposed = FIELDS[name][1:]
+    value = np.asarray(value)
+    if transposed:
+        value = value.T
+    value = value.reshape(-1, columns)
+    if value.size and np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        assert value.min() >= info.min and value.max() <= info.max, \
+            '%s does not fit in %s' % (name, np.dtype(dtype).name)
+    return value.astype(dtype)
+
+
+def write_shard(path, scenes, tsdf_dtype=np.float32, first=0):
+    """
+    Write a shard holding 'scenes', a list of dicts with the keys of the .msg
+    files (str or bytes), and optionally a 'weight' dict with the keys of the
+    _weight.msg files. Either every scene has a weight or none has.
+    'first' is the index of scenes[0] in the whole split.
+    The file is written under a temporary name and then renamed.
+    """
+    def get(d, key):
+        return d[key] if key in d else d[key.encode()]
+    has_weight = all(('weight' in s or b'weight' in s) for s in scenes)
+    names = ['input_nz', 'input_val', 'target_nz', 'target_val']
+    if has_weight:
+        names += WEIGHT_FIELDS
+    header = {'version': VERSION, 'first': first, 'num': len(scenes), 'fields': {}}
+    arrays = []
+    for name in names:
+        dtype = tsdf_dtype if name == 'input_val' else FIELDS[name][0]
+        if name in WEIGHT_FIELDS:
+            columns = [_column(name, get(get(s, 'weight'), name), dtype) for s in scenes]
+        else:
+            columns = [_column(name, get(s, name), dtype) for s in scenes]
+        starts = np.zeros(len(scenes) + 1, dtype=np.uint64)
+        starts[1:] = np.cumsum([len(c) for c in columns])
+        data = np.concatenate(columns) if columns else np.zeros((0, FIELDS[name][1]), dtype)
+        header['fields'][name] = {'dtype': np.dtype(dtype).str, 'columns': FIELDS[name][1]}
+        arrays.append((name, 'starts', starts))
+        arrays.append((name, 'data', data))
+
+    # the header holds the array offsets, so size it with placeholders first
+    def layout(header_len):
+        offset = len(MAGIC) + 8 + header_len
+        for name, part, array in arrays:
+            offset = (offset + ALIGN - 1) // ALIGN * ALIGN
+            header['fields'][name][part] = offset
+            offset += array.nbytes
+    for name, part, array in arrays:
+        header['fields'][name][part] = 0
+    header_len = len(json.dumps(header).encode()) + 256
+    layout(header_len)
+    encoded = json.dumps(header).encode()
+    assert len(encoded) <= header_len
+    encoded += b' ' * (header_len - len(encoded))
+
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', header_len))
+        f.write(encoded)
+        for name, part, array in arrays:
+            f.seek(header['fields'][name][part])
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.rename(tmp, path)
+
+
+def _read_header(path):
+    with open(path, 'rb') as f:
+        magic = f.read(len(MAGIC))
+        assert magic == MAGIC, path + ' is not a SUNCG shard'
+        header_len, = struct.unpack('<Q', f.read(8))
+        return json.loads(f.read(header_len).decode())
+
+
+def shard_range(path):
+    """(first scene index, number of scenes) of a shard, or None if path is
+    not a shard of the current version."""
+    try:
+        header = _read_header(path)
+    except (AssertionError, IOError, OSError, ValueError, struct.error):
+        return None
+    if header.get('version') != VERSION:
+        return None
+    return header['first'], header['num']
+
+
+class _Shard(object):
+    def __init__(self, path):
+        self.path = path
+        self.header = _read_header(path)
+        assert self.header['version'] == VERSION, path + ' has an unsupported version, rerun pack_shards.py'
+        self.first = self.header['first']
+        self.num = self.header['num']
+        self.mm = None
+
+    def open(self):
+        if self.mm is None:
+            self.mm = np.memmap(self.path, dtype=np.uint8, mode='r')
+        fields = {}
+        for name, info in self.header['fields'].items():
+            starts = np.frombuffer(self.mm, dtype=np.uint64, count=self.num + 1, offset=info['starts'])
+            rows = int(starts[-1])
+            data = np.frombuffer(self.mm, dtype=np.dtype(info['dtype']), count=rows * info['columns'],
+                                 offset=info['data']).reshape(rows, info['columns'])
+            fields[name] = (starts, data)
+        return fields
+
+
+class SUNCGShards(object):
+    """
+    Read-only view of a directory of shards written by write_shard(), named
+    so that sorting the file names gives the scene order. Scene i is returned
+    as a dict with the same bytes keys as the .msg files (and b'weight' if the
+    shards hold weights), whose values are numpy views into the mapped files.
+
+    Files are mapped lazily on first access, so a SUNCGShards can be created
+    before forking data loading workers.
+    """
+    def __init__(self, path):
+        files = sorted(glob.glob(os.path.join(path, '*.shard')))
+        assert len(files) > 0, 'no shards in ' + path
+        self.shards = [_Shard(f) for f in files]
+        end = 0
+        for s in self.shards:
+            assert s.first == end, '%s starts at scene %d, expected %d; rerun pack_shards.py' % (s.path, s.first, end)
+            end += s.num
+        self.fields = [None] * len(self.shards)
+        self.ends = np.cumsum([s.num for s in self.shards])
+
+    def __len__(self):
+        return int(self.ends[-1]) if len(self.ends) else 0
+
+    def __getstate__(self):
+        # mappings are per process
+        return {'shards': [s.path for s in self.shards], 'ends': self.ends}
+
+    def __setstate__(self, state):
+        self.shards = [_Shard(f) for f in state['shards']]
+        self.fields = [None] * len(self.shards)
+        self.ends = state['ends']
+
+    def _locate(self, idx):
+        # (shard, index within the shard) of scene idx
+        s = int(np.searchsorted(self.ends, idx, side='right'))
+        if self.fields[s] is None:
+            self.fields[s] = self.shards[s].open()
+        return s, idx - (int(self.ends[s - 1]) if s > 0 else 0)
+
+    def get(self, idx, name):
+        s, i = self._locate(idx)
+        starts, data = self.fields[s][name]
+        value = data[int(starts[i]):int(starts[i + 1])]
+        if FIELDS[name][2]:
+            return value.T
+        return value.reshape(-1) if FIELDS[name][1] == 1 else value
+
+    def num_sites(self, idx):
+        """Number of active input sites of scene idx, without touching the data."""
+        s, i = self._locate(idx)
+        starts = self.fields[s]['input_nz'][0]
+        return int(starts[i + 1] - starts[i])
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        data = {}
+        for name in ['input_nz', 'input_val', 'target_nz', 'target_val']:
+            data[name.encode()] = self.get(idx, name)
+        s, _ = self._locate(idx)
+        if 'hard_pos' in self.fields[s]:
+            data[b'weight'] = dict((name.encode(), self.get(idx, name)) for name in WEIGHT_FIELDS)
+        return data